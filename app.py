@@ -1,39 +1,133 @@
 import math
-from datetime import datetime
-from flask import Flask, request, render_template, jsonify, url_for, redirect, session, flash
-from sqlalchemy import func
+from datetime import datetime, timedelta
+from flask import Flask, Response, request, render_template, jsonify, url_for, redirect, session, flash
 import traceback
 import secrets
+import hmac
 import os
 import logging
 
 from database import init_db, get_db_session
 from models import Offer, User, ScrapingStat
-from scheduler import create_scheduler, run_scrape_job, get_next_run_times
-from scraper.indeed_scraper import scrape_indeed
+from scheduler import SCHEDULER_MODE, SCRAPE_COUNTRIES, get_next_run_times, get_scheduler, run_scrape_job, start_scheduler_election
+from scraper.locations import canonical_city, country_code
+from scraper import metrics
+from search import apply_search
+from facets import get_facets
+from listings import json_response, offer_items, offer_rows
+import rollups
+import scrape_queue
+import scheduling
+import profiling
+import events
+from pagination import InvalidCursor, LISTING_ORDER, cached_count, keyset_page
 from forms import LoginForm, RegistrationForm
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Query parameters that select a page rather than filter the listing
+PAGING_ARGS = ("page", "cursor", "dir", "limit")
+
+# Company names offered as suggestions in the filter form
+COMPANY_SUGGESTIONS = 100
+
+# date_filter values and how many days back they reach
+DATE_FILTER_DAYS = {"today": 0, "week": 7, "month": 30, "3months": 90}
+
+
+def apply_offer_filters(q, args):
+    """Search, title/company/city/date filters shared by the offer listings and the API"""
+    search = args.get("q")
+    title = args.get("title")
+    company = args.get("company")
+    city = args.get("city")
+    date_filter = args.get("date_filter")
+
+    if search:
+        q = apply_search(q, search)
+    if title:
+        q = q.filter(Offer.title.ilike(f"%{title}%"))
+    if company:
+        q = q.filter(Offer.company.ilike(f"%{company}%"))
+    if city:
+        q = q.filter(city_filter(city))
+
+    # Filtrage par date - use date_posted_parsed if available, fallback to created_at
+    days = DATE_FILTER_DAYS.get(date_filter)
+    if days is not None:
+        since = datetime.now().date() - timedelta(days=days)
+        q = q.filter(
+            (Offer.date_posted_parsed >= since) |
+            ((Offer.date_posted_parsed.is_(None)) & (Offer.created_at >= datetime.combine(since, datetime.min.time())))
+        )
+    return q
+
+
+def country_filter(country):
+    """Equality on the normalized country code; free text for unknown names"""
+    code = country_code(country)
+    if code:
+        return Offer.country_code == code
+    return Offer.country.ilike(f"%{country}%")
+
+
+def city_filter(city):
+    """Equality on the normalized city for a known city name; free text on the location otherwise"""
+    canonical = canonical_city(city)
+    if canonical:
+        return Offer.city == canonical
+    return Offer.location.ilike(f"%{city}%")
+
+
+def paginate_offers(q, args, limit, count_key):
+    """
+    Page through a filtered offer query. Cursor pagination by default; OFFSET
+    when an explicit page number is asked for or when search ranking decides
+    the order. Totals come from a short-lived cache.
+    """
+    filters = tuple(sorted((k, v) for k, v in args.items(multi=True) if k not in PAGING_ARGS))
+    total = cached_count(q, (count_key, filters))
+    if "page" in args or args.get("q"):
+        page = max(int(args.get("page", 1)), 1)
+        offers = q.order_by(*LISTING_ORDER).offset((page - 1) * limit).limit(limit).all()
+        total_pages = max(math.ceil(total / limit) if total else 1, 1)
+        return {"offers": offers, "page": page, "total_pages": total_pages, "total": total,
+                "next_cursor": None, "prev_cursor": None}
+    offers, next_cursor, prev_cursor = keyset_page(q, limit, args.get("cursor"), args.get("dir", "next"))
+    return {"offers": offers, "page": None, "total_pages": 1, "total": total,
+            "next_cursor": next_cursor, "prev_cursor": prev_cursor}
+
 
 def create_app() -> Flask:
     app = Flask(__name__)
     # Use environment variable for secret key in production, fallback for development
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', secrets.token_hex(16))
     init_db()
+    profiling.init_app(app)
 
-    # Initialize scheduler with error handling
-    scheduler = None
-    try:
-        scheduler = create_scheduler()
-        scheduler.start()
-        logger.info("Scheduler started successfully")
-    except Exception as e:
-        logger.error(f"Failed to start scheduler: {e}")
-        logger.error(traceback.format_exc())
-        scheduler = None
+    # Only the process that wins the leader election runs the scheduler; with
+    # SCHEDULER_MODE=off the jobs run in `python scheduler.py` instead
+    if SCHEDULER_MODE == "off":
+        logger.info("Scheduler disabled in this process, jobs run in `python scheduler.py`")
+    else:
+        try:
+            start_scheduler_election()
+        except Exception as e:
+            logger.error(f"Failed to start scheduler: {e}")
+            logger.error(traceback.format_exc())
+
+    @app.template_global()
+    def url_with(**changes):
+        """Current URL with some query parameters replaced (None removes them)"""
+        args = request.args.to_dict()
+        for key, value in changes.items():
+            if value is None:
+                args.pop(key, None)
+            else:
+                args[key] = value
+        return url_for(request.endpoint, **request.view_args, **args)
 
     def login_required(f):
         """Decorator to require login for routes"""
@@ -124,7 +218,7 @@ def create_app() -> Flask:
     def timer_info():
         """API endpoint to get timer information"""
         try:
-            next_runs = get_next_run_times(scheduler) if scheduler else {}
+            next_runs = get_next_run_times()
             # Convert datetime objects to ISO format for JSON serialization
             next_runs_iso = {}
             for job_id, next_run_time in next_runs.items():
@@ -139,6 +233,23 @@ def create_app() -> Flask:
             logger.error(traceback.format_exc())
             return jsonify({"error": str(e)}), 500
 
+    @app.route("/events")
+    @login_required
+    def event_stream():
+        """Server-Sent Events: next run times and scrape results as they change"""
+        subscriber = events.hub.subscribe()
+        if subscriber is None:
+            # Every stream slot of this worker is taken; the page polls /timer-info instead
+            return "", 204
+        response = Response(events.stream(subscriber), mimetype="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            # Keep reverse proxies from buffering the stream
+            "X-Accel-Buffering": "no",
+        })
+        # Also frees the slot when the client goes away before the stream starts
+        response.call_on_close(lambda: events.hub.unsubscribe(subscriber))
+        return response
+
     @app.route("/")
     @login_required
     def index():
@@ -154,7 +265,7 @@ def create_app() -> Flask:
         session['visited_country_selector'] = True
         
         # Get next run times for display
-        next_runs = get_next_run_times(scheduler) if scheduler else {}
+        next_runs = get_next_run_times()
         
         return render_template("country_selector.html", countries=countries, next_runs=next_runs)
 
@@ -164,72 +275,23 @@ def create_app() -> Flask:
         # Page that displays all internship offers
         db = get_db_session()
         try:
-            page = max(int(request.args.get("page", 1)), 1)
             limit = 20
-            title = request.args.get("title")
-            company = request.args.get("company")
-            city = request.args.get("city")
             country = request.args.get("country")
-            date_filter = request.args.get("date_filter")
-
-            q = db.query(Offer)
-            if title:
-                q = q.filter(Offer.title.ilike(f"%{title}%"))
-            if company:
-                q = q.filter(Offer.company.ilike(f"%{company}%"))
-            if city:
-                q = q.filter(Offer.location.ilike(f"%{city}%"))
-            if country:
-                q = q.filter(Offer.country.ilike(f"%{country}%"))
-            
-            # Filtrage par date - use date_posted_parsed if available, fallback to created_at
-            if date_filter:
-                from datetime import datetime, timedelta
-                today = datetime.now().date()
-                if date_filter == "today":
-                    # For today, prefer date_posted_parsed but fallback to created_at
-                    q = q.filter(
-                        (Offer.date_posted_parsed >= today) | 
-                        ((Offer.date_posted_parsed.is_(None)) & (Offer.created_at >= datetime.combine(today, datetime.min.time())))
-                    )
-                elif date_filter == "week":
-                    week_ago = today - timedelta(days=7)
-                    q = q.filter(
-                        (Offer.date_posted_parsed >= week_ago) | 
-                        ((Offer.date_posted_parsed.is_(None)) & (Offer.created_at >= datetime.combine(week_ago, datetime.min.time())))
-                    )
-                elif date_filter == "month":
-                    month_ago = today - timedelta(days=30)
-                    q = q.filter(
-                        (Offer.date_posted_parsed >= month_ago) | 
-                        ((Offer.date_posted_parsed.is_(None)) & (Offer.created_at >= datetime.combine(month_ago, datetime.min.time())))
-                    )
-                elif date_filter == "3months":
-                    three_months_ago = today - timedelta(days=90)
-                    q = q.filter(
-                        (Offer.date_posted_parsed >= three_months_ago) | 
-                        ((Offer.date_posted_parsed.is_(None)) & (Offer.created_at >= datetime.combine(three_months_ago, datetime.min.time())))
-                    )
 
-            total = q.count()
-            total_pages = max(math.ceil(total / 20) if total else 1, 1)
-            offers = (
-                q.order_by(Offer.date_posted_parsed.desc().nulls_last(), Offer.created_at.desc())
-                 .offset((page - 1) * limit)
-                 .limit(limit)
-                 .all()
-            )
+            q = offer_rows(db)
+            if country:
+                q = q.filter(country_filter(country))
+            q = apply_offer_filters(q, request.args)
+            listing = paginate_offers(q, request.args, limit, "all_offers")
             
-            # Récupérer les listes pour les dropdowns
-            cities = [row[0] for row in db.query(Offer.location).distinct().all() if row[0]]
-            countries = [row[0] for row in db.query(Offer.country).distinct().all() if row[0]]
+            # Listes des dropdowns, depuis le cache des facettes
+            facets = get_facets(db)
             
             return render_template("index.html", 
-                                 offers=offers, 
-                                 page=page, 
-                                 total_pages=total_pages,
-                                 cities=sorted(cities),
-                                 countries=sorted(countries),
+                                 **listing,
+                                 cities=facets["cities"],
+                                 companies=facets["companies"][:COMPANY_SUGGESTIONS],
+                                 countries=facets["countries"],
                                  show_all_offers=True)  # Flag to indicate this is the all offers page
         except Exception as e:
             logger.error(f"Error in all_offers: {e}")
@@ -258,83 +320,23 @@ def create_app() -> Flask:
         
         db = get_db_session()
         try:
-            page = max(int(request.args.get("page", 1)), 1)
             limit = 20
-            title = request.args.get("title")
-            company = request.args.get("company")
-            city = request.args.get("city")
-            date_filter = request.args.get("date_filter")
-
-            # Filter by country - handle case where country might be NULL
-            if country_name == "Maroc":
-                # For Morocco, also include offers where country is NULL (legacy data)
-                q = db.query(Offer).filter(
-                    (Offer.country.ilike(f"%{country_name}%")) | 
-                    (Offer.country.is_(None)) |
-                    (Offer.location.ilike("%Maroc%")) |
-                    (Offer.location.ilike("%Casablanca%")) |
-                    (Offer.location.ilike("%Rabat%")) |
-                    (Offer.location.ilike("%Marrakech%"))
-                )
-            else:
-                # For other countries, filter by country name
-                q = db.query(Offer).filter(Offer.country.ilike(f"%{country_name}%"))
-            
-            if title:
-                q = q.filter(Offer.title.ilike(f"%{title}%"))
-            if company:
-                q = q.filter(Offer.company.ilike(f"%{company}%"))
-            if city:
-                q = q.filter(Offer.location.ilike(f"%{city}%"))
-            
-            # Filtrage par date - use date_posted_parsed if available, fallback to created_at
-            if date_filter:
-                from datetime import datetime, timedelta
-                today = datetime.now().date()
-                if date_filter == "today":
-                    # For today, prefer date_posted_parsed but fallback to created_at
-                    q = q.filter(
-                        (Offer.date_posted_parsed >= today) | 
-                        ((Offer.date_posted_parsed.is_(None)) & (Offer.created_at >= datetime.combine(today, datetime.min.time())))
-                    )
-                elif date_filter == "week":
-                    week_ago = today - timedelta(days=7)
-                    q = q.filter(
-                        (Offer.date_posted_parsed >= week_ago) | 
-                        ((Offer.date_posted_parsed.is_(None)) & (Offer.created_at >= datetime.combine(week_ago, datetime.min.time())))
-                    )
-                elif date_filter == "month":
-                    month_ago = today - timedelta(days=30)
-                    q = q.filter(
-                        (Offer.date_posted_parsed >= month_ago) | 
-                        ((Offer.date_posted_parsed.is_(None)) & (Offer.created_at >= datetime.combine(month_ago, datetime.min.time())))
-                    )
-                elif date_filter == "3months":
-                    three_months_ago = today - timedelta(days=90)
-                    q = q.filter(
-                        (Offer.date_posted_parsed >= three_months_ago) | 
-                        ((Offer.date_posted_parsed.is_(None)) & (Offer.created_at >= datetime.combine(three_months_ago, datetime.min.time())))
-                    )
 
-            total = q.count()
-            total_pages = max(math.ceil(total / 20) if total else 1, 1)
-            offers = (
-                q.order_by(Offer.date_posted_parsed.desc().nulls_last(), Offer.created_at.desc())
-                 .offset((page - 1) * limit)
-                 .limit(limit)
-                 .all()
-            )
+            # Legacy offers without a country were backfilled to MA, so an
+            # equality on the normalized code covers them too
+            code = country_code(country_name)
+            q = offer_rows(db).filter(Offer.country_code == code)
+            q = apply_offer_filters(q, request.args)
+            listing = paginate_offers(q, request.args, limit, ("country_offers", code))
             
-            # Récupérer les listes pour les dropdowns (filtered by country)
-            cities = [row[0] for row in db.query(Offer.location).filter(Offer.country.ilike(f"%{country_name}%")).distinct().all() if row[0]]
-            countries = [row[0] for row in db.query(Offer.country).distinct().all() if row[0]]
+            # Listes des dropdowns pour ce pays, depuis le cache des facettes
+            facets = get_facets(db, code)
             
             return render_template("index.html", 
-                                 offers=offers, 
-                                 page=page, 
-                                 total_pages=total_pages,
-                                 cities=sorted(cities),
-                                 countries=sorted(countries),
+                                 **listing,
+                                 cities=facets["cities"],
+                                 companies=facets["companies"][:COMPANY_SUGGESTIONS],
+                                 countries=get_facets(db)["countries"],
                                  selected_country=country_name)
         except Exception as e:
             logger.error(f"Error in country_offers: {e}")
@@ -349,21 +351,10 @@ def create_app() -> Flask:
     def stats():
         db = get_db_session()
         try:
-            total_offers = db.query(func.count(Offer.id)).scalar() or 0
-            top_companies = (
-                db.query(Offer.company, func.count(Offer.id))
-                .group_by(Offer.company)
-                .order_by(func.count(Offer.id).desc())
-                .limit(5)
-                .all()
-            )
-            offers_by_city = (
-                db.query(Offer.location, func.count(Offer.id))
-                .group_by(Offer.location)
-                .order_by(func.count(Offer.id).desc())
-                .limit(10)
-                .all()
-            )
+            # Pre-aggregated in the rollup tables, see rollups.py
+            total_offers = rollups.total_offers(db)
+            top_companies = rollups.top_values(db, "company", 5)
+            offers_by_city = rollups.top_values(db, "location", 10)
             
             # Get scraping statistics
             recent_scraping_stats = (
@@ -372,19 +363,7 @@ def create_app() -> Flask:
                 .limit(20)  # Last 20 scraping jobs
                 .all()
             )
-            
-            # Get summary statistics
-            scraping_summary = (
-                db.query(
-                    ScrapingStat.country,
-                    func.count(ScrapingStat.id).label('runs'),
-                    func.sum(ScrapingStat.offers_found).label('total_found'),
-                    func.sum(ScrapingStat.offers_inserted).label('total_inserted'),
-                    func.avg(ScrapingStat.duration_seconds).label('avg_duration')
-                )
-                .group_by(ScrapingStat.country)
-                .all()
-            )
+            scraping_summary = rollups.scraping_summary(db)
             
             return render_template(
                 "stats.html",
@@ -412,75 +391,25 @@ def create_app() -> Flask:
             
         db = get_db_session()
         try:
-            page = max(int(request.args.get("page", 1)), 1)
             limit = min(max(int(request.args.get("limit", 20)), 1), 100)
-            title = request.args.get("title")
-            company = request.args.get("company")
-            city = request.args.get("city")
             country = request.args.get("country")
-            date_filter = request.args.get("date_filter")
-
-            q = db.query(Offer)
-            if title:
-                q = q.filter(Offer.title.ilike(f"%{title}%"))
-            if company:
-                q = q.filter(Offer.company.ilike(f"%{company}%"))
-            if city:
-                q = q.filter(Offer.location.ilike(f"%{city}%"))
-            if country:
-                q = q.filter(Offer.country.ilike(f"%{country}%"))
-            
-            # Filtrage par date - use date_posted_parsed if available, fallback to created_at
-            if date_filter:
-                from datetime import datetime, timedelta
-                today = datetime.now().date()
-                if date_filter == "today":
-                    # For today, prefer date_posted_parsed but fallback to created_at
-                    q = q.filter(
-                        (Offer.date_posted_parsed >= today) | 
-                        ((Offer.date_posted_parsed.is_(None)) & (Offer.created_at >= datetime.combine(today, datetime.min.time())))
-                    )
-                elif date_filter == "week":
-                    week_ago = today - timedelta(days=7)
-                    q = q.filter(
-                        (Offer.date_posted_parsed >= week_ago) | 
-                        ((Offer.date_posted_parsed.is_(None)) & (Offer.created_at >= datetime.combine(week_ago, datetime.min.time())))
-                    )
-                elif date_filter == "month":
-                    month_ago = today - timedelta(days=30)
-                    q = q.filter(
-                        (Offer.date_posted_parsed >= month_ago) | 
-                        ((Offer.date_posted_parsed.is_(None)) & (Offer.created_at >= datetime.combine(month_ago, datetime.min.time())))
-                    )
-                elif date_filter == "3months":
-                    three_months_ago = today - timedelta(days=90)
-                    q = q.filter(
-                        (Offer.date_posted_parsed >= three_months_ago) | 
-                        ((Offer.date_posted_parsed.is_(None)) & (Offer.created_at >= datetime.combine(three_months_ago, datetime.min.time())))
-                    )
 
-            total = q.count()
-            offers = (
-                q.order_by(Offer.date_posted_parsed.desc().nulls_last(), Offer.created_at.desc())
-                 .offset((page - 1) * limit)
-                 .limit(limit)
-                 .all()
-            )
-            data = [
-                {
-                    "id": o.id,
-                    "title": o.title,
-                    "company": o.company,
-                    "location": o.location,
-                    "country": o.country,
-                    "date_posted": o.date_posted,
-                    "date_posted_parsed": o.date_posted_parsed.isoformat() if o.date_posted_parsed is not None else None,
-                    "link": o.link,
-                    "created_at": o.created_at.isoformat(),
-                }
-                for o in offers
-            ]
-            return jsonify({"page": page, "limit": limit, "total": total, "items": data})
+            q = offer_rows(db)
+            if country:
+                q = q.filter(country_filter(country))
+            q = apply_offer_filters(q, request.args)
+            try:
+                listing = paginate_offers(q, request.args, limit, "api_offers")
+            except InvalidCursor as e:
+                return jsonify({"error": str(e)}), 400
+            return json_response({
+                "page": listing["page"],
+                "limit": limit,
+                "total": listing["total"],
+                "items": offer_items(listing["offers"]),
+                "next_cursor": listing["next_cursor"],
+                "prev_cursor": listing["prev_cursor"],
+            })
         except Exception as e:
             logger.error(f"Error in api_offers: {e}")
             logger.error(traceback.format_exc())
@@ -495,19 +424,42 @@ def create_app() -> Flask:
         if 'user_id' not in session:
             return jsonify({"error": "Authentication required"}), 401
             
+        db = get_db_session()
         try:
             # Get country parameter from form or default to Morocco
             country = request.form.get("country", "Maroc")
-            # Use only 1 page for manual scraping to be gentle on the server
-            inserted = run_scrape_job(max_pages=1, country=country)
+            # Queued for the scheduler process; use only 1 page to be gentle on the server
+            job, coalesced = scrape_queue.enqueue(db, country, max_pages=1)
             if request.accept_mimetypes.accept_html and not request.is_json:
                 # Redirect back to country-specific page in HTML contexts
+                flash('Actualisation des offres en cours, revenez dans quelques minutes.', 'info')
                 return redirect(url_for("country_offers", country_name=country))
-            return jsonify({"inserted": inserted})
+            return jsonify({
+                "job_id": job.id,
+                "status": job.status,
+                "coalesced": coalesced,
+                "status_url": url_for("api_scrape_status", job_id=job.id),
+            }), 202
         except Exception as e:
             logger.error(f"Error in api_scrape: {e}")
             logger.error(traceback.format_exc())
             return jsonify({"error": str(e)}), 500
+        finally:
+            db.close()
+
+    @app.route("/api/scrape/<int:job_id>")
+    def api_scrape_status(job_id):
+        if 'user_id' not in session:
+            return jsonify({"error": "Authentication required"}), 401
+
+        db = get_db_session()
+        try:
+            job = scrape_queue.get_job(db, job_id)
+            if job is None:
+                return jsonify({"error": "Unknown scrape job"}), 404
+            return jsonify(scrape_queue.to_dict(job))
+        finally:
+            db.close()
 
     @app.route("/offers-test")
     @login_required
@@ -701,24 +653,37 @@ def create_app() -> Flask:
     def scheduler_test():
         """Test endpoint to check scheduler status"""
         try:
-            if scheduler is None:
-                return jsonify({
-                    "scheduler_status": "not_initialized",
-                    "message": "Scheduler is not initialized"
-                })
-            
-            from scheduler import get_next_run_times
-            next_runs = get_next_run_times(scheduler)
+            next_runs = get_next_run_times()
+            if get_scheduler() is None:
+                status = "standby"
+                message = "Scheduler runs in another process" if next_runs else "No scheduler has published its jobs yet"
+            else:
+                status = "running"
+                message = "Scheduler is working correctly"
             
             # Convert datetime objects to strings for JSON
             next_runs_str = {}
             for job_id, next_run_time in next_runs.items():
                 next_runs_str[job_id] = next_run_time.isoformat() if next_run_time else None
             
+            # Each country's adaptive interval and when it is next due
+            db = get_db_session()
+            try:
+                countries = {
+                    country: {
+                        "interval_minutes": round(scheduling.next_interval(runs).total_seconds() / 60, 1),
+                        "due": (runs[0].execution_time + scheduling.next_interval(runs)).isoformat() if runs else None,
+                    }
+                    for country, runs in scheduling.recent_runs(db, SCRAPE_COUNTRIES).items()
+                }
+            finally:
+                db.close()
+            
             return jsonify({
-                "scheduler_status": "running",
+                "scheduler_status": status,
                 "next_runs": next_runs_str,
-                "message": "Scheduler is working correctly"
+                "countries": countries,
+                "message": message
             })
         except Exception as e:
             logger.error(f"Scheduler test error: {e}")
@@ -729,6 +694,25 @@ def create_app() -> Flask:
                 "message": "Scheduler has issues"
             }), 500
 
+    @app.route("/metrics")
+    def metrics_endpoint():
+        """Scrape pipeline counters and histograms of this process, for Prometheus"""
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if 'user_id' not in session and not (metrics.METRICS_TOKEN and hmac.compare_digest(token, metrics.METRICS_TOKEN)):
+            return jsonify({"error": "Authentication required"}), 401
+        return Response(metrics.render(), mimetype=None, content_type=metrics.CONTENT_TYPE)
+
+    @app.route("/profiles")
+    @login_required
+    def profiles():
+        """Captured profiles (PROFILING=1) with their top functions by own time"""
+        top = max(1, min(request.args.get("top", 10, type=int), 50))
+        return jsonify({
+            "enabled": profiling.PROFILING,
+            "slow_request_ms": profiling.PROFILE_SLOW_REQUEST_MS,
+            "profiles": profiling.list_profiles(top),
+        })
+
     @app.route("/health")
     def health_check():
         """Simple health check to verify database connectivity"""
@@ -772,13 +756,8 @@ def create_app() -> Flask:
             
             # Check scheduler
             try:
-                if scheduler is None:
-                    scheduler_status = "Not initialized"
-                    next_runs = {}
-                else:
-                    from scheduler import get_next_run_times
-                    next_runs = get_next_run_times(scheduler)
-                    scheduler_status = "Running"
+                next_runs = get_next_run_times()
+                scheduler_status = "Running" if get_scheduler() is not None else "Running in another process"
             except Exception as e:
                 next_runs = {}
                 scheduler_status = f"Error: {e}"
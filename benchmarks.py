@@ -0,0 +1,1127 @@
+"""
+Offline benchmarks for the scraping and ingestion pipeline.
+
+Each benchmark runs against a throwaway SQLite database so it never touches
+internships.db. Usage:
+
+    python benchmarks.py ingest [--offers 10000]
+    python benchmarks.py fetch [--pages 20] [--concurrency 5] [--latency 0.2]
+    python benchmarks.py cards [saved_page.html ...]
+    python benchmarks.py pages [saved_page.html ...]
+    python benchmarks.py dates [--count 100000]
+    python benchmarks.py locations [--count 100000]
+    python benchmarks.py plans [--rows 1000000]
+    python benchmarks.py search [--rows 100000 1000000]
+    python benchmarks.py paging [--rows 1000000]
+    python benchmarks.py facets [--rows 200000]
+    python benchmarks.py stats [--rows 200000] [--runs 50000]
+    python benchmarks.py stream [--pages 30] [--latency 0.2]
+    python benchmarks.py importtime [--budget-ms 1000] [--runs 5]
+    python benchmarks.py concurrency [--readers 8] [--writers 5] [--seconds 10]
+    python benchmarks.py api [--rows 100000] [--requests 500]
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _use_temp_database():
+    """Point database.py at a fresh SQLite file before it is imported"""
+    fd, path = tempfile.mkstemp(prefix="bench_", suffix=".db")
+    os.close(fd)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return path
+
+
+def synthetic_offers(count, duplicate_ratio=0.2, seed=42):
+    """Generate scraped-offer dicts shaped like parse_job_card output"""
+    rng = random.Random(seed)
+    cities = ["Casablanca", "Rabat", "Paris", "Lyon", "Montréal", "Bruxelles", "Genève", "Toulouse"]
+    dates = ["il y a 2 jours", "il y a 5 heures", "Publié à l'instant", "il y a 1 semaine", "30+ jours"]
+    unique = max(int(count * (1 - duplicate_ratio)), 1)
+    offers = []
+    for i in range(count):
+        n = i if i < unique else rng.randrange(unique)
+        offers.append({
+            "title": f"Stagiaire développeur {n}",
+            "company": f"Entreprise {n % 500}",
+            "location": rng.choice(cities),
+            "date_posted": rng.choice(dates),
+            "link": f"https://ma.indeed.com/viewjob?jk={n:012x}",
+        })
+    return offers
+
+
+def _legacy_insert(offers):
+    """Per-row insert loop as it was before batching, kept as a baseline"""
+    from sqlalchemy.exc import IntegrityError
+    from database import get_db_session
+    from models import Offer
+    from scraper.indeed_scraper import extract_country_from_location, parse_date_posted
+
+    db = get_db_session()
+    inserted = 0
+    try:
+        for o in offers:
+            try:
+                location = o.get("location", "")
+                date_posted = o.get("date_posted", "")
+                db.add(Offer(
+                    title=o.get("title", ""),
+                    company=o.get("company", ""),
+                    location=location,
+                    country=extract_country_from_location(location),
+                    date_posted=date_posted,
+                    date_posted_parsed=parse_date_posted(date_posted),
+                    link=o.get("link", ""),
+                ))
+                db.commit()
+                inserted += 1
+            except IntegrityError:
+                db.rollback()
+        return inserted
+    finally:
+        db.close()
+
+
+def _reset_offers():
+    from database import engine
+    from models import Offer
+    with engine.begin() as conn:
+        conn.execute(Offer.__table__.delete())
+
+
+def bench_ingest(args):
+    """Compare batched insert_new_offers against the legacy per-row loop"""
+    path = _use_temp_database()
+    try:
+        from database import init_db
+        from scheduler import insert_new_offers
+
+        init_db()
+        offers = synthetic_offers(args.offers)
+
+        start = time.perf_counter()
+        legacy = _legacy_insert(offers)
+        legacy_s = time.perf_counter() - start
+
+        _reset_offers()
+        start = time.perf_counter()
+        inserted, duplicates = insert_new_offers(offers)
+        batched_s = time.perf_counter() - start
+
+        print(f"offers: {len(offers)}")
+        print(f"per-row loop: {legacy} inserted in {legacy_s:.3f}s ({len(offers) / legacy_s:,.0f} offers/s)")
+        print(f"batched:      {inserted} inserted, {duplicates} duplicates in {batched_s:.3f}s "
+              f"({len(offers) / batched_s:,.0f} offers/s)")
+        print(f"speedup: {legacy_s / batched_s:.1f}x")
+        return 0 if inserted == legacy else 1
+    finally:
+        os.remove(path)
+
+
+def bench_fetch(args):
+    """Sequential keep-alive fetching vs the asyncio engine, against scraper.fake_indeed"""
+    os.environ["INDEED_REQUESTS_PER_MINUTE"] = "1000000"
+    os.environ["INDEED_REQUEST_BURST"] = "1000"
+    from scraper.fake_indeed import start_fake_indeed
+
+    server, base_url = start_fake_indeed(latency=args.latency, throttle_every=args.throttle_every)
+    os.environ["INDEED_BASE_URL"] = base_url
+    try:
+        import requests
+        from scraper.indeed_scraper import build_indeed_url, scrape_with_async_requests
+
+        urls = [build_indeed_url(start=page * 10, country="Maroc") for page in range(args.pages)]
+        session = requests.Session()
+        start = time.perf_counter()
+        for url in urls:
+            session.get(url, timeout=30)
+        sequential_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        offers = scrape_with_async_requests(args.pages, 1.0, "Maroc", concurrency=args.concurrency)
+        async_s = time.perf_counter() - start
+
+        print(f"pages: {args.pages}, latency: {args.latency}s, throttle every: {args.throttle_every or 'never'}")
+        print(f"sequential: {sequential_s:.2f}s ({args.pages / sequential_s:.1f} pages/s)")
+        print(f"async (concurrency {args.concurrency}): {async_s:.2f}s ({args.pages / async_s:.1f} pages/s), "
+              f"{len(offers)} offers")
+        return 0
+    finally:
+        server.shutdown()
+
+
+def _load_pages(paths, default_count=20):
+    """Saved Indeed result pages, or pages rendered by scraper.fake_indeed"""
+    if paths:
+        pages = []
+        for path in paths:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append(f.read())
+        return pages
+    from scraper.fake_indeed import render_page
+    return [render_page(start) for start in range(0, default_count * 15, 15)]
+
+
+def bench_cards(args):
+    """parse_job_card on BeautifulSoup (reference) vs the single-pass lxml extractor"""
+    from bs4 import BeautifulSoup
+    from scraper.card_parser import parse_cards
+    from scraper.indeed_scraper import RESULT_CARD_SELECTORS, parse_job_card
+
+    pages = _load_pages(args.pages)
+
+    def reference(html):
+        soup = BeautifulSoup(html, "html.parser")
+        for selector in RESULT_CARD_SELECTORS:
+            cards = soup.select(selector)
+            if cards:
+                return [parse_job_card(card) for card in cards]
+        return []
+
+    timings = {}
+    results = {}
+    for name, func in (("bs4 + parse_job_card", reference),
+                       ("lxml single pass", lambda html: parse_cards(html, RESULT_CARD_SELECTORS))):
+        start = time.perf_counter()
+        results[name] = [func(html) for html in pages]
+        timings[name] = time.perf_counter() - start
+
+    ref, new = results.values()
+    cards = sum(len(r) for r in ref)
+    mismatches = 0
+    for page_index, (expected, actual) in enumerate(zip(ref, new)):
+        if expected != actual:
+            mismatches += 1
+            print(f"parity mismatch on page {page_index}:")
+            for a, b in zip(expected, actual):
+                if a != b:
+                    print(f"  reference: {a}\n  lxml:      {b}")
+                    break
+
+    print(f"pages: {len(pages)}, cards: {cards}")
+    for name, seconds in timings.items():
+        print(f"{name}: {seconds:.3f}s ({cards / seconds:,.0f} cards/s)")
+    print(f"parity: {'OK' if not mismatches else f'{mismatches} page(s) differ'}")
+    return 1 if mismatches else 0
+
+
+def _page_parse_variants():
+    import lxml.html
+    from bs4 import BeautifulSoup
+    from scraper.card_parser import extract_card, parse_cards, select_cards
+    from scraper.indeed_scraper import RESULT_CARD_SELECTORS, parse_job_card, parse_result_page
+
+    def bs4_parse(html, parse_only=None):
+        soup = BeautifulSoup(html, "html.parser", parse_only=parse_only)
+        for selector in RESULT_CARD_SELECTORS:
+            cards = soup.select(selector)
+            if cards:
+                return [parse_job_card(card) for card in cards]
+        return []
+
+    def lxml_full_page(html):
+        doc = lxml.html.document_fromstring(html)
+        return [extract_card(card) for card in select_cards(doc, RESULT_CARD_SELECTORS)]
+
+    return {
+        "bs4 full page": bs4_parse,
+        "bs4 results only": lambda html: parse_result_page(html, use_lxml=False),
+        "lxml full page": lxml_full_page,
+        "lxml results only": lambda html: parse_cards(html, RESULT_CARD_SELECTORS),
+    }
+
+
+def bench_pages(args):
+    """Full-page parsing vs card-only parsing: time and peak memory per variant"""
+    if args.variant:
+        # Child process: one variant, so peak RSS is not shared with the others
+        import resource
+        pages = _load_pages(args.pages)
+        func = _page_parse_variants()[args.variant]
+        func(pages[0])
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        cards = sum(len(func(html)) for html in pages)
+        elapsed = time.perf_counter() - start
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(f"{elapsed:.6f} {cards} {peak - baseline}")
+        return 0
+
+    pages = _load_pages(args.pages)
+    size_kb = sum(len(html) for html in pages) / 1024
+    print(f"pages: {len(pages)} ({size_kb:,.0f} KB of HTML)")
+    for name in _page_parse_variants():
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "pages", "--variant", name, *args.pages],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        elapsed, cards, rss_kb = out.split()
+        print(f"{name:18} {float(elapsed) * 1000 / len(pages):8.2f} ms/page  "
+              f"{int(cards):5d} cards  peak RSS growth {int(rss_kb) / 1024:6.1f} MB")
+    return 0
+
+
+def _legacy_parse_date_posted(date_text):
+    """parse_date_posted as it was before the precompiled matcher, kept as a baseline"""
+    import re
+    from datetime import date
+    if not date_text:
+        return None
+    
+    today = date.today()
+    
+    # Patterns communs pour les dates Indeed
+    patterns = [
+        r'il y a (\d+) jour',  # "il y a 2 jours"
+        r'il y a (\d+) heure',  # "il y a 3 heures"
+        r'il y a (\d+) semaine',  # "il y a 1 semaine"
+        r'il y a (\d+) mois',  # "il y a 2 mois"
+        r'(\d+)/(\d+)/(\d+)',  # "15/10/2024"
+        r'(\d{4})-(\d{2})-(\d{2})',  # "2024-10-15"
+    ]
+    
+    for pattern in patterns:
+        match = re.search(pattern, date_text.lower())
+        if match:
+            try:
+                if 'jour' in pattern:
+                    days_ago = int(match.group(1))
+                    from datetime import timedelta
+                    return today - timedelta(days=days_ago)
+                elif 'heure' in pattern:
+                    hours_ago = int(match.group(1))
+                    from datetime import timedelta
+                    return today - timedelta(hours=hours_ago)
+                elif 'semaine' in pattern:
+                    weeks_ago = int(match.group(1))
+                    from datetime import timedelta
+                    return today - timedelta(weeks=weeks_ago)
+                elif 'mois' in pattern:
+                    months_ago = int(match.group(1))
+                    from datetime import timedelta
+                    return today - timedelta(days=months_ago * 30)
+                elif len(match.groups()) == 3:
+                    if '/' in pattern:
+                        day, month, year = match.groups()
+                        return date(int(year), int(month), int(day))
+                    else:
+                        year, month, day = match.groups()
+                        return date(int(year), int(month), int(day))
+            except (ValueError, OverflowError):
+                # If date parsing fails, continue to next pattern
+                continue
+    
+    return None
+
+
+def bench_dates(args):
+    """Legacy per-call regex loop vs the precompiled, memoized parse_dates"""
+    from datetime import date
+    from scraper.dates import parse_dates
+
+    rng = random.Random(7)
+    forms = ["il y a {} jours", "Publié il y a {} heures", "il y a {} semaine", "il y a {} mois",
+             "Posted {} days ago", "{}/10/2024", "Hier", "Aujourd'hui", "30+ jours", "EmployerActive {} jours"]
+    # Card text that only contains a date word; it must not parse
+    non_dates = ["Gauthier", "fichier joint", "cahier des charges", "Rochier", "Todayville"]
+    texts = [rng.choice(forms + non_dates).format(rng.randint(1, 28)) for _ in range(args.count)]
+    today = date.today()
+
+    start = time.perf_counter()
+    legacy = [_legacy_parse_date_posted(text) for text in texts]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = parse_dates(texts, today)
+    batched_s = time.perf_counter() - start
+
+    recognised_legacy = sum(d is not None for d in legacy)
+    recognised = sum(d is not None for d in batched)
+    regressions = sum(1 for old, new in zip(legacy, batched) if old is not None and old != new)
+    false_dates = [text for text, parsed in zip(non_dates, parse_dates(non_dates, today)) if parsed is not None]
+    print(f"strings: {len(texts)} ({len(set(texts))} distinct)")
+    print(f"legacy:      {legacy_s:.3f}s ({len(texts) / legacy_s:,.0f}/s), {recognised_legacy} parsed")
+    print(f"parse_dates: {batched_s:.3f}s ({len(texts) / batched_s:,.0f}/s), {recognised} parsed")
+    print(f"strings parsed differently from legacy: {regressions}")
+    if false_dates:
+        print(f"FAIL: parsed as dates: {', '.join(false_dates)}")
+    return 1 if regressions or false_dates else 0
+
+
+def _legacy_extract_country(location):
+    """extract_country_from_location as it was before the location index, kept as a baseline"""
+    if not location:
+        return None
+    
+    # Mapping des villes aux pays
+    city_to_country = {
+        'paris': 'France', 'lyon': 'France', 'marseille': 'France', 'toulouse': 'France',
+        'nice': 'France', 'nantes': 'France', 'strasbourg': 'France', 'montpellier': 'France',
+        'bordeaux': 'France', 'lille': 'France', 'rennes': 'France', 'reims': 'France',
+        'casablanca': 'Maroc', 'rabat': 'Maroc', 'fès': 'Maroc', 'fes': 'Maroc',
+        'marrakech': 'Maroc', 'agadir': 'Maroc', 'tanger': 'Maroc', 'meknès': 'Maroc',
+        'oujda': 'Maroc', 'kenitra': 'Maroc', 'tétouan': 'Maroc', 'salé': 'Maroc',
+        'bruxelles': 'Belgique', 'anvers': 'Belgique', 'gand': 'Belgique', 'charleroi': 'Belgique',
+        'genève': 'Suisse', 'zurich': 'Suisse', 'bâle': 'Suisse', 'berne': 'Suisse',
+        'montréal': 'Canada', 'toronto': 'Canada', 'vancouver': 'Canada', 'ottawa': 'Canada',
+    }
+    
+    location_lower = location.lower()
+    
+    # Chercher des patterns de pays
+    if any(country in location_lower for country in ['france', 'français', 'french']):
+        return 'France'
+    elif any(country in location_lower for country in ['maroc', 'morocco', 'marocain']):
+        return 'Maroc'
+    elif any(country in location_lower for country in ['belgique', 'belgium', 'belge']):
+        return 'Belgique'
+    elif any(country in location_lower for country in ['suisse', 'switzerland', 'suisse']):
+        return 'Suisse'
+    elif any(country in location_lower for country in ['canada', 'canadian']):
+        return 'Canada'
+    
+    # Chercher par ville
+    for city, country in city_to_country.items():
+        if city in location_lower:
+            return country
+    
+    return None
+
+
+def bench_locations(args):
+    """Legacy keyword/city loops vs the cached Aho-Corasick location index"""
+    from scraper.locations import LocationIndex, build_location_index
+
+    rng = random.Random(11)
+    forms = ["Casablanca, Casablanca-Settat", "Rabat", "Télétravail in Casablanca", "Tanger", "Fès",
+             "Paris 8e (75)", "Lyon 3e (69)", "Boulogne-Billancourt (92)", "Télétravail", "France",
+             "Montréal, QC", "Toronto, ON", "Québec, QC", "Bruxelles", "Liège", "Zürich", "Genève",
+             "Lausanne, VD", "Hybride à Marrakech", "{} arrondissement, Paris"]
+    texts = [rng.choice(forms).format(rng.randint(1, 20)) for _ in range(args.count)]
+
+    start = time.perf_counter()
+    legacy = [_legacy_extract_country(text) for text in texts]
+    legacy_s = time.perf_counter() - start
+
+    index = build_location_index()
+    start = time.perf_counter()
+    resolved = [index.resolve(text).country for text in texts]
+    indexed_s = time.perf_counter() - start
+
+    # Same index without the cache: raw automaton scan cost
+    uncached = LocationIndex.__new__(LocationIndex)
+    uncached.automaton = index.automaton
+    start = time.perf_counter()
+    for text in texts:
+        uncached._resolve(text)
+    scan_s = time.perf_counter() - start
+
+    regressions = sorted({t for t, old, new in zip(texts, legacy, resolved) if old is not None and old != new})
+    print(f"strings: {len(texts)} ({len(set(texts))} distinct)")
+    print(f"legacy:         {legacy_s:.3f}s ({len(texts) / legacy_s:,.0f}/s), {sum(c is not None for c in legacy)} resolved")
+    print(f"index (cached): {indexed_s:.3f}s ({len(texts) / indexed_s:,.0f}/s), {sum(c is not None for c in resolved)} resolved")
+    print(f"index (scan):   {scan_s:.3f}s ({len(texts) / scan_s:,.0f}/s)")
+    print(f"strings resolved differently from legacy: {len(regressions)}")
+    for text in regressions[:10]:
+        print(f"  {text!r}")
+    return 1 if regressions else 0
+
+
+def _fill_offers_fixture(rows, seed=3):
+    """Bulk-load `rows` synthetic offers spread over the scraped countries and four months"""
+    from datetime import date, datetime, timedelta
+    from database import engine
+    from models import Offer
+    from scraper.locations import COUNTRY_CODES
+
+    rng = random.Random(seed)
+    cities = {
+        "Maroc": ["Casablanca", "Rabat", "Marrakech", "Tanger"],
+        "France": ["Paris", "Lyon", "Toulouse", "Lille"],
+        "Canada": ["Montréal", "Toronto", "Québec"],
+        "Belgique": ["Bruxelles", "Liège", "Gand"],
+        "Suisse": ["Genève", "Zurich", "Lausanne"],
+    }
+    countries = list(COUNTRY_CODES)
+    roles = ["Stagiaire développeur Python", "Stage Data Analyst", "Stagiaire assistant marketing",
+             "Stage ingénieur DevOps", "Stagiaire comptabilité", "Stage développeur web React",
+             "Stagiaire ressources humaines", "Stage chef de projet digital", "Stagiaire juriste"]
+    today = date.today()
+    now = datetime.utcnow()
+    batch = []
+    with engine.begin() as conn:
+        for n in range(rows):
+            country = countries[n % len(countries)]
+            city = rng.choice(cities[country])
+            age = rng.randrange(120)
+            batch.append({
+                "title": f"{rng.choice(roles)} {n}",
+                "company": f"Entreprise {n % 500}",
+                "location": city,
+                "country": country,
+                "country_code": COUNTRY_CODES[country],
+                "city": city,
+                "date_posted": f"il y a {age} jours",
+                # Some cards have no recognisable date
+                "date_posted_parsed": None if n % 10 == 0 else today - timedelta(days=age),
+                "link": f"https://ma.indeed.com/viewjob?jk={n:012x}",
+                "created_at": now - timedelta(minutes=n),
+            })
+            if len(batch) == 50000:
+                conn.execute(Offer.__table__.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(Offer.__table__.insert(), batch)
+        conn.exec_driver_sql("ANALYZE")
+
+
+def _explain(conn, query):
+    compiled = query.statement.compile(dialect=conn.dialect)
+    params = [str(v) if v is not None else None for v in (compiled.params[name] for name in compiled.positiontup)]
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", tuple(params)).all()
+    return [row[-1] for row in rows]
+
+
+def bench_plans(args):
+    """Query plans and latency of the offer listings on a large SQLite fixture"""
+    path = _use_temp_database()
+    try:
+        from werkzeug.datastructures import MultiDict
+        from app import apply_offer_filters, country_filter
+        from database import engine, get_db_session, init_db
+        from models import Offer
+
+        init_db()
+        start = time.perf_counter()
+        _fill_offers_fixture(args.rows)
+        print(f"fixture: {args.rows} offers in {time.perf_counter() - start:.1f}s")
+
+        listing_order = (Offer.date_posted_parsed.desc().nulls_last(), Offer.created_at.desc())
+        db = get_db_session()
+        cases = [
+            # (name, query, index the plan must use, whether ORDER BY must come from the index)
+            ("country page", db.query(Offer).filter(country_filter("France")), "ix_offers_country_code_date", True),
+            ("country page, city", apply_offer_filters(db.query(Offer).filter(country_filter("France")),
+                                                       MultiDict({"city": "Lyon"})), "ix_offers_country_city_date", True),
+            ("all offers", db.query(Offer), "ix_offers_date_created", True),
+        ]
+        failures = 0
+        try:
+            with engine.connect() as conn:
+                for name, q, index, ordered in cases:
+                    page = q.order_by(*listing_order).limit(20)
+                    plan = _explain(conn, page)
+                    start = time.perf_counter()
+                    page.all()
+                    page_ms = (time.perf_counter() - start) * 1000
+                    start = time.perf_counter()
+                    q.count()
+                    count_ms = (time.perf_counter() - start) * 1000
+
+                    problems = []
+                    if not any(index in line for line in plan):
+                        problems.append(f"does not use {index}")
+                    if ordered and any("TEMP B-TREE FOR ORDER BY" in line for line in plan):
+                        problems.append("sorts instead of reading the index in order")
+                    failures += bool(problems)
+                    print(f"\n{name}: page {page_ms:.1f} ms, count {count_ms:.1f} ms"
+                          f"{'  FAIL: ' + ', '.join(problems) if problems else ''}")
+                    for line in plan:
+                        print(f"  {line}")
+        finally:
+            db.close()
+        return 1 if failures else 0
+    finally:
+        os.remove(path)
+
+
+def bench_search(args):
+    """Leading-wildcard ILIKE vs the full-text index, at each fixture size"""
+    queries = ["développeur", "developpeur python", "devops", "Stage data analyst 4242", "Entreprise 42"]
+    failures = 0
+    for rows in args.rows:
+        path = _use_temp_database()
+        try:
+            # Re-import so each size gets an engine on its own database
+            for name in ("database", "models", "search", "scheduler", "app"):
+                sys.modules.pop(name, None)
+            from werkzeug.datastructures import MultiDict
+            from app import apply_offer_filters
+            from database import get_db_session, init_db
+            from models import Offer
+            from search import search_terms
+
+            init_db()
+            start = time.perf_counter()
+            _fill_offers_fixture(rows)
+            print(f"\nfixture: {rows} offers in {time.perf_counter() - start:.1f}s")
+            listing_order = (Offer.date_posted_parsed.desc().nulls_last(), Offer.created_at.desc())
+
+            db = get_db_session()
+            try:
+                for query in queries:
+                    ilike = db.query(Offer)
+                    for term in search_terms(query):
+                        ilike = ilike.filter(Offer.title.ilike(f"%{term}%") | Offer.company.ilike(f"%{term}%"))
+                    fts = apply_offer_filters(db.query(Offer), MultiDict({"q": query}))
+                    results = []
+                    for q in (ilike, fts):
+                        start = time.perf_counter()
+                        q.order_by(*listing_order).limit(20).all()
+                        total = q.count()
+                        results.append(((time.perf_counter() - start) * 1000, total))
+                    (ilike_ms, ilike_total), (fts_ms, fts_total) = results
+                    failures += bool(ilike_total and not fts_total)
+                    print(f"  {query!r:28} ILIKE {ilike_ms:8.1f} ms {ilike_total:7d} hits   "
+                          f"FTS {fts_ms:8.1f} ms {fts_total:7d} hits")
+            finally:
+                db.close()
+        finally:
+            os.remove(path)
+    return 1 if failures else 0
+
+
+def bench_paging(args):
+    """OFFSET vs keyset pagination latency from the first page to deep pages"""
+    path = _use_temp_database()
+    try:
+        from database import get_db_session, init_db
+        from models import Offer
+        from pagination import LISTING_ORDER, encode_cursor, keyset_page, sort_key
+
+        init_db()
+        start = time.perf_counter()
+        _fill_offers_fixture(args.rows)
+        print(f"fixture: {args.rows} offers in {time.perf_counter() - start:.1f}s")
+
+        limit = 20
+        db = get_db_session()
+        try:
+            listings = [("all offers", db.query(Offer)),
+                        ("country page", db.query(Offer).filter(Offer.country_code == "FR"))]
+            for name, q in listings:
+                print(f"\n{name}")
+                for page in args.pages:
+                    offset = (page - 1) * limit
+                    # The cursor a user would hold after reaching this page
+                    previous = q.order_by(*LISTING_ORDER).offset(offset - 1).limit(1).first() if offset else None
+                    if offset and previous is None:
+                        continue
+                    cursor = encode_cursor(sort_key(previous)) if previous else None
+
+                    start = time.perf_counter()
+                    by_offset = q.order_by(*LISTING_ORDER).offset(offset).limit(limit).all()
+                    q.count()
+                    offset_ms = (time.perf_counter() - start) * 1000
+
+                    start = time.perf_counter()
+                    by_cursor, _, _ = keyset_page(q, limit, cursor)
+                    keyset_ms = (time.perf_counter() - start) * 1000
+
+                    same = [o.id for o in by_offset] == [o.id for o in by_cursor]
+                    print(f"  page {page:6d}: OFFSET + count {offset_ms:8.1f} ms   keyset {keyset_ms:6.2f} ms"
+                          f"{'' if same else '  MISMATCH'}")
+                    if not same:
+                        return 1
+        finally:
+            db.close()
+        return 0
+    finally:
+        os.remove(path)
+
+
+def bench_facets(args):
+    """DISTINCT scans for the dropdowns vs the facet table and its cache"""
+    path = _use_temp_database()
+    try:
+        from database import get_db_session, init_db
+        from models import Offer
+        import facets
+
+        init_db()
+        _fill_offers_fixture(args.rows)
+        db = get_db_session()
+        try:
+            start = time.perf_counter()
+            facets.rebuild_facets(db)
+            print(f"fixture: {args.rows} offers, facets rebuilt in {time.perf_counter() - start:.2f}s")
+
+            def legacy():
+                [row[0] for row in db.query(Offer.location).filter(Offer.country.ilike("%France%")).distinct().all()]
+                [row[0] for row in db.query(Offer.country).distinct().all()]
+
+            def facet_table():
+                facets._cache.clear()
+                facets.get_facets(db, "FR")
+                facets.get_facets(db)
+
+            def cached():
+                facets.get_facets(db, "FR")
+                facets.get_facets(db)
+
+            for name, fn in (("DISTINCT scans", legacy), ("facet table", facet_table), ("cached facets", cached)):
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    fn()
+                print(f"{name:15} {(time.perf_counter() - start) * 1000 / args.repeat:8.2f} ms per page view")
+        finally:
+            db.close()
+        return 0
+    finally:
+        os.remove(path)
+
+
+def bench_stats(args):
+    """/stats aggregates: GROUP BY over the full history vs the rollup tables"""
+    path = _use_temp_database()
+    try:
+        from datetime import datetime, timedelta
+        from sqlalchemy import func
+        from database import engine, get_db_session, init_db
+        from models import Offer, ScrapingStat
+        import rollups
+
+        init_db()
+        _fill_offers_fixture(args.rows)
+        now = datetime.now()
+        countries = ["Maroc", "France", "Canada", "Belgique", "Suisse"]
+        with engine.begin() as conn:
+            conn.execute(ScrapingStat.__table__.insert(), [
+                {"country": countries[i % 5], "offers_found": 15, "offers_inserted": i % 4,
+                 "execution_time": now - timedelta(minutes=15 * i // 5), "duration_seconds": 20 + i % 9}
+                for i in range(args.runs)
+            ])
+        db = get_db_session()
+        try:
+            start = time.perf_counter()
+            rollups.rebuild_rollups(db)
+            print(f"fixture: {args.rows} offers, {args.runs} scrape runs; "
+                  f"rollups rebuilt in {time.perf_counter() - start:.2f}s")
+
+            def legacy():
+                db.query(func.count(Offer.id)).scalar()
+                db.query(Offer.company, func.count(Offer.id)).group_by(Offer.company) \
+                    .order_by(func.count(Offer.id).desc()).limit(5).all()
+                db.query(Offer.location, func.count(Offer.id)).group_by(Offer.location) \
+                    .order_by(func.count(Offer.id).desc()).limit(10).all()
+                db.query(ScrapingStat.country, func.count(ScrapingStat.id), func.sum(ScrapingStat.offers_found),
+                         func.sum(ScrapingStat.offers_inserted), func.avg(ScrapingStat.duration_seconds)) \
+                    .group_by(ScrapingStat.country).all()
+
+            def rolled_up():
+                rollups.total_offers(db)
+                rollups.top_values(db, "company", 5)
+                rollups.top_values(db, "location", 10)
+                rollups.scraping_summary(db)
+
+            for name, fn in (("GROUP BY", legacy), ("rollups", rolled_up)):
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    fn()
+                print(f"{name:9} {(time.perf_counter() - start) * 1000 / args.repeat:8.2f} ms per /stats view")
+        finally:
+            db.close()
+        return 0
+    finally:
+        os.remove(path)
+
+
+def bench_stream(args):
+    """Scrape-then-insert vs the streaming ingest pipeline, against scraper.fake_indeed"""
+    import tracemalloc
+
+    path = _use_temp_database()
+    os.environ["INDEED_REQUESTS_PER_MINUTE"] = "1000000"
+    os.environ["INDEED_REQUEST_BURST"] = "1000"
+    os.environ["PAGE_ARCHIVE_MAX_MB"] = "0"
+    from scraper.fake_indeed import start_fake_indeed
+
+    server, base_url = start_fake_indeed(latency=args.latency, cards_per_page=args.cards)
+    os.environ["INDEED_BASE_URL"] = base_url
+    try:
+        from database import get_db_session, init_db
+        from models import Offer
+        from scraper.indeed_scraper import iter_scrape_with_async_requests
+        import scheduler
+
+        init_db()
+        insert_new_offers = scheduler.insert_new_offers
+        commits = []
+
+        def timed_insert(offers, country=None, today=None, stats=None):
+            result = insert_new_offers(offers, country, today, stats=stats)
+            commits.append(time.perf_counter())
+            return result
+
+        scheduler.insert_new_offers = timed_insert
+
+        def pages():
+            # One page in flight at a time, like the Selenium crawl
+            return iter_scrape_with_async_requests(args.pages, 0.0, "Maroc", concurrency=1)
+
+        def collected():
+            offers = [offer for page in pages() for offer in page]
+            return scheduler.insert_new_offers(offers, "Maroc")[0]
+
+        def streamed():
+            return scheduler.ingest_pages(pages(), "Maroc")["inserted"]
+
+        print(f"pages: {args.pages}, {args.cards} offers per page, latency: {args.latency}s")
+        for name, fn in (("scrape, then insert", collected), ("streamed ingest", streamed)):
+            db = get_db_session()
+            db.query(Offer).delete()
+            db.commit()
+            db.close()
+            commits.clear()
+            tracemalloc.start()
+            start = time.perf_counter()
+            inserted = fn()
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{name:20} {elapsed:6.2f}s total, first offers committed after {commits[0] - start:6.2f}s, "
+                  f"{inserted} inserted, peak traced memory {peak / 1024 / 1024:6.1f} MB")
+        return 0
+    finally:
+        server.shutdown()
+        os.remove(path)
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0.0
+
+
+def _concurrency_run(args):
+    """Child process: readers and writers against one database, with SQLITE_TUNED as set by the parent"""
+    import json
+    import logging
+    import threading
+
+    path = _use_temp_database()
+    from database import get_db_session, init_db
+    from models import Offer
+    from pagination import LISTING_ORDER
+    from scraper.locations import COUNTRY_CODES
+    import scheduler
+
+    try:
+        init_db()
+        _fill_offers_fixture(args.rows)
+        # Failed batches are counted below; their tracebacks would drown the report
+        logging.getLogger("scheduler").setLevel(logging.CRITICAL)
+        codes = list(COUNTRY_CODES.values())
+        countries = list(COUNTRY_CODES)
+        stop = threading.Event()
+        reads, read_errors, writes, failed_writes = [], [], [], []
+
+        def reader(n):
+            rng = random.Random(n)
+            while not stop.is_set():
+                start = time.perf_counter()
+                db = get_db_session()
+                try:
+                    db.query(Offer).filter(Offer.country_code == rng.choice(codes)) \
+                        .order_by(*LISTING_ORDER).limit(20).all()
+                    reads.append(time.perf_counter() - start)
+                except Exception as e:
+                    read_errors.append(str(e))
+                finally:
+                    db.close()
+
+        def writer(n):
+            seq = 0
+            while not stop.is_set():
+                batch = [{
+                    "title": f"Stagiaire {n}-{seq}-{i}",
+                    "company": f"Entreprise {i}",
+                    "location": "Casablanca",
+                    "date_posted": "il y a 2 jours",
+                    "link": f"https://ma.indeed.com/viewjob?jk=w{n}s{seq}i{i}",
+                } for i in range(args.batch)]
+                seq += 1
+                start = time.perf_counter()
+                inserted, _ = scheduler.insert_new_offers(batch, countries[n % len(countries)])
+                (writes if inserted else failed_writes).append(time.perf_counter() - start)
+                time.sleep(args.write_interval)
+
+        threads = [threading.Thread(target=reader, args=(n,)) for n in range(args.readers)]
+        threads += [threading.Thread(target=writer, args=(n,)) for n in range(args.writers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        print(json.dumps({
+            "reads": len(reads),
+            "read_p50": _percentile(reads, 0.5),
+            "read_p99": _percentile(reads, 0.99),
+            "read_max": max(reads, default=0.0),
+            "read_errors": len(read_errors),
+            "batches": len(writes),
+            "failed_batches": len(failed_writes),
+            "write_p99": _percentile(writes, 0.99),
+        }))
+        return 0
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+def bench_concurrency(args):
+    """Read latency while scheduler threads ingest batches: default SQLite settings vs WAL + write lane"""
+    if args.variant:
+        return _concurrency_run(args)
+    import json
+
+    print(f"{args.readers} readers, {args.writers} writers inserting {args.batch}-offer batches every "
+          f"{args.write_interval * 1000:.0f} ms, {args.rows:,} offers, {args.seconds:g}s per mode")
+    for mode, tuned in (("default journal", "0"), ("WAL + write lane", "1")):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "concurrency", "--variant", mode,
+             "--readers", str(args.readers), "--writers", str(args.writers), "--seconds", str(args.seconds),
+             "--rows", str(args.rows), "--batch", str(args.batch), "--write-interval", str(args.write_interval)],
+            env=dict(os.environ, SQLITE_TUNED=tuned), capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        r = json.loads(out)
+        print(f"{mode:17} reads {r['reads'] / args.seconds:7.0f}/s  p50 {r['read_p50'] * 1000:6.2f} ms  "
+              f"p99 {r['read_p99'] * 1000:7.2f} ms  max {r['read_max'] * 1000:7.1f} ms  "
+              f"read errors {r['read_errors']}  |  batches {r['batches']} "
+              f"(failed {r['failed_batches']}), write p99 {r['write_p99'] * 1000:6.1f} ms")
+    return 0
+
+
+def _legacy_api_offers(db, args, limit):
+    """/api/offers as it was before the column-projected read path, kept as a baseline"""
+    from flask import jsonify
+    from app import apply_offer_filters, country_filter, paginate_offers
+    from models import Offer
+
+    q = db.query(Offer)
+    if args.get("country"):
+        q = q.filter(country_filter(args["country"]))
+    q = apply_offer_filters(q, args)
+    listing = paginate_offers(q, args, limit, "api_offers")
+    return jsonify({
+        "page": listing["page"],
+        "limit": limit,
+        "total": listing["total"],
+        "items": [
+            {
+                "id": o.id,
+                "title": o.title,
+                "company": o.company,
+                "location": o.location,
+                "country": o.country,
+                "country_code": o.country_code,
+                "city": o.city,
+                "date_posted": o.date_posted,
+                "date_posted_parsed": o.date_posted_parsed.isoformat() if o.date_posted_parsed is not None else None,
+                "link": o.link,
+                "created_at": o.created_at.isoformat(),
+            }
+            for o in listing["offers"]
+        ],
+        "next_cursor": listing["next_cursor"],
+        "prev_cursor": listing["prev_cursor"],
+    })
+
+
+def bench_api(args):
+    """/api/offers?limit=100 requests per second: ORM entities + jsonify vs listing rows + orjson"""
+    path = _use_temp_database()
+    os.environ["SCHEDULER_MODE"] = "off"
+    try:
+        import json
+        from flask import request
+        from database import get_db_session
+        from app import create_app
+        import listings
+
+        app = create_app()
+        _fill_offers_fixture(args.rows)
+
+        @app.route("/bench/legacy-offers")
+        def legacy_offers():
+            db = get_db_session()
+            try:
+                limit = min(max(int(request.args.get("limit", 20)), 1), 100)
+                return _legacy_api_offers(db, request.args, limit)
+            finally:
+                db.close()
+
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["user_id"] = 1
+        print(f"fixture: {args.rows} offers, {args.requests} requests per variant "
+              f"({'orjson' if listings.ORJSON_AVAILABLE else 'json'} encoder)")
+
+        bodies = {}
+        for name, url in (("ORM + jsonify", "/bench/legacy-offers"), ("rows + orjson", "/api/offers")):
+            for query in ("limit=100", "limit=100&country=France"):
+                response = client.get(f"{url}?{query}")
+                assert response.status_code == 200, response.data
+                bodies.setdefault(query, []).append(json.loads(response.data))
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                client.get(f"{url}?limit=100")
+            elapsed = time.perf_counter() - start
+            print(f"{name:14} {args.requests / elapsed:8.0f} req/s  {elapsed * 1000 / args.requests:6.2f} ms per request")
+        for query, (legacy, projected) in bodies.items():
+            if legacy != projected:
+                print(f"MISMATCH: {query} responses differ")
+                return 1
+        return 0
+    finally:
+        os.remove(path)
+
+
+# Scraping dependencies a web worker must not import at boot
+LAZY_MODULES = ("selenium", "webdriver_manager", "requests", "bs4", "aiohttp", "lxml")
+
+
+def _import_wsgi(env):
+    """Import wsgi in a fresh interpreter under -X importtime; {module: cumulative µs}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import wsgi"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, module = line[len("import time:"):].split("|")
+        if cumulative_us.strip().isdigit():
+            cumulative[module.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def bench_importtime(args):
+    """Boot cost of a web worker: `import wsgi` (imports plus create_app), against a budget"""
+    path = _use_temp_database()
+    env = dict(os.environ, SCHEDULER_MODE="off", PAGE_ARCHIVE_MAX_MB="0", BOOT_DEBUG="")
+    try:
+        # The first boot creates the tables; a worker restart finds them
+        _import_wsgi(env)
+        runs = [_import_wsgi(env) for _ in range(args.runs)]
+    finally:
+        os.remove(path)
+    best = min(runs, key=lambda modules: modules["wsgi"])
+    best_ms = best["wsgi"] / 1000
+    print(f"import wsgi: best {best_ms:.0f} ms, median "
+          f"{sorted(run['wsgi'] for run in runs)[len(runs) // 2] / 1000:.0f} ms over {args.runs} runs "
+          f"(budget {args.budget_ms:.0f} ms)")
+    top_level = sorted(((us, name) for name, us in best.items() if "." not in name and name != "wsgi"), reverse=True)
+    for us, name in top_level[:args.top]:
+        print(f"  {name:24} {us / 1000:7.1f} ms")
+
+    eager = sorted(name for name in best if name.split(".")[0] in LAZY_MODULES)
+    if eager:
+        print(f"FAIL: imported at boot: {', '.join(eager[:10])}")
+    if best_ms > args.budget_ms:
+        print(f"FAIL: import wsgi takes {best_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+    return 1 if eager or best_ms > args.budget_ms else 0
+
+
+BENCHMARKS = {
+    "ingest": bench_ingest,
+    "fetch": bench_fetch,
+    "cards": bench_cards,
+    "pages": bench_pages,
+    "dates": bench_dates,
+    "locations": bench_locations,
+    "plans": bench_plans,
+    "search": bench_search,
+    "paging": bench_paging,
+    "facets": bench_facets,
+    "stats": bench_stats,
+    "stream": bench_stream,
+    "importtime": bench_importtime,
+    "concurrency": bench_concurrency,
+    "api": bench_api,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    ingest = sub.add_parser("ingest", help="bulk insert vs per-row insert")
+    ingest.add_argument("--offers", type=int, default=10000)
+
+    fetch = sub.add_parser("fetch", help="asyncio fetch engine vs sequential requests")
+    fetch.add_argument("--pages", type=int, default=20)
+    fetch.add_argument("--concurrency", type=int, default=5)
+    fetch.add_argument("--latency", type=float, default=0.2)
+    fetch.add_argument("--throttle-every", type=int, default=0)
+
+    cards = sub.add_parser("cards", help="job card extraction throughput and parity")
+    cards.add_argument("pages", nargs="*", help="saved Indeed result pages (default: fake pages)")
+
+    pages = sub.add_parser("pages", help="full-page vs card-only parsing, time and memory")
+    pages.add_argument("pages", nargs="*", help="saved Indeed result pages (default: fake pages)")
+    pages.add_argument("--variant", help=argparse.SUPPRESS)
+
+    dates = sub.add_parser("dates", help="date string parsing throughput")
+    dates.add_argument("--count", type=int, default=100000)
+
+    locations = sub.add_parser("locations", help="location to country resolution throughput and parity")
+    locations.add_argument("--count", type=int, default=100000)
+
+    plans = sub.add_parser("plans", help="offer listing query plans on a large fixture")
+    plans.add_argument("--rows", type=int, default=1000000)
+
+    search = sub.add_parser("search", help="full-text search vs ILIKE latency")
+    search.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+
+    paging = sub.add_parser("paging", help="OFFSET vs keyset pagination from page 1 to deep pages")
+    paging.add_argument("--rows", type=int, default=1000000)
+    paging.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000, 5000, 20000])
+
+    facets = sub.add_parser("facets", help="dropdown data: DISTINCT scans vs cached facets")
+    facets.add_argument("--rows", type=int, default=200000)
+    facets.add_argument("--repeat", type=int, default=20)
+
+    stats = sub.add_parser("stats", help="/stats aggregates: GROUP BY vs rollup tables")
+    stats.add_argument("--rows", type=int, default=200000)
+    stats.add_argument("--runs", type=int, default=50000)
+    stats.add_argument("--repeat", type=int, default=10)
+
+    stream = sub.add_parser("stream", help="time to first commit and peak memory of a scrape run")
+    stream.add_argument("--pages", type=int, default=30)
+    stream.add_argument("--cards", type=int, default=15)
+    stream.add_argument("--latency", type=float, default=0.2)
+
+    importtime = sub.add_parser("importtime", help="web worker boot time (python -X importtime), against a budget")
+    importtime.add_argument("--budget-ms", type=float, default=1000)
+    importtime.add_argument("--runs", type=int, default=5)
+    importtime.add_argument("--top", type=int, default=10)
+
+    concurrency = sub.add_parser("concurrency", help="read p99 under concurrent ingest: default SQLite vs WAL + write lane")
+    concurrency.add_argument("--readers", type=int, default=8)
+    concurrency.add_argument("--writers", type=int, default=5)
+    concurrency.add_argument("--seconds", type=float, default=10)
+    concurrency.add_argument("--rows", type=int, default=100000)
+    concurrency.add_argument("--batch", type=int, default=50)
+    concurrency.add_argument("--write-interval", type=float, default=0.02)
+    concurrency.add_argument("--variant", help=argparse.SUPPRESS)
+
+    api = sub.add_parser("api", help="/api/offers?limit=100 req/s: ORM entities vs column-projected rows")
+    api.add_argument("--rows", type=int, default=100000)
+    api.add_argument("--requests", type=int, default=500)
+
+    args = parser.parse_args(argv)
+    return BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,13 @@
+import hashlib
 import os
-from sqlalchemy import create_engine
+import queue
+import tempfile
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import wraps
+
+from sqlalchemy import and_, bindparam, create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 
@@ -14,21 +22,48 @@ else:
 
 DATABASE_URL = os.environ.get("DATABASE_URL", f"sqlite:///{DATABASE_PATH}")
 
-print(f"Database URL: {DATABASE_URL}")
-print(f"Database path: {DATABASE_PATH}")
-if os.path.exists(DATABASE_PATH):
-    print("Database file exists")
-else:
-    print("Database file does NOT exist")
+# Boot diagnostics (database location, wsgi environment dump) only when asked for
+BOOT_DEBUG = os.environ.get("BOOT_DEBUG", "").lower() in ("1", "true", "yes", "on")
+
+if BOOT_DEBUG:
+    print(f"Database URL: {DATABASE_URL}")
+    print(f"Database path: {DATABASE_PATH}")
+    if os.path.exists(DATABASE_PATH):
+        print("Database file exists")
+    else:
+        print("Database file does NOT exist")
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+# SQLite concurrency profile: WAL journal, synchronous=NORMAL, busy timeout,
+# memory-mapped reads and serialized scheduler writes (SQLITE_TUNED=0 turns it off)
+SQLITE_TUNED = IS_SQLITE and os.environ.get("SQLITE_TUNED", "1").lower() not in ("0", "false", "no", "off")
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_MB = int(os.environ.get("SQLITE_MMAP_MB", "256"))
 
 # For SQLite, need check_same_thread=False for multithreaded scheduler access
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
+    connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000} if IS_SQLITE else {},
     pool_pre_ping=True,
     echo=False,  # Set to True for SQL debugging
 )
 
+
+if SQLITE_TUNED:
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        """Readers no longer wait for writers (WAL), and commits skip the fsync
+        of every transaction (synchronous=NORMAL is durable up to the last
+        checkpoint in WAL mode)."""
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_MB * 1024 * 1024}")
+        finally:
+            cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -37,7 +72,269 @@ def get_db_session():
     return SessionLocal()
 
 
+class WriteLane:
+    """
+    One thread running the write functions submitted to it, one at a time.
+
+    SQLite has a single writer lock: scheduler threads committing at once
+    queue up on it inside busy-timeout sleeps, and readers of a rollback
+    journal wait behind them. Funneling the writes through one thread makes
+    them take turns in order instead. With another database, or with
+    SQLITE_TUNED=0, run() calls the function directly.
+    """
+
+    def __init__(self, enabled: bool = True, name: str = "db-writer"):
+        self.enabled = enabled
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _work(self):
+        while True:
+            future, fn, args, kwargs = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name=self.name, daemon=True)
+                self._thread.start()
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def run(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs) on the lane, waiting for its result"""
+        if not self.enabled or threading.current_thread() is self._thread:
+            # A write made from inside the lane would wait for itself
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+
+write_lane = WriteLane(enabled=SQLITE_TUNED)
+
+
+def serialized_write(fn):
+    """Decorator running every call of `fn` on the write lane"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        return write_lane.run(fn, *args, **kwargs)
+    return wrapper
+
+
+def increment_counters(db, table, key_columns, rows):
+    """Add the counter values of `rows` onto the rows of `table` with the same
+    key, inserting keys that do not exist yet. Every row dict holds the key
+    columns plus the counter columns."""
+    if not rows:
+        return
+    counters = [name for name in rows[0] if name not in key_columns]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={name: table.c[name] + stmt.excluded[name] for name in counters},
+        )
+        db.execute(stmt, rows)
+        return
+
+    for row in rows:
+        key = and_(*(table.c[name] == row[name] for name in key_columns))
+        updated = db.execute(
+            table.update().where(key).values({name: table.c[name] + row[name] for name in counters})
+        ).rowcount
+        if not updated:
+            db.execute(table.insert().values(row))
+
+
+def _add_missing_columns():
+    """create_all() only creates missing tables; add columns introduced since
+    an existing database was created, so upgrades need no manual migration.
+    A column that needs its existing rows filled records a pending migration
+    in the same transaction. Returns the (table, column) names added."""
+    from models import PendingMigration
+
+    added = set()
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+                added.add((table.name, column.name))
+                print(f"Added column {table.name}.{column.name}")
+                migration = DATA_MIGRATIONS.get((table.name, column.name))
+                if migration:
+                    upto_id = conn.execute(text(f"SELECT MAX(id) FROM {table.name}")).scalar()
+                    if upto_id is not None:
+                        conn.execute(PendingMigration.__table__.insert().values(name=migration, upto_id=upto_id))
+    return added
+
+
+def _create_missing_indexes():
+    """create_all() skips indexes of tables that already exist"""
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+
+# Rows updated per statement while backfilling
+BACKFILL_BATCH = 1000
+
+# Added columns whose existing rows a data migration fills: (table, column) -> migration
+DATA_MIGRATIONS = {("offers", "country_code"): "offer_locations"}
+
+# Arbitrary 64-bit key of the PostgreSQL advisory lock taken around init_db()
+MIGRATION_LOCK_KEY = 0x1A7E5C4EE
+
+
+@contextmanager
+def migration_lock():
+    """
+    Hold off every other process sharing the database until the block ends.
+
+    Each gunicorn worker runs init_db() as it boots; two of them creating
+    tables or adding the same column at once fail. PostgreSQL takes a
+    blocking advisory lock; otherwise an flock() on a file in the temp
+    directory, named after the database, serializes the processes of a host.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn.exec_driver_sql(f"SELECT pg_advisory_lock({MIGRATION_LOCK_KEY})")
+            try:
+                yield
+            finally:
+                conn.exec_driver_sql(f"SELECT pg_advisory_unlock({MIGRATION_LOCK_KEY})")
+        return
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        yield
+        return
+    digest = hashlib.sha1(DATABASE_URL.encode("utf-8")).hexdigest()[:12]
+    with open(os.path.join(tempfile.gettempdir(), f"internship-migrate-{digest}.lock"), "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _backfill_offer_locations():
+    """Fill country_code/city for offers stored before those columns existed.
+
+    Only offers up to the last one present at the upgrade are touched, as
+    recorded by its pending migration: offers stored since can legitimately
+    have no country code. Offers with no recognisable country predate
+    multi-country scraping, which only covered Morocco, so they get MA.
+    Facets and rollups are then rebuilt from the updated offers. The
+    migration is cleared last, so a boot interrupted anywhere retries it.
+    """
+    from facets import rebuild_facets
+    from rollups import rebuild_rollups
+    from models import Offer, PendingMigration
+    from scraper.locations import country_code, resolve_location
+
+    offers = Offer.__table__
+    pending = PendingMigration.__table__
+    with engine.begin() as conn:
+        upto_id = conn.execute(
+            pending.select().with_only_columns(pending.c.upto_id).where(pending.c.name == "offer_locations")
+        ).scalar()
+    if upto_id is None:
+        return
+    with engine.begin() as conn:
+        rows = conn.execute(
+            offers.select().with_only_columns(offers.c.id, offers.c.location, offers.c.country)
+            .where(offers.c.country_code.is_(None), offers.c.id <= upto_id)
+        ).all()
+        updates = []
+        for row in rows:
+            resolved = resolve_location(row.location)
+            country = row.country or resolved.country
+            updates.append({
+                "row_id": row.id,
+                "country_code": country_code(country) or "MA",
+                "city": resolved.city if resolved.country == country else None,
+            })
+        stmt = (
+            offers.update()
+            .where(offers.c.id == bindparam("row_id"))
+            .values(country_code=bindparam("country_code"), city=bindparam("city"))
+        )
+        for start in range(0, len(updates), BACKFILL_BATCH):
+            conn.execute(stmt, updates[start:start + BACKFILL_BATCH])
+    print(f"Backfilled country_code/city for {len(updates)} offers")
+    db = SessionLocal()
+    try:
+        rebuild_facets(db)
+        rebuild_rollups(db)
+    finally:
+        db.close()
+    with engine.begin() as conn:
+        conn.execute(pending.delete().where(pending.c.name == "offer_locations"))
+
+
+def _canonicalize_offer_cities():
+    """Rewrite stored cities to their canonical spelling ("Fes" -> "Fès").
+
+    Offers stored before accent variants were merged split one city in two
+    for the facets and the city filter. The distinct cities are read from the
+    small facet table, so a database with nothing to rewrite costs one query.
+    """
+    from facets import rebuild_facets
+    from models import Offer, OfferFacet
+    from scraper.locations import canonical_city
+
+    offers, facet_table = Offer.__table__, OfferFacet.__table__
+    with engine.begin() as conn:
+        stored = conn.execute(
+            facet_table.select().with_only_columns(facet_table.c.value)
+            .where(facet_table.c.kind == "city").distinct()
+        ).scalars().all()
+        renames = {city: canonical_city(city) for city in stored}
+        renames = {old: new for old, new in renames.items() if new and new != old}
+        for old, new in renames.items():
+            conn.execute(offers.update().where(offers.c.city == old).values(city=new))
+    if renames:
+        print(f"Renamed cities to their canonical spelling: {renames}")
+        db = SessionLocal()
+        try:
+            rebuild_facets(db)
+        finally:
+            db.close()
+
+
 def init_db():
-    from models import Offer, User, ScrapingStat  # noqa: F401
-    Base.metadata.create_all(bind=engine)
+    from models import Offer, User, ScrapingStat, OfferFacet, DataVersion, OfferRollup, ScrapeRollup, SchedulerState, ScrapeJob, PendingMigration  # noqa: F401
+    from search import init_search
+    from facets import ensure_facets
+    from rollups import ensure_rollups
+    # Every worker migrates as it boots; one at a time, and the later ones find nothing to do
+    with migration_lock():
+        Base.metadata.create_all(bind=engine)
+        _add_missing_columns()
+        _create_missing_indexes()
+        _backfill_offer_locations()
+        init_search(engine)
+        ensure_facets(SessionLocal)
+        _canonicalize_offer_cities()
+        ensure_rollups(SessionLocal)
     print("Database initialized")
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+Server-Sent Events for the scheduler countdown and scrape results.
+
+One hub thread per process polls the small scheduler_state, scrape_jobs and
+scraping_stats tables every EVENTS_POLL_SECONDS while at least one /events
+stream is open, and pushes what changed to every subscriber. The cost is one
+set of primary-key or indexed lookups per process, however many tabs are
+open. Events:
+
+    schedule  {"next_runs": {job_id: iso}, "running": [job_id]}
+    queue     {"jobs": [scrape_queue.to_dict(job)]}   queued and running manual scrapes
+    scrape    {"country", "offers_found", "offers_inserted", "finished_at"}
+
+Each open stream holds one worker thread for as long as it lasts, so a
+process serves at most EVENTS_MAX_STREAMS of them and answers further ones
+with 204: EventSource gives up on that and timer.js polls /timer-info, a
+short request, instead. Keep EVENTS_MAX_STREAMS well below the threads per
+worker or page requests queue behind the streams. Streams end after
+EVENTS_STREAM_SECONDS and EventSource reconnects, which spreads tabs over
+the workers again.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import timezone
+from typing import Optional
+
+from sqlalchemy import func
+
+from database import get_db_session
+from models import SchedulerState, ScrapeJob, ScrapingStat
+import scrape_queue
+
+logger = logging.getLogger(__name__)
+
+EVENTS_POLL_SECONDS = float(os.environ.get("EVENTS_POLL_SECONDS", "2"))
+EVENTS_STREAM_SECONDS = float(os.environ.get("EVENTS_STREAM_SECONDS", "300"))
+EVENTS_MAX_STREAMS = int(os.environ.get("EVENTS_MAX_STREAMS", "8"))
+KEEPALIVE_SECONDS = 15
+RECONNECT_MILLISECONDS = 3000
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def _iso_utc(value):
+    return value.replace(tzinfo=timezone.utc).isoformat() if value else None
+
+
+def format_event(name: str, data) -> str:
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class Subscriber(queue.Queue):
+    """(event, data) pairs for one stream; `dropped` once the hub gave up on it"""
+
+    def __init__(self):
+        super().__init__(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.dropped = False
+
+
+class EventHub:
+    def __init__(self, poll_seconds: float = EVENTS_POLL_SECONDS, max_subscribers: int = EVENTS_MAX_STREAMS):
+        self.poll_seconds = poll_seconds
+        self.max_subscribers = max_subscribers
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+        self._schedule = None
+        self._queue = None
+        self._last_stat_id = None
+
+    def subscribe(self) -> Optional[Subscriber]:
+        """A queue receiving (event, data) pairs, starting with the current state;
+        None when max_subscribers streams are already open"""
+        subscriber = Subscriber()
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            if self._schedule is None:
+                self._poll()
+            subscriber.put(("schedule", self._schedule))
+            subscriber.put(("queue", self._queue))
+            self._subscribers.add(subscriber)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="event-hub", daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _publish(self, name: str, data):
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.put_nowait((name, data))
+            except queue.Full:
+                # A stalled client; drop it rather than buffer without bound.
+                # Its stream ends, and the reconnect starts from fresh state.
+                subscriber.dropped = True
+                self._subscribers.discard(subscriber)
+
+    def _poll(self):
+        """Read the shared state and publish what changed; called with the lock held"""
+        db = get_db_session()
+        try:
+            states = db.query(SchedulerState).order_by(SchedulerState.job_id).all()
+            schedule = {
+                "next_runs": {state.job_id: _iso_utc(state.next_run_time) for state in states},
+                "running": [state.job_id for state in states if state.running],
+            }
+            jobs = (
+                db.query(ScrapeJob)
+                .filter(ScrapeJob.active_country.isnot(None))
+                .order_by(ScrapeJob.id)
+                .all()
+            )
+            active = {"jobs": [scrape_queue.to_dict(job) for job in jobs]}
+
+            if self._last_stat_id is None:
+                # Only runs that finish from now on are news
+                self._last_stat_id = db.query(func.max(ScrapingStat.id)).scalar() or 0
+                finished = []
+            else:
+                finished = (
+                    db.query(ScrapingStat)
+                    .filter(ScrapingStat.id > self._last_stat_id)
+                    .order_by(ScrapingStat.id)
+                    .all()
+                )
+        finally:
+            db.close()
+
+        if schedule != self._schedule:
+            self._schedule = schedule
+            self._publish("schedule", schedule)
+        if active != self._queue:
+            self._queue = active
+            self._publish("queue", active)
+        for stat in finished:
+            self._last_stat_id = stat.id
+            self._publish("scrape", {
+                "country": stat.country,
+                "offers_found": stat.offers_found,
+                "offers_inserted": stat.offers_inserted,
+                "finished_at": stat.execution_time.isoformat() if stat.execution_time else None,
+            })
+
+    def _run(self):
+        with self._lock:
+            while True:
+                while not self._subscribers:
+                    # Nobody listening: stop polling until the next subscriber.
+                    # The state is forgotten so that one starts from fresh data.
+                    self._schedule = None
+                    self._last_stat_id = None
+                    self._wakeup.wait()
+                self._wakeup.wait(self.poll_seconds)
+                if not self._subscribers:
+                    continue
+                try:
+                    self._poll()
+                except Exception as e:
+                    logger.error(f"Event hub poll failed: {e}")
+
+
+hub = EventHub()
+
+
+def stream(subscriber: Subscriber, lifetime: float = EVENTS_STREAM_SECONDS):
+    """Body of a text/event-stream response for a hub.subscribe() subscriber"""
+    try:
+        yield f"retry: {RECONNECT_MILLISECONDS}\n\n"
+        deadline = time.monotonic() + lifetime
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or subscriber.dropped:
+                return
+            try:
+                name, data = subscriber.get(timeout=min(KEEPALIVE_SECONDS, remaining))
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(name, data)
+    finally:
+        hub.unsubscribe(subscriber)
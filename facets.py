@@ -0,0 +1,144 @@
+"""
+City and company facets for the offer listing dropdowns.
+
+offer_facets holds the number of offers per (country_code, city) and
+(country_code, company). insert_new_offers() adds the rows it writes in the
+same transaction and bumps the "offers" data version. Listing pages read
+facets from an in-process cache that is reloaded only when that version
+changes, so rendering a page never scans offers.
+"""
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from database import increment_counters
+from models import DataVersion, Offer, OfferFacet
+from scraper.locations import COUNTRY_CODES
+
+OFFERS_VERSION = "offers"
+FACET_KINDS = ("city", "company")
+COUNTRY_NAMES = {code: name for name, code in COUNTRY_CODES.items()}
+
+_cache: Dict[Optional[str], Tuple[int, dict]] = {}
+_cache_lock = threading.Lock()
+
+
+def bump_version(db, name: str = OFFERS_VERSION):
+    """Increment a data version inside the caller's transaction"""
+    updated = (
+        db.query(DataVersion)
+        .filter(DataVersion.name == name)
+        .update({DataVersion.version: DataVersion.version + 1}, synchronize_session=False)
+    )
+    if not updated:
+        db.add(DataVersion(name=name, version=1))
+        db.flush()
+
+
+def current_version(db, name: str = OFFERS_VERSION) -> int:
+    version = db.query(DataVersion.version).filter(DataVersion.name == name).scalar()
+    return version or 0
+
+
+def _facet_counts(rows: Iterable[dict]) -> Counter:
+    counts = Counter()
+    for row in rows:
+        code = row.get("country_code") or ""
+        for kind in FACET_KINDS:
+            value = row.get(kind)
+            if value:
+                counts[(code, kind, value[:255])] += 1
+    return counts
+
+
+def _add_counts(db, counts: Counter):
+    increment_counters(db, OfferFacet.__table__, ["country_code", "kind", "value"], [
+        {"country_code": code, "kind": kind, "value": value, "count": count}
+        for (code, kind, value), count in counts.items()
+    ])
+
+
+def record_offers(db, rows: List[dict]):
+    """Count newly inserted offer rows into the facets; the caller commits"""
+    counts = _facet_counts(rows)
+    if counts:
+        _add_counts(db, counts)
+    bump_version(db)
+
+
+def rebuild_facets(db):
+    """Recompute every facet from the offers table"""
+    db.query(OfferFacet).delete(synchronize_session=False)
+    code = func.coalesce(Offer.country_code, "")
+    counts = Counter()
+    for kind, column in (("city", Offer.city), ("company", Offer.company)):
+        grouped = (
+            db.query(code, column, func.count(Offer.id))
+            .filter(column.isnot(None), column != "")
+            .group_by(code, column)
+        )
+        for country, value, count in grouped:
+            counts[(country, kind, value[:255])] += count
+    if counts:
+        _add_counts(db, counts)
+    bump_version(db)
+    db.commit()
+    return len(counts)
+
+
+def _load(db, country_code: Optional[str]) -> dict:
+    q = db.query(OfferFacet.country_code, OfferFacet.kind, OfferFacet.value, OfferFacet.count)
+    if country_code:
+        q = q.filter(OfferFacet.country_code == country_code)
+    totals = {kind: Counter() for kind in FACET_KINDS}
+    codes = set()
+    for code, kind, value, count in q:
+        if count > 0:
+            totals[kind][value] += count
+            codes.add(code)
+    return {
+        "cities": sorted(totals["city"].items()),
+        "companies": totals["company"].most_common(),
+        "countries": sorted(COUNTRY_NAMES[code] for code in codes if code in COUNTRY_NAMES),
+    }
+
+
+def get_facets(db, country_code: Optional[str] = None) -> dict:
+    """
+    Dropdown data for a listing: {"cities": [(city, count)] by name,
+    "companies": [(company, count)] most frequent first, "countries": [name]}.
+    All countries when country_code is None.
+    """
+    version = current_version(db)
+    with _cache_lock:
+        cached = _cache.get(country_code)
+        if cached and cached[0] == version:
+            return cached[1]
+    facets = _load(db, country_code)
+    with _cache_lock:
+        _cache[country_code] = (version, facets)
+    return facets
+
+
+def ensure_facets(session_factory):
+    """Build the facets for a database that has offers but no facets yet"""
+    db = session_factory()
+    try:
+        if db.query(OfferFacet.id).first() is None and db.query(Offer.id).first() is not None:
+            count = rebuild_facets(db)
+            print(f"Built {count} offer facets")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    from database import get_db_session, init_db
+
+    init_db()
+    session = get_db_session()
+    try:
+        print(f"Rebuilt {rebuild_facets(session)} offer facets")
+    finally:
+        session.close()
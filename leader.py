@@ -0,0 +1,146 @@
+"""
+Leader election so that exactly one process per deployment runs the scheduler.
+
+PostgreSQL deployments use a session-level advisory lock held on a dedicated
+connection, which works across hosts. Everywhere else an exclusive flock() on
+a lock file elects one process per host, which covers gunicorn workers and a
+`python scheduler.py` worker sharing a machine. Either lock is released by
+the database or the kernel when its holder dies, and a waiting process takes
+over at its next retry.
+"""
+import logging
+import os
+import socket
+import tempfile
+import threading
+from typing import Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary 64-bit key identifying the scheduler's advisory lock
+ADVISORY_LOCK_KEY = 0x1A7E5C4ED
+LEADER_RETRY_SECONDS = float(os.environ.get("LEADER_RETRY_SECONDS", "30"))
+DEFAULT_LOCK_FILE = os.path.join(tempfile.gettempdir(), "internship-scheduler.lock")
+
+
+def process_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class FileLock:
+    def __init__(self, path: str):
+        self.path = path
+        self.handle = None
+
+    def try_acquire(self) -> bool:
+        if fcntl is None:
+            logger.warning("fcntl unavailable, assuming this is the only scheduler process")
+            return True
+        handle = open(self.path, "a+")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        handle.seek(0)
+        handle.truncate()
+        handle.write(process_name())
+        handle.flush()
+        self.handle = handle
+        return True
+
+    def release(self):
+        if self.handle is not None:
+            fcntl.flock(self.handle, fcntl.LOCK_UN)
+            self.handle.close()
+            self.handle = None
+
+
+class AdvisoryLock:
+    def __init__(self, engine, key: int = ADVISORY_LOCK_KEY):
+        self.engine = engine
+        self.key = key
+        self.connection = None
+
+    def try_acquire(self) -> bool:
+        connection = self.engine.connect()
+        try:
+            acquired = connection.exec_driver_sql(f"SELECT pg_try_advisory_lock({self.key})").scalar()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        # The lock lives as long as this connection; keep it out of the pool
+        self.connection = connection
+        return True
+
+    def release(self):
+        if self.connection is not None:
+            try:
+                self.connection.exec_driver_sql(f"SELECT pg_advisory_unlock({self.key})")
+            finally:
+                self.connection.close()
+                self.connection = None
+
+
+def make_lock(engine):
+    if engine.dialect.name == "postgresql":
+        return AdvisoryLock(engine)
+    return FileLock(os.environ.get("SCHEDULER_LOCK_FILE", DEFAULT_LOCK_FILE))
+
+
+class LeaderElection:
+    """
+    Calls `on_elected` once, in whichever process wins the lock. Losers retry
+    every `retry_seconds` on a daemon thread so a new leader steps in when the
+    current one exits.
+    """
+
+    def __init__(self, lock, on_elected: Callable[[], None], retry_seconds: float = LEADER_RETRY_SECONDS):
+        self.lock = lock
+        self.on_elected = on_elected
+        self.retry_seconds = retry_seconds
+        self.is_leader = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _try(self) -> bool:
+        try:
+            acquired = self.lock.try_acquire()
+        except Exception as e:
+            logger.error(f"Leader election failed: {e}")
+            return False
+        if acquired:
+            self.is_leader = True
+            logger.info(f"{process_name()} elected scheduler leader")
+            self.on_elected()
+        return acquired
+
+    def _retry_loop(self):
+        while not self._stop.wait(self.retry_seconds):
+            if self._try():
+                return
+
+    def start(self, block: bool = False):
+        """Try to become leader; keep retrying in the background, or here if `block`"""
+        if self._try():
+            return
+        logger.info(f"{process_name()} is not the scheduler leader, retrying every {self.retry_seconds:.0f}s")
+        if block:
+            self._retry_loop()
+            return
+        self._thread = threading.Thread(target=self._retry_loop, name="leader-election", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self.is_leader:
+            self.lock.release()
+            self.is_leader = False
@@ -0,0 +1,57 @@
+"""
+Column-projected reads for the offer listings, and their JSON encoding.
+
+offer_rows() queries exactly the columns a listing shows and returns plain
+Row tuples: no Offer instances are built, tracked in the identity map or
+instrumented. Rows still read like offers (row.title, row.created_at), so
+pagination, search and the templates take them unchanged.
+
+dumps() encodes with orjson when it is installed (dates and datetimes
+natively) and falls back to the standard json module otherwise.
+"""
+import json
+from datetime import date, datetime
+
+from flask import Response
+
+from models import Offer
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# What a listing page or an /api/offers item shows, in API field order
+LISTING_COLUMNS = (
+    Offer.id, Offer.title, Offer.company, Offer.location, Offer.country, Offer.country_code, Offer.city,
+    Offer.date_posted, Offer.date_posted_parsed, Offer.link, Offer.created_at,
+)
+LISTING_FIELDS = tuple(column.key for column in LISTING_COLUMNS)
+
+
+def offer_rows(db):
+    """Query of the listing columns of offers, to filter and page like db.query(Offer)"""
+    return db.query(*LISTING_COLUMNS)
+
+
+def offer_items(rows):
+    """API items for listing rows (dates are left to dumps())"""
+    return [dict(zip(LISTING_FIELDS, row)) for row in rows]
+
+
+def _default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(payload, status: int = 200) -> Response:
+    return Response(dumps(payload), status=status, mimetype="application/json")
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint, Date, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint, Date, Boolean, Float, Index, JSON
 from database import Base
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -12,6 +12,8 @@ class Offer(Base):
     company = Column(String(255), nullable=True)
     location = Column(String(255), nullable=True)
     country = Column(String(100), nullable=True)  # Nouveau champ pays
+    country_code = Column(String(2), nullable=True)  # Code ISO normalisé (MA, FR, ...)
+    city = Column(String(100), nullable=True)  # Ville normalisée
     date_posted = Column(String(100), nullable=True)
     date_posted_parsed = Column(Date, nullable=True)  # Date parsée pour filtrage
     link = Column(String(1024), nullable=False)
@@ -19,12 +21,138 @@ class Offer(Base):
 
     __table_args__ = (
         UniqueConstraint("link", name="uq_offers_link"),
+        # Country pages: equality on country_code, then the listing order
+        Index("ix_offers_country_code_date", "country_code", "date_posted_parsed", "created_at"),
+        Index("ix_offers_country_city_date", "country_code", "city", "date_posted_parsed", "created_at"),
+        # /offers without a country filter
+        Index("ix_offers_date_created", "date_posted_parsed", "created_at"),
     )
 
     def __repr__(self):
         return f"<Offer(id={self.id}, title='{self.title}', company='{self.company}')>"
 
 
+class OfferFacet(Base):
+    """Number of offers per city/company and country, maintained at ingest"""
+    __tablename__ = "offer_facets"
+
+    id = Column(Integer, primary_key=True)
+    country_code = Column(String(2), nullable=False)
+    kind = Column(String(20), nullable=False)  # "city" ou "company"
+    value = Column(String(255), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("country_code", "kind", "value", name="uq_offer_facets"),
+    )
+
+    def __repr__(self):
+        return f"<OfferFacet(country_code='{self.country_code}', kind='{self.kind}', value='{self.value}', count={self.count})>"
+
+
+class DataVersion(Base):
+    """Counter bumped whenever a table changes, so caches can tell they are stale"""
+    __tablename__ = "data_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DataVersion(name='{self.name}', version={self.version})>"
+
+
+class PendingMigration(Base):
+    """Data migration still owed after a schema upgrade, removed once it completes"""
+    __tablename__ = "pending_migrations"
+
+    name = Column(String(50), primary_key=True)
+    upto_id = Column(Integer, nullable=True)  # Dernière ligne existante lors de la mise à jour
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<PendingMigration(name='{self.name}', upto_id={self.upto_id})>"
+
+
+class OfferRollup(Base):
+    """Running offer counts per dimension (total, company, location, country, day)"""
+    __tablename__ = "offer_rollups"
+
+    id = Column(Integer, primary_key=True)
+    dimension = Column(String(20), nullable=False)
+    value = Column(String(255), nullable=False)  # "" pour une valeur inconnue
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("dimension", "value", name="uq_offer_rollups"),
+        # Top N per dimension
+        Index("ix_offer_rollups_top", "dimension", "count"),
+    )
+
+    def __repr__(self):
+        return f"<OfferRollup(dimension='{self.dimension}', value='{self.value}', count={self.count})>"
+
+
+class ScrapeRollup(Base):
+    """Scrape run totals per country, overall (period "all") and per day (period "YYYY-MM-DD")"""
+    __tablename__ = "scrape_rollups"
+
+    id = Column(Integer, primary_key=True)
+    country = Column(String(100), nullable=False)
+    period = Column(String(10), nullable=False)
+    runs = Column(Integer, nullable=False, default=0)
+    offers_found = Column(Integer, nullable=False, default=0)
+    offers_inserted = Column(Integer, nullable=False, default=0)
+    duration_seconds = Column(Integer, nullable=False, default=0)  # Somme des durées
+
+    __table_args__ = (
+        UniqueConstraint("country", "period", name="uq_scrape_rollups"),
+    )
+
+    def __repr__(self):
+        return f"<ScrapeRollup(country='{self.country}', period='{self.period}', runs={self.runs})>"
+
+
+class SchedulerState(Base):
+    """Next run time of each scheduler job, written by the process that runs the scheduler"""
+    __tablename__ = "scheduler_state"
+
+    job_id = Column(String(100), primary_key=True)
+    next_run_time = Column(DateTime, nullable=True)  # UTC
+    owner = Column(String(255), nullable=True)  # hôte:pid du processus leader
+    running = Column(Boolean, default=False)  # Exécution en cours
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<SchedulerState(job_id='{self.job_id}', next_run_time='{self.next_run_time}', running={self.running})>"
+
+
+class ScrapeJob(Base):
+    """Manual scrape requested through /api/scrape, drained by the scheduler process"""
+    __tablename__ = "scrape_jobs"
+
+    id = Column(Integer, primary_key=True)
+    country = Column(String(100), nullable=False)
+    max_pages = Column(Integer, nullable=False, default=1)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, done, failed
+    # Equal to country while queued or running, NULL afterwards: the unique
+    # constraint allows one active job per country
+    active_country = Column(String(100), nullable=True)
+    requests = Column(Integer, nullable=False, default=1)  # Demandes regroupées sur ce job
+    inserted = Column(Integer, nullable=True)
+    error = Column(String(1000), nullable=True)
+    requested_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("active_country", name="uq_scrape_jobs_active_country"),
+        Index("ix_scrape_jobs_status_requested", "status", "requested_at"),
+    )
+
+    def __repr__(self):
+        return f"<ScrapeJob(id={self.id}, country='{self.country}', status='{self.status}')>"
+
+
 class ScrapingStat(Base):
     __tablename__ = "scraping_stats"
 
@@ -32,8 +160,18 @@ class ScrapingStat(Base):
     country = Column(String(100), nullable=False)
     offers_found = Column(Integer, default=0)
     offers_inserted = Column(Integer, default=0)
-    execution_time = Column(DateTime, default=datetime.utcnow, nullable=False)
+    execution_time = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     duration_seconds = Column(Integer, default=0)
+    startup_seconds = Column(Float, default=0.0)  # Temps de démarrage du navigateur
+    scrape_seconds = Column(Float, default=0.0)  # Temps de scraping hors démarrage
+    pages_saved = Column(Integer, default=0)  # Pages non parcourues grâce aux liens déjà connus
+    blocked = Column(Integer, default=0)  # Réponses 403/429 reçues pendant l'exécution
+    phase_timings = Column(JSON)  # Millisecondes par phase (fetch, parse, extract, normalize, insert, ...)
+
+    __table_args__ = (
+        # Recent runs of one country, for the adaptive scrape interval
+        Index("ix_scraping_stats_country_time", "country", "execution_time"),
+    )
 
     def __repr__(self):
         return f"<ScrapingStat(id={self.id}, country='{self.country}', offers_found={self.offers_found}, execution_time='{self.execution_time}')>"
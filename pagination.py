@@ -0,0 +1,154 @@
+"""
+Keyset (cursor) pagination for the offer listings.
+
+Listings are ordered by (date_posted_parsed DESC NULLS LAST, created_at DESC,
+id DESC). A cursor is the sort key of the last (or first) offer shown,
+base64-encoded, and the next page is read with a range predicate on that key
+instead of OFFSET, so every page costs the same as the first one.
+
+Offers without a parsed date sort after all dated ones; seeking across that
+boundary takes a second query on the NULL part of the index.
+"""
+import base64
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Hashable, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+from models import Offer
+
+# Seconds a listing total is reused before being counted again
+OFFER_COUNT_TTL = float(os.environ.get("OFFER_COUNT_TTL", "60"))
+COUNT_CACHE_SIZE = 1024
+
+LISTING_ORDER = (Offer.date_posted_parsed.desc().nulls_last(), Offer.created_at.desc(), Offer.id.desc())
+
+SortKey = Tuple[Optional[date], datetime, int]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def sort_key(offer) -> SortKey:
+    return offer.date_posted_parsed, offer.created_at, offer.id
+
+
+def encode_cursor(key: SortKey) -> str:
+    posted, created, offer_id = key
+    payload = [posted.isoformat() if posted else None, created.isoformat(), offer_id]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        posted, created, offer_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (
+            date.fromisoformat(posted) if posted else None,
+            datetime.fromisoformat(created),
+            int(offer_id),
+        )
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def _after_created(created: datetime, offer_id: int):
+    return or_(Offer.created_at < created, and_(Offer.created_at == created, Offer.id < offer_id))
+
+
+def _before_created(created: datetime, offer_id: int):
+    return or_(Offer.created_at > created, and_(Offer.created_at == created, Offer.id > offer_id))
+
+
+def _seek_forward(q, key: SortKey, limit: int) -> List[Offer]:
+    """Up to `limit` offers that come after `key` in listing order"""
+    posted, created, offer_id = key
+    undated = q.filter(Offer.date_posted_parsed.is_(None))
+    if posted is None:
+        return undated.filter(_after_created(created, offer_id)).order_by(*LISTING_ORDER).limit(limit).all()
+    # `<= posted` gives the index a range to seek to; the OR only trims the ties
+    rows = (
+        q.filter(Offer.date_posted_parsed <= posted,
+                 or_(Offer.date_posted_parsed < posted, _after_created(created, offer_id)))
+        .order_by(*LISTING_ORDER).limit(limit).all()
+    )
+    if len(rows) < limit:
+        rows += undated.order_by(*LISTING_ORDER).limit(limit - len(rows)).all()
+    return rows
+
+
+def _seek_backward(q, key: SortKey, limit: int) -> List[Offer]:
+    """Up to `limit` offers that come before `key`, nearest first"""
+    posted, created, offer_id = key
+    reverse_order = (Offer.date_posted_parsed.asc().nulls_first(), Offer.created_at.asc(), Offer.id.asc())
+    dated = q.filter(Offer.date_posted_parsed.isnot(None))
+    if posted is not None:
+        return (
+            dated.filter(Offer.date_posted_parsed >= posted,
+                         or_(Offer.date_posted_parsed > posted, _before_created(created, offer_id)))
+            .order_by(*reverse_order).limit(limit).all()
+        )
+    rows = (
+        q.filter(Offer.date_posted_parsed.is_(None), _before_created(created, offer_id))
+        .order_by(*reverse_order).limit(limit).all()
+    )
+    if len(rows) < limit:
+        rows += dated.order_by(*reverse_order).limit(limit - len(rows)).all()
+    return rows
+
+
+def keyset_page(q, limit: int, cursor: Optional[str] = None, direction: str = "next"):
+    """
+    One page of `q` in listing order. Returns (offers, next_cursor, prev_cursor);
+    a cursor is None when there is nothing further in that direction.
+    Raises InvalidCursor for a cursor that was not produced by this module.
+    """
+    if not cursor:
+        rows = q.order_by(*LISTING_ORDER).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort_key(rows[-1])) if has_more else None
+        return rows, next_cursor, None
+
+    key = decode_cursor(cursor)
+    if direction == "prev":
+        rows = _seek_backward(q, key, limit + 1)
+        has_before = len(rows) > limit
+        rows = list(reversed(rows[:limit]))
+        if not rows:
+            return rows, None, None
+        prev_cursor = encode_cursor(sort_key(rows[0])) if has_before else None
+        # We came from a later page, so there is always one after this one
+        return rows, encode_cursor(sort_key(rows[-1])), prev_cursor
+
+    rows = _seek_forward(q, key, limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return rows, None, None
+    next_cursor = encode_cursor(sort_key(rows[-1])) if has_more else None
+    return rows, next_cursor, encode_cursor(sort_key(rows[0]))
+
+
+_count_cache = {}
+_count_lock = threading.Lock()
+
+
+def cached_count(q, key: Hashable, ttl: float = OFFER_COUNT_TTL) -> int:
+    """q.count(), reused for `ttl` seconds per cache key (the listing and its filters)"""
+    now = time.monotonic()
+    with _count_lock:
+        hit = _count_cache.get(key)
+        if hit and now - hit[1] < ttl:
+            return hit[0]
+    total = q.count()
+    with _count_lock:
+        if len(_count_cache) >= COUNT_CACHE_SIZE:
+            _count_cache.clear()
+        _count_cache[key] = (total, now)
+    return total
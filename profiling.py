@@ -0,0 +1,179 @@
+"""
+Opt-in cProfile capture of scrape runs and slow requests.
+
+With PROFILING=1, every run_scrape_job() call and every Flask request taking
+longer than PROFILE_SLOW_REQUEST_MS is profiled and its stats dumped to
+PROFILE_DIR:
+
+    <PROFILE_DIR>/20260101T120000123456-5321ms-scrape-Maroc.prof
+
+Only the newest PROFILE_KEEP profiles are kept. /profiles lists them with
+their top functions by own time; any .prof file also opens in pstats or
+snakeviz. cProfile follows the thread it was started on: a scrape profile
+covers the scraper, not the ingest writer thread.
+
+When PROFILING is off, profiled() returns the function unchanged and
+init_app() registers no hooks, so nothing runs per call or per request.
+"""
+import cProfile
+import functools
+import inspect
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILING = os.environ.get("PROFILING", "").lower() in ("1", "true", "yes", "on")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+# Requests at least this slow are kept; faster ones are profiled and discarded
+PROFILE_SLOW_REQUEST_MS = float(os.environ.get("PROFILE_SLOW_REQUEST_MS", "500"))
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", "50"))
+
+PROFILE_SUFFIX = ".prof"
+_NAME = re.compile(r"^(?P<captured>\d{8}T\d{12})-(?P<ms>\d+)ms-(?P<kind>[a-z]+)-(?P<label>.*)\.prof$")
+
+_local = threading.local()
+_retention_lock = threading.Lock()
+
+
+def _start() -> Optional[cProfile.Profile]:
+    """A running profiler for this thread, or None if one is already running here"""
+    if getattr(_local, "active", False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Another profiler (a debugger, coverage) owns this thread
+        logger.debug(f"Profiling unavailable: {e}")
+        return None
+    _local.active = True
+    return profiler
+
+
+def _stop(profiler: cProfile.Profile):
+    profiler.disable()
+    _local.active = False
+
+
+def save(profiler: cProfile.Profile, kind: str, label: str, duration_ms: float) -> Optional[str]:
+    """Dump a finished profile and apply retention; returns its path. Never raises."""
+    slug = re.sub(r"[^A-Za-z0-9_.]+", "_", label).strip("_")[:60] or "run"
+    name = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{int(duration_ms)}ms-{kind}-{slug}{PROFILE_SUFFIX}"
+    path = os.path.join(PROFILE_DIR, name)
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(path)
+        _apply_retention()
+        return path
+    except OSError as e:
+        logger.error(f"Could not save profile {name}: {e}")
+        return None
+
+
+def _apply_retention():
+    with _retention_lock:
+        names = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith(PROFILE_SUFFIX))
+        for name in names[:max(len(names) - PROFILE_KEEP, 0)]:
+            try:
+                os.remove(os.path.join(PROFILE_DIR, name))
+            except FileNotFoundError:
+                pass
+
+
+def profiled(kind: str, label_arg: Optional[str] = None):
+    """Decorator profiling every call when PROFILING is on; `label_arg` names the argument used as label"""
+    def decorator(func):
+        if not PROFILING:
+            return func
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _start()
+            if profiler is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _stop(profiler)
+                label = func.__name__
+                if label_arg:
+                    bound = signature.bind_partial(*args, **kwargs)
+                    bound.apply_defaults()
+                    label = str(bound.arguments.get(label_arg, label))
+                save(profiler, kind, label, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+
+def init_app(app):
+    """Profile the app's requests and keep those slower than PROFILE_SLOW_REQUEST_MS"""
+    if not PROFILING:
+        return
+    from flask import g, request
+
+    @app.before_request
+    def start_request_profile():
+        g.profiler = _start()
+        g.profile_start = time.perf_counter()
+
+    @app.teardown_request
+    def stop_request_profile(exc=None):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return
+        _stop(profiler)
+        duration_ms = (time.perf_counter() - g.pop("profile_start")) * 1000
+        if duration_ms >= PROFILE_SLOW_REQUEST_MS:
+            save(profiler, "request", f"{request.method} {request.path}", duration_ms)
+
+    logger.info(f"Profiling requests slower than {PROFILE_SLOW_REQUEST_MS:g} ms into {PROFILE_DIR}")
+
+
+def hotspots(path: str, top: int = 10) -> List[Dict]:
+    """The `top` functions of a profile by own time"""
+    stats = pstats.Stats(path).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    return [
+        {
+            "function": f"{os.path.basename(filename)}:{line}({function})",
+            "calls": calls,
+            "own_ms": round(own * 1000, 2),
+            "cumulative_ms": round(cumulative * 1000, 2),
+        }
+        for (filename, line, function), (_, calls, own, cumulative, _) in rows
+    ]
+
+
+def list_profiles(top: int = 10) -> List[Dict]:
+    """Captured profiles, newest first, each with its hotspots"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        match = _NAME.match(name)
+        if not match:
+            continue
+        try:
+            spots = hotspots(os.path.join(PROFILE_DIR, name), top)
+        except Exception as e:
+            # Deleted by retention meanwhile, or truncated
+            logger.error(f"Could not read profile {name}: {e}")
+            continue
+        profiles.append({
+            "name": name,
+            "kind": match["kind"],
+            "label": match["label"],
+            "duration_ms": int(match["ms"]),
+            "captured_at": datetime.strptime(match["captured"], "%Y%m%dT%H%M%S%f").isoformat(timespec="seconds"),
+            "hotspots": spots,
+        })
+    return profiles
@@ -0,0 +1,141 @@
+"""
+Replay the raw page archive (scraper/archive.py) through the card parser.
+
+Pages are decompressed and parsed in a process pool; the offers go through
+insert_new_offers() like a live scrape, grouped by the country and day each
+page was fetched so relative dates resolve as they did at the time. No
+request reaches Indeed.
+
+    python reparse.py                              # insert offers missing from the database
+    python reparse.py --update                     # also rewrite stored offers that parse differently
+    python reparse.py --country Maroc --since 2026-01-01 --workers 4
+"""
+import argparse
+import logging
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+from sqlalchemy import bindparam, update
+
+from database import get_db_session, init_db
+from models import Offer
+from scraper.archive import get_archive, read_page
+from scraper.dates import parse_dates
+from scraper.indeed_scraper import parse_result_page
+import facets
+import rollups
+import scheduler
+
+logger = logging.getLogger(__name__)
+
+# Offers buffered per (country, day) before they are written
+REPARSE_BATCH = 2000
+UPDATED_FIELDS = ("title", "company", "location", "country", "country_code", "city",
+                  "date_posted", "date_posted_parsed")
+
+
+def parse_archived_page(path):
+    """Worker: (path, offers, error) for one archived page"""
+    try:
+        html = read_page(path)
+    except Exception as e:
+        return path, [], str(e)
+    offers = [data for data in parse_result_page(html) if data.get("link") and data.get("title")]
+    return path, offers, None
+
+
+def update_offers(offers, country, today) -> int:
+    """Rewrite stored offers whose parsed fields differ from `offers`; returns how many changed"""
+    unique = {o["link"]: o for o in offers}
+    dates = parse_dates((o.get("date_posted", "") for o in unique.values()), today)
+    rows = {
+        row["link"]: row
+        for row in (scheduler._offer_row(o, d, country) for o, d in zip(unique.values(), dates))
+    }
+    db = get_db_session()
+    try:
+        changed = []
+        links = list(rows)
+        columns = [getattr(Offer, field) for field in UPDATED_FIELDS]
+        for i in range(0, len(links), scheduler.LINK_LOOKUP_CHUNK):
+            chunk = links[i:i + scheduler.LINK_LOOKUP_CHUNK]
+            for link, *stored in db.query(Offer.link, *columns).filter(Offer.link.in_(chunk)):
+                row = rows[link]
+                if any(row[field] != value for field, value in zip(UPDATED_FIELDS, stored)):
+                    changed.append({"b_link": link, **{f"b_{field}": row[field] for field in UPDATED_FIELDS}})
+        if changed:
+            stmt = (
+                update(Offer.__table__)
+                .where(Offer.__table__.c.link == bindparam("b_link"))
+                .values({field: bindparam(f"b_{field}") for field in UPDATED_FIELDS})
+            )
+            db.connection().execute(stmt, changed)
+            db.commit()
+        return len(changed)
+    finally:
+        db.close()
+
+
+def reparse(country=None, since=None, workers=None, update_existing=False):
+    pages = {page.path: page for page in get_archive().pages(country=country, since=since)}
+    print(f"Re-parsing {len(pages)} archived pages with {workers or os.cpu_count()} processes")
+
+    totals = defaultdict(int)
+    batches = defaultdict(list)
+
+    def flush(key):
+        batch_country, day = key
+        offers = batches.pop(key)
+        inserted, _ = scheduler.insert_new_offers(offers, batch_country, today=day)
+        totals["inserted"] += inserted
+        if update_existing:
+            totals["updated"] += update_offers(offers, batch_country, day)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, offers, error in pool.map(parse_archived_page, pages, chunksize=16):
+            if error:
+                logger.error(f"Could not read {path}: {error}")
+                totals["errors"] += 1
+                continue
+            fetch = pages[path].first_fetch
+            fetched_at = fetch.get("fetched_at")
+            day = datetime.fromisoformat(fetched_at).date() if fetched_at else date.today()
+            key = (fetch.get("country"), day)
+            totals["pages"] += 1
+            totals["offers"] += len(offers)
+            batches[key].extend(offers)
+            if len(batches[key]) >= REPARSE_BATCH:
+                flush(key)
+    for key in list(batches):
+        flush(key)
+
+    if totals["updated"]:
+        # Updated rows may have moved between cities, companies or countries
+        db = get_db_session()
+        try:
+            facets.rebuild_facets(db)
+            rollups.rebuild_rollups(db)
+        finally:
+            db.close()
+    return dict(totals)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--country", help="only pages fetched for this country (e.g. Maroc)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="only pages fetched on or after this date")
+    parser.add_argument("--workers", type=int, help="parser processes (default: one per CPU)")
+    parser.add_argument("--update", action="store_true", help="rewrite stored offers that parse differently")
+    args = parser.parse_args(argv)
+
+    init_db()
+    totals = reparse(country=args.country, since=args.since, workers=args.workers, update_existing=args.update)
+    print(f"{totals.get('pages', 0)} pages, {totals.get('offers', 0)} offers: "
+          f"{totals.get('inserted', 0)} inserted, {totals.get('updated', 0)} updated, "
+          f"{totals.get('errors', 0)} unreadable pages")
+
+
+if __name__ == "__main__":
+    main()
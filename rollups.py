@@ -0,0 +1,162 @@
+"""
+Pre-aggregated counts behind the /stats dashboard.
+
+offer_rollups keeps running offer counts per dimension (total, company,
+location, country, day). scrape_rollups keeps scrape run totals per
+country, overall and per day. insert_new_offers() and run_scrape_job() add
+to them in the transaction that writes the offers or the ScrapingStat, so
+/stats reads a handful of indexed rows however long the history is.
+
+    python rollups.py    # rebuild both tables from offers and scraping_stats
+"""
+from collections import Counter
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import Float, cast, func
+
+from database import increment_counters
+from models import Offer, OfferRollup, ScrapeRollup, ScrapingStat
+
+OFFER_DIMENSIONS = ("total", "company", "location", "country", "day")
+ALL_TIME = "all"
+
+
+def _day(value) -> str:
+    return value.date().isoformat() if isinstance(value, datetime) else str(value)[:10]
+
+
+def _offer_keys(row: dict):
+    yield "total", ""
+    yield "company", (row.get("company") or "")[:255]
+    yield "location", (row.get("location") or "")[:255]
+    yield "country", row.get("country_code") or ""
+    yield "day", _day(row.get("created_at") or datetime.utcnow())
+
+
+def _add_offer_counts(db, counts: Counter):
+    increment_counters(db, OfferRollup.__table__, ["dimension", "value"], [
+        {"dimension": dimension, "value": value, "count": count}
+        for (dimension, value), count in counts.items()
+    ])
+
+
+def record_offers(db, rows: List[dict]):
+    """Add newly inserted offer rows to the rollups; the caller commits"""
+    counts = Counter(key for row in rows for key in _offer_keys(row))
+    _add_offer_counts(db, counts)
+
+
+def _scrape_row(country, period, runs, found, inserted, duration):
+    return {
+        "country": country,
+        "period": period,
+        "runs": runs,
+        "offers_found": found or 0,
+        "offers_inserted": inserted or 0,
+        "duration_seconds": duration or 0,
+    }
+
+
+def record_scrape_run(db, stat: ScrapingStat):
+    """Add one scrape run to the per-country rollups; the caller commits"""
+    day = _day(stat.execution_time or datetime.now())
+    increment_counters(db, ScrapeRollup.__table__, ["country", "period"], [
+        _scrape_row(stat.country, period, 1, stat.offers_found, stat.offers_inserted, stat.duration_seconds)
+        for period in (ALL_TIME, day)
+    ])
+
+
+def rebuild_rollups(db):
+    """Recompute both rollup tables from offers and scraping_stats"""
+    db.query(OfferRollup).delete(synchronize_session=False)
+    db.query(ScrapeRollup).delete(synchronize_session=False)
+
+    counts = Counter()
+    counts[("total", "")] = db.query(func.count(Offer.id)).scalar() or 0
+    grouped_columns = {
+        "company": func.coalesce(Offer.company, ""),
+        "location": func.coalesce(Offer.location, ""),
+        "country": func.coalesce(Offer.country_code, ""),
+        "day": func.date(Offer.created_at),
+    }
+    for dimension, column in grouped_columns.items():
+        for value, count in db.query(column, func.count(Offer.id)).group_by(column):
+            counts[(dimension, str(value or "")[:255])] += count
+    if counts[("total", "")]:
+        _add_offer_counts(db, counts)
+
+    day = func.date(ScrapingStat.execution_time)
+    aggregates = (
+        func.count(ScrapingStat.id),
+        func.sum(ScrapingStat.offers_found),
+        func.sum(ScrapingStat.offers_inserted),
+        func.sum(ScrapingStat.duration_seconds),
+    )
+    rows = [
+        _scrape_row(country, ALL_TIME, *totals)
+        for country, *totals in db.query(ScrapingStat.country, *aggregates).group_by(ScrapingStat.country)
+    ]
+    rows += [
+        _scrape_row(country, str(period), *totals)
+        for country, period, *totals in db.query(ScrapingStat.country, day, *aggregates)
+        .group_by(ScrapingStat.country, day)
+    ]
+    increment_counters(db, ScrapeRollup.__table__, ["country", "period"], rows)
+    db.commit()
+    return len(counts), len(rows)
+
+
+def total_offers(db) -> int:
+    return db.query(OfferRollup.count).filter_by(dimension="total", value="").scalar() or 0
+
+
+def top_values(db, dimension: str, limit: int):
+    """(value, count) pairs of a dimension, largest first"""
+    return (
+        db.query(OfferRollup.value, OfferRollup.count)
+        .filter(OfferRollup.dimension == dimension, OfferRollup.count > 0)
+        .order_by(OfferRollup.count.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def scraping_summary(db):
+    """Per-country run totals, shaped like the old GROUP BY over scraping_stats"""
+    return (
+        db.query(
+            ScrapeRollup.country,
+            ScrapeRollup.runs.label('runs'),
+            ScrapeRollup.offers_found.label('total_found'),
+            ScrapeRollup.offers_inserted.label('total_inserted'),
+            (cast(ScrapeRollup.duration_seconds, Float) / ScrapeRollup.runs).label('avg_duration'),
+        )
+        .filter(ScrapeRollup.period == ALL_TIME)
+        .order_by(ScrapeRollup.country)
+        .all()
+    )
+
+
+def ensure_rollups(session_factory):
+    """Build the rollups for a database that predates them"""
+    db = session_factory()
+    try:
+        has_history = db.query(Offer.id).first() is not None or db.query(ScrapingStat.id).first() is not None
+        if has_history and db.query(OfferRollup.id).first() is None and db.query(ScrapeRollup.id).first() is None:
+            offer_rows, scrape_rows = rebuild_rollups(db)
+            print(f"Built {offer_rows} offer rollups and {scrape_rows} scrape rollups")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    from database import get_db_session, init_db
+
+    init_db()
+    session = get_db_session()
+    try:
+        offer_rows, scrape_rows = rebuild_rollups(session)
+        print(f"Rebuilt {offer_rows} offer rollups and {scrape_rows} scrape rollups")
+    finally:
+        session.close()
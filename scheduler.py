@@ -1,10 +1,27 @@
 from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime
-from database import get_db_session
-from models import Offer, ScrapingStat
-from scraper.indeed_scraper import scrape_indeed, extract_country_from_location, parse_date_posted
-from sqlalchemy.exc import IntegrityError
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MISSED
+from datetime import datetime, timezone
+from typing import Optional
+from database import engine, get_db_session, serialized_write
+from models import Offer, ScrapingStat, SchedulerState
+from leader import LeaderElection, make_lock, process_name
+import facets
+import rollups
+import scrape_queue
+import scheduling
+import profiling
+from scraper.dates import parse_dates
+from scraper.locations import country_code, resolve_location
+from scraper.browser_pool import BrowserPool
+from scraper.known_links import KnownLinks
+from scraper import metrics
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import atexit
 import logging
+import queue
+import threading
 import time
 import os
 import traceback
@@ -14,42 +31,189 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def insert_new_offers(offers):
-    db = get_db_session()
-    inserted = 0
+# Countries scraped by the scheduler, each on its own Indeed domain
+SCRAPE_COUNTRIES = ["Maroc", "France", "Canada", "Belgique", "Suisse"]
+SCRAPE_MAX_WORKERS = int(os.environ.get("SCRAPE_MAX_WORKERS", len(SCRAPE_COUNTRIES)))
+SWEEP_JOB_ID = "indeed_scrape_sweep"
+QUEUE_JOB_ID = "scrape_queue_drain"
+# How often the scheduler looks for scrapes requested through /api/scrape
+SCRAPE_QUEUE_POLL_SECONDS = float(os.environ.get("SCRAPE_QUEUE_POLL_SECONDS", "5"))
+# Jobs whose next run is shown to users; the queue drain is internal
+TIMED_JOB_IDS = [SWEEP_JOB_ID]
+
+# "auto": web processes elect one of themselves to run the scheduler
+# "off": web processes never do; run `python scheduler.py` separately
+SCHEDULER_MODE = os.environ.get("SCHEDULER_MODE", "auto").lower()
+
+_browser_pool = None
+_browser_pool_lock = threading.Lock()
+
+# Links already stored, consulted by the crawl to stop at known offers
+_known_links = KnownLinks()
+KNOWN_LINKS_WARM_BATCH = 10000
+
+_scheduler = None
+_election = None
+_metrics_server = None
+
+# Scraped pages waiting to be written; bounds a run's memory to this many pages
+INGEST_QUEUE_PAGES = int(os.environ.get("INGEST_QUEUE_PAGES", "4"))
+
+# Number of links per IN (...) lookup, kept under SQLite's bound-parameter limit
+LINK_LOOKUP_CHUNK = 500
+
+
+def _offer_row(o, date_parsed, scrape_country=None):
+    """Normalize a scraped offer dict into a row for the offers table.
+
+    country_code falls back to the country being scraped when the location
+    does not name a known country or city.
+    """
+    location = o.get("location", "")
+    resolved = resolve_location(location)
+    return {
+        "title": o.get("title", ""),
+        "company": o.get("company", ""),
+        "location": location,
+        "country": resolved.country,
+        "country_code": country_code(resolved.country or scrape_country),
+        "city": resolved.city,
+        "date_posted": o.get("date_posted", ""),
+        "date_posted_parsed": date_parsed,
+        "link": o.get("link", ""),
+        "created_at": datetime.utcnow(),
+    }
+
+
+def _existing_links(db, links):
+    """Return the subset of links already stored, in one query per chunk"""
+    existing = set()
+    for i in range(0, len(links), LINK_LOOKUP_CHUNK):
+        chunk = links[i:i + LINK_LOOKUP_CHUNK]
+        existing.update(row[0] for row in db.query(Offer.link).filter(Offer.link.in_(chunk)))
+    return existing
+
+
+def _bulk_insert(db, rows):
+    """Insert rows in one statement, skipping links inserted concurrently.
+
+    Returns the rows actually written. SQLite and PostgreSQL use
+    INSERT ... ON CONFLICT(link) DO NOTHING RETURNING link to tell them apart.
+    Other dialects insert through the ORM and fall back to the per-row path if
+    a concurrent writer won the race.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = (
+            insert(Offer.__table__)
+            .on_conflict_do_nothing(index_elements=["link"])
+            .returning(Offer.__table__.c.link)
+        )
+        written = {row[0] for row in db.execute(stmt, rows)}
+        return [row for row in rows if row["link"] in written]
+
+    try:
+        db.add_all([Offer(**row) for row in rows])
+        db.flush()
+        return rows
+    except IntegrityError:
+        db.rollback()
+        return _insert_per_row(db, rows)
+
+
+def _insert_per_row(db, rows, failed=None):
+    """Insert rows one transaction each, skipping duplicates; rows that fail
+    otherwise are logged and appended to `failed`"""
+    inserted = []
+    for row in rows:
+        try:
+            db.add(Offer(**row))
+            db.commit()
+            inserted.append(row)
+        except IntegrityError:
+            db.rollback()
+            # Duplicate link; skip
+        except Exception as e:
+            logger.error(f"Error inserting offer {row.get('link')}: {e}")
+            db.rollback()
+            if failed is not None:
+                failed.append(row)
+    return inserted
+
+
+def insert_new_offers(offers, country=None, today=None, stats=None):
+    """Insert scraped offers in a single transaction.
+
+    `country` is the country the offers were scraped for. Returns a
+    (inserted, duplicates) tuple, where duplicates counts offers whose link
+    was already stored or appeared earlier in the same batch. `today` is the
+    day relative dates ("il y a 3 jours") count from, when the offers were
+    fetched earlier than now. Date and location parsing is timed as the
+    "normalize" phase, the database work as "insert", into the run's `stats`
+    when given (see scraper.metrics). Offers without a link, and offers the
+    database rejects, are logged and counted in neither.
+    """
     try:
+        unique = {}
+        linkless = 0
         for o in offers:
-            try:
-                # Extract country and parse date
-                location = o.get("location", "")
-                date_posted = o.get("date_posted", "")
-                country = extract_country_from_location(location)
-                date_parsed = parse_date_posted(date_posted)
-                
-                offer = Offer(
-                    title=o.get("title", ""),
-                    company=o.get("company", ""),
-                    location=location,
-                    country=country,
-                    date_posted=date_posted,
-                    date_posted_parsed=date_parsed,
-                    link=o.get("link", ""),
-                )
-                db.add(offer)
-                db.commit()
-                inserted += 1
-            except IntegrityError:
-                db.rollback()
-                # Duplicate link; skip
-            except Exception as e:
-                logger.error(f"Error inserting offer: {e}")
-                db.rollback()
-        logger.info(f"Inserted {inserted} new offers into the database")
-        return inserted
+            link = o.get("link", "")
+            if not link:
+                linkless += 1
+            elif link not in unique:
+                unique[link] = o
+        if linkless:
+            logger.warning(f"Skipped {linkless} offers without a link")
+        with metrics.timed("normalize", stats):
+            # Indeed repeats the same few date strings across a scrape
+            dates = parse_dates((o.get("date_posted", "") for o in unique.values()), today)
+            rows = [_offer_row(o, d, country) for o, d in zip(unique.values(), dates)]
+
+        inserted_rows, failed = _write_offers(rows, stats)
+        inserted = len(inserted_rows)
+        _known_links.add_many(row["link"] for row in inserted_rows)
+        duplicates = len(offers) - linkless - failed - inserted
+        if failed:
+            logger.warning(f"{failed} offers could not be stored")
+        logger.info(f"Inserted {inserted} new offers into the database ({duplicates} duplicates skipped)")
+        return inserted, duplicates
     except Exception as e:
         logger.error(f"Error in insert_new_offers: {e}")
         logger.error(traceback.format_exc())
-        return 0
+        return 0, 0
+
+
+@serialized_write
+def _write_offers(rows, stats=None):
+    """Store normalized rows not already present, with their facet and rollup
+    counts; returns the rows written and the number of rows that failed"""
+    db = get_db_session()
+    try:
+        with metrics.timed("insert", stats):
+            existing = _existing_links(db, [row["link"] for row in rows])
+            rows = [row for row in rows if row["link"] not in existing]
+
+            failed = []
+            try:
+                inserted_rows = _bulk_insert(db, rows) if rows else []
+            except SQLAlchemyError as e:
+                # Not a duplicate link (those are skipped by the insert itself) but
+                # a bad row, e.g. a value too long for its column: store the others
+                db.rollback()
+                logger.warning(f"Batch insert failed, inserting {len(rows)} offers one by one: {e}")
+                inserted_rows = _insert_per_row(db, rows, failed)
+            if inserted_rows:
+                facets.record_offers(db, inserted_rows)
+                rollups.record_offers(db, inserted_rows)
+            db.commit()
+        return inserted_rows, len(failed)
+    except Exception:
+        db.rollback()
+        raise
     finally:
         try:
             db.close()
@@ -57,6 +221,74 @@ def insert_new_offers(offers):
             logger.error(f"Error closing database session: {e}")
 
 
+def get_browser_pool():
+    """Chrome pool shared by every scrape job of this process (None in cloud environments)"""
+    global _browser_pool
+    if os.environ.get('RENDER'):
+        return None
+    with _browser_pool_lock:
+        if _browser_pool is None:
+            from scraper.indeed_scraper import setup_driver
+            _browser_pool = BrowserPool(setup_driver)
+            atexit.register(_browser_pool.close)
+        return _browser_pool
+
+
+def ingest_pages(pages, country=None, counts=None, stats=None) -> Counter:
+    """Insert page batches from a scraper generator while it fetches the next pages.
+
+    The scraper runs on the calling thread and hands each page to a writer
+    thread through a queue of INGEST_QUEUE_PAGES pages: the first offers are
+    committed one page in, network waits overlap with database writes, and a
+    slow database makes the scraper wait instead of piling up offers. Adds
+    "found", "inserted" and "duplicates" to `counts` as pages are written, so
+    a caller keeps the totals of a run that fails halfway. `stats` collects
+    the phase timings of insert_new_offers().
+    """
+    counts = Counter() if counts is None else counts
+    batches = queue.Queue(maxsize=max(INGEST_QUEUE_PAGES, 1))
+
+    def write():
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            try:
+                inserted, duplicates = insert_new_offers(batch, country, stats=stats)
+                counts["inserted"] += inserted
+                counts["duplicates"] += duplicates
+            except Exception as e:
+                # Keep draining so the scraper never blocks on a full queue
+                logger.error(f"Failed to write a page of offers for {country}: {e}")
+
+    writer = threading.Thread(target=write, name=f"ingest-{country}", daemon=True)
+    writer.start()
+    try:
+        for batch in pages:
+            counts["found"] += len(batch)
+            batches.put(batch)
+    finally:
+        batches.put(None)
+        writer.join()
+    return counts
+
+
+def warm_known_links():
+    """Load every stored offer link into the known-links set"""
+    start = time.time()
+    db = get_db_session()
+    try:
+        links = db.query(Offer.link).execution_options(yield_per=KNOWN_LINKS_WARM_BATCH)
+        _known_links.add_many(link for (link,) in links)
+        _known_links.ready = True
+        logger.info(f"Loaded {len(_known_links)} known offer links in {time.time() - start:.1f}s")
+    except Exception as e:
+        logger.error(f"Failed to load known offer links: {e}")
+    finally:
+        db.close()
+
+
+@profiling.profiled("scrape", label_arg="country")
 def run_scrape_job(max_pages: int = 1, country: str = "Maroc") -> int:
     # Reduce pages in cloud environments
     if os.environ.get('RENDER'):
@@ -66,133 +298,359 @@ def run_scrape_job(max_pages: int = 1, country: str = "Maroc") -> int:
     start_time = time.time()
     logger.info(f"Starting scraping job for {country} with max_pages={max_pages}")
     
-    offers_found = 0
-    inserted = 0
+    counts = Counter()
+    run_stats = {}
+    scrape_start = time.time()
     
     try:
-        # Scrape the offers
-        offers = scrape_indeed(max_pages=max_pages, country=country)
-        offers_found = len(offers)
-        
-        # Insert new offers
-        inserted = insert_new_offers(offers)
+        # The scraper stack is only imported by the process that scrapes
+        from scraper.indeed_scraper import iter_scrape_indeed
+
+        # Scrape the offers, inserting each page as it arrives
+        pages = iter_scrape_indeed(max_pages=max_pages, country=country,
+                                   browser_pool=get_browser_pool(), stats=run_stats, known_links=_known_links)
+        ingest_pages(pages, country, counts, stats=run_stats)
     except Exception as e:
         logger.error(f"Scraping failed for {country}: {e}")
         logger.error(traceback.format_exc())
-        offers_found = 0
-        inserted = 0
-        # Continue to record stats even if scraping failed
+        # Continue to record stats even if scraping failed; pages already written are counted
+    scrape_seconds = time.time() - scrape_start
+    offers_found = counts["found"]
+    inserted = counts["inserted"]
+    duplicates = counts["duplicates"]
     
     # Record scraping statistics
     end_time = time.time()
     duration = int(end_time - start_time)
+    startup_seconds = run_stats.get("startup_seconds", 0.0)
     
-    db = get_db_session()
+    phase_timings = metrics.phase_timings(run_stats)
+    stat = ScrapingStat(
+        country=country,
+        offers_found=offers_found,
+        offers_inserted=inserted,
+        execution_time=datetime.now(),
+        duration_seconds=duration,
+        startup_seconds=round(startup_seconds, 2),
+        scrape_seconds=round(max(scrape_seconds - startup_seconds, 0.0), 2),
+        pages_saved=run_stats.get("pages_saved", 0),
+        blocked=run_stats.get("blocked", 0),
+        phase_timings=phase_timings,
+    )
     try:
-        stat = ScrapingStat(
-            country=country,
-            offers_found=offers_found,
-            offers_inserted=inserted,
-            execution_time=datetime.now(),
-            duration_seconds=duration
-        )
-        db.add(stat)
-        db.commit()
-        logger.info(f"Scraping stats recorded for {country}: {offers_found} found, {inserted} inserted in {duration} seconds")
+        _record_scrape_stat(stat)
+        logger.info(f"Scraping stats recorded for {country}: {offers_found} found, {inserted} inserted in {duration} seconds "
+                    f"({startup_seconds:.1f}s browser startup); phases in ms: {phase_timings}")
     except Exception as e:
         logger.error(f"Failed to record scraping stats for {country}: {e}")
         logger.error(traceback.format_exc())
+    
+    metrics.RUNS.inc(country=country)
+    metrics.RUN_SECONDS.observe(end_time - start_time, country=country)
+    metrics.OFFERS.inc(offers_found, country=country, result="found")
+    metrics.OFFERS.inc(inserted, country=country, result="inserted")
+    metrics.OFFERS.inc(duplicates, country=country, result="duplicate")
+    logger.info(f"Scraping completed for {country}. Found {offers_found} offers, inserted {inserted}, skipped {duplicates} duplicates")
+    return inserted
+
+
+@serialized_write
+def _record_scrape_stat(stat):
+    db = get_db_session()
+    try:
+        db.add(stat)
+        rollups.record_scrape_run(db, stat)
+        db.commit()
+    except Exception:
         db.rollback()
+        raise
     finally:
         try:
             db.close()
         except Exception as e:
             logger.error(f"Error closing database session: {e}")
-    
-    logger.info(f"Scraping completed for {country}. Found {offers_found} offers, inserted {inserted}")
+
+
+def run_scrape_sweep(max_pages: int = 1, countries=None) -> dict:
+    """Scrape every country concurrently, one worker thread per country.
+
+    Each country hits its own Indeed domain and the per-domain token bucket in
+    scraper.rate_limit keeps each domain polite, so a sweep takes roughly as long
+    as the slowest country instead of the sum of all of them.
+    """
+    countries = list(countries or SCRAPE_COUNTRIES)
+    start_time = time.time()
+    logger.info(f"Starting scrape sweep for {', '.join(countries)}")
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(SCRAPE_MAX_WORKERS, len(countries)) or 1,
+                            thread_name_prefix="scrape") as executor:
+        futures = {
+            executor.submit(run_scrape_job, max_pages=max_pages, country=country): country
+            for country in countries
+        }
+        for future in as_completed(futures):
+            country = futures[future]
+            try:
+                results[country] = future.result()
+            except Exception as e:
+                logger.error(f"Scrape sweep failed for {country}: {e}")
+                logger.error(traceback.format_exc())
+                results[country] = 0
+
+    logger.info(f"Scrape sweep finished in {time.time() - start_time:.1f}s: {results}")
+    return results
+
+
+def run_due_scrapes(max_pages: int = 1) -> dict:
+    """Scheduler tick: scrape the countries whose adaptive interval has elapsed"""
+    db = get_db_session()
+    try:
+        due = scheduling.due_countries(db, SCRAPE_COUNTRIES)
+    finally:
+        db.close()
+    if not due:
+        return {}
+    mark_job_running(SWEEP_JOB_ID)
+    return run_scrape_sweep(max_pages=max_pages, countries=due)
+
+
+def _next_sweep_time(job):
+    """First tick at which a country will be due; a tick with nothing due does not count as a run"""
+    next_tick = job.next_run_time
+    if next_tick is None:
+        return None
+    db = get_db_session()
+    try:
+        due_times = scheduling.due_times(db, SCRAPE_COUNTRIES)
+    finally:
+        db.close()
+    if not due_times:
+        return next_tick
+    # ScrapingStat times are local and naive, the scheduler's are aware
+    earliest = min(due_times.values()).astimezone(next_tick.tzinfo)
+    return scheduling.next_tick_at(next_tick, earliest)
+
+
+def _run_queued_job(job_id: int, country: str, max_pages: int):
+    inserted, error = None, None
+    try:
+        inserted = run_scrape_job(max_pages=max_pages, country=country)
+    except Exception as e:
+        logger.error(f"Queued scrape {job_id} failed for {country}: {e}")
+        logger.error(traceback.format_exc())
+        error = str(e)
+    _finish_queued_job(job_id, inserted, error)
     return inserted
 
 
-def get_next_run_times(scheduler):
-    """Get the next run times for all scraping jobs"""
+@serialized_write
+def _finish_queued_job(job_id: int, inserted, error):
+    db = get_db_session()
+    try:
+        scrape_queue.finish(db, job_id, inserted=inserted, error=error)
+    finally:
+        db.close()
+
+
+@serialized_write
+def _claim_queued_jobs():
+    """Mark every queued scrape as running; (id, country, max_pages) of each"""
+    jobs = []
+    db = get_db_session()
+    try:
+        while True:
+            job = scrape_queue.claim_next(db)
+            if job is None:
+                break
+            jobs.append((job.id, job.country, job.max_pages))
+    finally:
+        db.close()
+    return jobs
+
+
+def drain_scrape_queue() -> int:
+    """Run every queued manual scrape, countries in parallel; returns the number of jobs run"""
+    jobs = _claim_queued_jobs()
+    if not jobs:
+        return 0
+
+    logger.info(f"Running {len(jobs)} queued scrape(s): {', '.join(country for _, country, _ in jobs)}")
+    with ThreadPoolExecutor(max_workers=min(SCRAPE_MAX_WORKERS, len(jobs)) or 1,
+                            thread_name_prefix="scrape-queue") as executor:
+        for future in as_completed([executor.submit(_run_queued_job, *job) for job in jobs]):
+            future.result()
+    return len(jobs)
+
+
+def get_next_run_times(scheduler=None):
+    """Get the next run times for all scraping jobs.
+
+    Read from the scheduler_state table, which the leader process keeps up to
+    date, unless a local scheduler is passed in.
+    """
     next_runs = {}
-    job_ids = [
-        "indeed_scrape_job_maroc",
-        "indeed_scrape_job_france",
-        "indeed_scrape_job_canada",
-        "indeed_scrape_job_belgique",
-        "indeed_scrape_job_suisse"
-    ]
-    
-    for job_id in job_ids:
-        try:
-            job = scheduler.get_job(job_id)
-            if job:
-                next_runs[job_id] = job.next_run_time
-        except Exception as e:
-            logger.error(f"Error getting job {job_id}: {e}")
-    
+    if scheduler is not None:
+        for job_id in TIMED_JOB_IDS:
+            try:
+                job = scheduler.get_job(job_id)
+                if job:
+                    next_runs[job_id] = _next_sweep_time(job) if job_id == SWEEP_JOB_ID else job.next_run_time
+            except Exception as e:
+                logger.error(f"Error getting job {job_id}: {e}")
+        return next_runs
+
+    db = get_db_session()
+    try:
+        for state in db.query(SchedulerState).all():
+            next_run = state.next_run_time
+            next_runs[state.job_id] = next_run.replace(tzinfo=timezone.utc) if next_run else None
+    except Exception as e:
+        logger.error(f"Error reading scheduler state: {e}")
+    finally:
+        db.close()
     return next_runs
 
 
+@serialized_write
+def publish_next_runs(scheduler):
+    """Store the next run time of every job for processes without a scheduler"""
+    db = get_db_session()
+    try:
+        db.query(SchedulerState).delete(synchronize_session=False)
+        for job_id, next_run in get_next_run_times(scheduler).items():
+            db.add(SchedulerState(
+                job_id=job_id,
+                next_run_time=next_run.astimezone(timezone.utc).replace(tzinfo=None) if next_run else None,
+                owner=process_name(),
+                updated_at=datetime.utcnow(),
+            ))
+        db.commit()
+    except Exception as e:
+        logger.error(f"Failed to publish scheduler state: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+@serialized_write
+def mark_job_running(job_id: str):
+    """Flag a job as running in scheduler_state; publish_next_runs() clears it"""
+    db = get_db_session()
+    try:
+        db.query(SchedulerState).filter(SchedulerState.job_id == job_id).update(
+            {SchedulerState.running: True, SchedulerState.updated_at: datetime.utcnow()},
+            synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        logger.error(f"Failed to publish scheduler state: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
 def create_scheduler() -> BackgroundScheduler:
     logger.info("Creating scheduler...")
     scheduler = BackgroundScheduler()
+
+    # Crawls stop early at known offers once the stored links are loaded
+    threading.Thread(target=warm_known_links, name="known-links-warmup", daemon=True).start()
+
+    # Optionally start Chrome before the first sweep so no run pays for it
+    if os.environ.get('BROWSER_POOL_WARM') and get_browser_pool() is not None:
+        threading.Thread(target=get_browser_pool().warm, name="browser-warmup", daemon=True).start()
     
-    # Every 1 hour for Morocco
-    scheduler.add_job(
-        func=lambda: run_scrape_job(max_pages=1, country="Maroc"),
-        trigger="interval",
-        minutes=15,
-        id="indeed_scrape_job_maroc",
-        replace_existing=True,
-        max_instances=1,
-        coalesce=True,
-    )
-    
-    # Every 1 hour for France
-    scheduler.add_job(
-        func=lambda: run_scrape_job(max_pages=1, country="France"),
-        trigger="interval",
-        minutes=15,
-        id="indeed_scrape_job_france",
-        replace_existing=True,
-        max_instances=1,
-        coalesce=True,
-    )
-    
-    # Every 1 hour for Canada
-    scheduler.add_job(
-        func=lambda: run_scrape_job(max_pages=1, country="Canada"),
-        trigger="interval",
-        minutes=15,
-        id="indeed_scrape_job_canada",
-        replace_existing=True,
-        max_instances=1,
-        coalesce=True,
-    )
-    
-    # Every 1 hour for Belgium
+    # Every tick, the countries that are due scraped concurrently (see scheduling.py)
     scheduler.add_job(
-        func=lambda: run_scrape_job(max_pages=1, country="Belgique"),
+        func=lambda: run_due_scrapes(max_pages=1),
         trigger="interval",
-        minutes=15,
-        id="indeed_scrape_job_belgique",
+        minutes=scheduling.SCRAPE_TICK_MINUTES,
+        id=SWEEP_JOB_ID,
         replace_existing=True,
         max_instances=1,
         coalesce=True,
     )
     
-    # Every 1 hour for Switzerland
+    # Manual scrapes queued by /api/scrape
     scheduler.add_job(
-        func=lambda: run_scrape_job(max_pages=1, country="Suisse"),
+        func=drain_scrape_queue,
         trigger="interval",
-        minutes=15,
-        id="indeed_scrape_job_suisse",
+        seconds=SCRAPE_QUEUE_POLL_SECONDS,
+        id=QUEUE_JOB_ID,
         replace_existing=True,
         max_instances=1,
         coalesce=True,
     )
     
-    logger.info("Scheduler created with 5 jobs (15 minutes interval)")
-    return scheduler
\ No newline at end of file
+    logger.info(f"Scheduler created with a sweep job for {len(SCRAPE_COUNTRIES)} countries "
+                f"(checked every {scheduling.SCRAPE_TICK_MINUTES:g} minutes, each country every "
+                f"{scheduling.SCRAPE_MIN_INTERVAL_MINUTES:g}-{scheduling.SCRAPE_MAX_INTERVAL_MINUTES:g} minutes)")
+    return scheduler
+
+
+def _become_leader():
+    global _scheduler, _metrics_server
+    # Scrapes run in this process from now on, and so do their metrics
+    if metrics.METRICS_PORT and _metrics_server is None:
+        try:
+            _metrics_server = metrics.serve(int(metrics.METRICS_PORT))
+        except OSError as e:
+            logger.error(f"Could not serve metrics on port {metrics.METRICS_PORT}: {e}")
+    # Jobs still marked running were left behind by the previous leader
+    db = get_db_session()
+    try:
+        requeued = scrape_queue.requeue_running(db)
+        if requeued:
+            logger.info(f"Requeued {requeued} scrape(s) interrupted in the previous scheduler process")
+    finally:
+        db.close()
+    scheduler = create_scheduler()
+
+    # Next run times move once a tick is over (or skipped); run_due_scrapes() flags actual runs
+    def on_job_event(event):
+        if event.job_id in TIMED_JOB_IDS:
+            publish_next_runs(scheduler)
+
+    scheduler.add_listener(on_job_event, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED)
+    scheduler.start()
+    publish_next_runs(scheduler)
+    _scheduler = scheduler
+    logger.info("Scheduler started successfully")
+
+
+def start_scheduler_election(block: bool = False) -> LeaderElection:
+    """Run the scheduler in this process if it wins the leader lock; otherwise stand by"""
+    global _election
+    _election = LeaderElection(make_lock(engine), _become_leader)
+    _election.start(block=block)
+    return _election
+
+
+def get_scheduler() -> Optional[BackgroundScheduler]:
+    """This process's scheduler, or None when another process is the leader"""
+    return _scheduler
+
+
+def shutdown_scheduler():
+    if _scheduler is not None and _scheduler.running:
+        _scheduler.shutdown(wait=False)
+    if _election is not None:
+        _election.stop()
+
+
+if __name__ == "__main__":
+    # Dedicated scheduler process: `python scheduler.py`, with SCHEDULER_MODE=off on the web
+    import signal
+    import sys
+    from database import init_db
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    init_db()
+    try:
+        start_scheduler_election(block=True)
+        while True:
+            time.sleep(3600)
+    except (KeyboardInterrupt, SystemExit):
+        logger.info("Stopping scheduler")
+    finally:
+        shutdown_scheduler()
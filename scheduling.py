@@ -0,0 +1,107 @@
+"""
+Adaptive scrape intervals, one per country, derived from past runs.
+
+Every run leaves a ScrapingStat row. The interval before a country's next
+scrape follows from its last HISTORY_RUNS rows:
+
+- runs blocked by Indeed (403/429) back off exponentially, so a throttled
+  domain is left alone instead of being hit every tick;
+- otherwise the interval is chosen so that a run finds about
+  SCRAPE_TARGET_NEW_OFFERS new offers at the rate observed over the history;
+- a country where nothing new was found backs off exponentially too.
+
+The result is clamped to [SCRAPE_MIN_INTERVAL_MINUTES, SCRAPE_MAX_INTERVAL_MINUTES].
+Nothing is stored: the scheduler ticks every SCRAPE_TICK_MINUTES and scrapes
+the countries that are due, so manual scrapes and restarts are accounted for
+by the same history.
+"""
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from models import ScrapingStat
+
+SCRAPE_MIN_INTERVAL_MINUTES = float(os.environ.get("SCRAPE_MIN_INTERVAL_MINUTES", "15"))
+SCRAPE_MAX_INTERVAL_MINUTES = float(os.environ.get("SCRAPE_MAX_INTERVAL_MINUTES", "240"))
+# How often the scheduler checks which countries are due
+SCRAPE_TICK_MINUTES = float(os.environ.get("SCRAPE_TICK_MINUTES", "5"))
+# New offers a run should find at the observed rate
+SCRAPE_TARGET_NEW_OFFERS = float(os.environ.get("SCRAPE_TARGET_NEW_OFFERS", "5"))
+# Past runs per country the interval is computed from
+HISTORY_RUNS = 8
+
+
+class RunSummary(NamedTuple):
+    execution_time: datetime
+    offers_inserted: int
+    blocked: int
+
+
+def _clamp(minutes: float) -> timedelta:
+    return timedelta(minutes=min(max(minutes, SCRAPE_MIN_INTERVAL_MINUTES), SCRAPE_MAX_INTERVAL_MINUTES))
+
+
+def _streak(runs: List[RunSummary], predicate) -> int:
+    streak = 0
+    for run in runs:
+        if not predicate(run):
+            break
+        streak += 1
+    return streak
+
+
+def next_interval(runs: List[RunSummary]) -> timedelta:
+    """Wait after the newest of `runs` (newest first) before scraping the country again"""
+    if not runs:
+        return _clamp(0)
+
+    blocked = _streak(runs, lambda run: run.blocked > 0)
+    if blocked:
+        return _clamp(SCRAPE_MIN_INTERVAL_MINUTES * 2 ** blocked)
+
+    # Each run's offers appeared since the run before it, so the oldest one only marks the start
+    span_minutes = (runs[0].execution_time - runs[-1].execution_time).total_seconds() / 60
+    inserted = sum(run.offers_inserted for run in runs[:-1])
+    if span_minutes > 0 and inserted > 0:
+        return _clamp(SCRAPE_TARGET_NEW_OFFERS / (inserted / span_minutes))
+
+    empty = _streak(runs, lambda run: run.offers_inserted == 0)
+    return _clamp(SCRAPE_MIN_INTERVAL_MINUTES * 2 ** empty)
+
+
+def recent_runs(db, countries: Iterable[str]) -> Dict[str, List[RunSummary]]:
+    """The last HISTORY_RUNS runs of each country, newest first"""
+    runs = {}
+    for country in countries:
+        rows = (
+            db.query(ScrapingStat.execution_time, ScrapingStat.offers_inserted, ScrapingStat.blocked)
+            .filter(ScrapingStat.country == country)
+            .order_by(ScrapingStat.execution_time.desc())
+            .limit(HISTORY_RUNS)
+            .all()
+        )
+        runs[country] = [RunSummary(time, inserted or 0, blocked or 0) for time, inserted, blocked in rows]
+    return runs
+
+
+def due_times(db, countries: Iterable[str], now: Optional[datetime] = None) -> Dict[str, datetime]:
+    """When each country should next be scraped (local time, like ScrapingStat.execution_time)"""
+    now = now or datetime.now()
+    return {
+        country: runs[0].execution_time + next_interval(runs) if runs else now
+        for country, runs in recent_runs(db, countries).items()
+    }
+
+
+def due_countries(db, countries: Iterable[str], now: Optional[datetime] = None) -> List[str]:
+    now = now or datetime.now()
+    return [country for country, due in due_times(db, countries, now).items() if due <= now]
+
+
+def next_tick_at(first_tick: datetime, due: datetime) -> datetime:
+    """The first tick at or after `due`, ticks starting at `first_tick` every SCRAPE_TICK_MINUTES"""
+    if due <= first_tick:
+        return first_tick
+    tick = timedelta(minutes=SCRAPE_TICK_MINUTES)
+    return first_tick + tick * math.ceil((due - first_tick) / tick)
@@ -0,0 +1,108 @@
+"""
+Persistent queue of manual scrape requests.
+
+/api/scrape adds a row to scrape_jobs and returns at once; the process that
+runs the scheduler drains the queue (scheduler.drain_scrape_queue). A country
+has at most one queued or running job: scrape_jobs.active_country is unique,
+so a request arriving while one is pending joins it instead of starting a
+second scrape of the same pages.
+"""
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from models import ScrapeJob
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def enqueue(db, country: str, max_pages: int = 1) -> Tuple[ScrapeJob, bool]:
+    """
+    Queue a scrape of `country`, or join the one already queued or running.
+    Returns (job, coalesced).
+    """
+    for _ in range(2):
+        active = db.query(ScrapeJob).filter(ScrapeJob.active_country == country).first()
+        if active is not None:
+            db.query(ScrapeJob).filter(ScrapeJob.id == active.id).update(
+                {ScrapeJob.requests: ScrapeJob.requests + 1}, synchronize_session=False)
+            db.commit()
+            db.refresh(active)
+            return active, True
+        job = ScrapeJob(country=country, active_country=country, max_pages=max_pages, status=QUEUED)
+        db.add(job)
+        try:
+            db.commit()
+            return job, False
+        except IntegrityError:
+            # Another request queued this country between our lookup and insert
+            db.rollback()
+    raise RuntimeError(f"Could not queue a scrape for {country}")
+
+
+def get_job(db, job_id: int) -> Optional[ScrapeJob]:
+    return db.get(ScrapeJob, job_id)
+
+
+def claim_next(db) -> Optional[ScrapeJob]:
+    """Mark the oldest queued job as running and return it, or None if the queue is empty"""
+    while True:
+        job = (
+            db.query(ScrapeJob)
+            .filter(ScrapeJob.status == QUEUED)
+            .order_by(ScrapeJob.requested_at, ScrapeJob.id)
+            .first()
+        )
+        if job is None:
+            return None
+        claimed = (
+            db.query(ScrapeJob)
+            .filter(ScrapeJob.id == job.id, ScrapeJob.status == QUEUED)
+            .update({ScrapeJob.status: RUNNING, ScrapeJob.started_at: datetime.utcnow()},
+                    synchronize_session=False)
+        )
+        db.commit()
+        if claimed:
+            db.refresh(job)
+            return job
+
+
+def finish(db, job_id: int, inserted: Optional[int] = None, error: Optional[str] = None):
+    """Record the outcome of a job and free its country for new requests"""
+    db.query(ScrapeJob).filter(ScrapeJob.id == job_id).update({
+        ScrapeJob.status: FAILED if error else DONE,
+        ScrapeJob.active_country: None,
+        ScrapeJob.inserted: inserted,
+        ScrapeJob.error: error[:1000] if error else None,
+        ScrapeJob.finished_at: datetime.utcnow(),
+    }, synchronize_session=False)
+    db.commit()
+
+
+def requeue_running(db) -> int:
+    """Put back jobs left running by a scheduler process that died; called by its successor"""
+    count = (
+        db.query(ScrapeJob)
+        .filter(ScrapeJob.status == RUNNING)
+        .update({ScrapeJob.status: QUEUED, ScrapeJob.started_at: None}, synchronize_session=False)
+    )
+    db.commit()
+    return count
+
+
+def to_dict(job: ScrapeJob) -> dict:
+    return {
+        "id": job.id,
+        "country": job.country,
+        "status": job.status,
+        "requests": job.requests,
+        "inserted": job.inserted,
+        "error": job.error,
+        "requested_at": job.requested_at.isoformat() if job.requested_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
@@ -0,0 +1,203 @@
+"""
+On-disk archive of the raw result pages fetched from Indeed.
+
+Each page is stored once, compressed, under the SHA-256 of its HTML:
+
+    <PAGE_ARCHIVE_DIR>/ab/abcdef....html.zst    (.html.gz without zstandard)
+    <PAGE_ARCHIVE_DIR>/ab/abcdef....json        url, country, source, fetched_at of every fetch
+
+A page fetched again with identical content only gains a line in its
+sidecar. When the compressed pages exceed PAGE_ARCHIVE_MAX_MB, the least
+recently fetched ones are deleted until the archive is back under 90% of the
+limit. PAGE_ARCHIVE_MAX_MB=0 turns archiving off.
+
+reparse.py replays the archive through the card parser to backfill or correct
+offers without touching the network.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "page_archive")
+PAGE_ARCHIVE_DIR = os.environ.get("PAGE_ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR)
+PAGE_ARCHIVE_MAX_MB = float(os.environ.get("PAGE_ARCHIVE_MAX_MB", "500"))
+ZSTD_LEVEL = 10
+# Eviction frees space down to this fraction of the limit, so it does not run on every write
+EVICTION_TARGET = 0.9
+
+ZSTD_SUFFIX = ".html.zst"
+GZIP_SUFFIX = ".html.gz"
+META_SUFFIX = ".json"
+
+
+class ArchivedPage(NamedTuple):
+    digest: str
+    path: str
+    fetches: List[Dict[str, str]]
+
+    @property
+    def first_fetch(self) -> Dict[str, str]:
+        return min(self.fetches, key=lambda fetch: fetch.get("fetched_at", ""))
+
+
+def _compress(data: bytes) -> bytes:
+    if ZSTD_AVAILABLE:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data)
+
+
+def read_page(path: str) -> str:
+    """The HTML stored at `path`, whichever codec wrote it"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(ZSTD_SUFFIX):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError(f"{path} is zstd-compressed; install zstandard to read it")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    else:
+        data = gzip.decompress(data)
+    return data.decode("utf-8")
+
+
+class PageArchive:
+    def __init__(self, root: str = PAGE_ARCHIVE_DIR, max_bytes: float = PAGE_ARCHIVE_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # Compressed bytes on disk, scanned on first write
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _base(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def _page_path(self, base: str) -> Optional[str]:
+        for suffix in (ZSTD_SUFFIX, GZIP_SUFFIX):
+            if os.path.exists(base + suffix):
+                return base + suffix
+        return None
+
+    def store(self, html: str, url: str, country: Optional[str] = None, source: Optional[str] = None) -> Optional[str]:
+        """Archive one fetched page; returns its content hash. Never raises."""
+        if not self.enabled or not html:
+            return None
+        try:
+            data = html.encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()
+            fetch = {
+                "url": url,
+                "country": country,
+                "source": source,
+                "fetched_at": datetime.utcnow().isoformat(timespec="seconds"),
+            }
+            base = self._base(digest)
+            with self._lock:
+                if self._size is None:
+                    self._size = self._scan_size()
+                os.makedirs(os.path.dirname(base), exist_ok=True)
+                if self._page_path(base) is None:
+                    path = base + (ZSTD_SUFFIX if ZSTD_AVAILABLE else GZIP_SUFFIX)
+                    compressed = _compress(data)
+                    # Written under a temporary name so readers never see half a page
+                    with open(path + ".tmp", "wb") as f:
+                        f.write(compressed)
+                    os.replace(path + ".tmp", path)
+                    self._size += len(compressed)
+                # One JSON object per line; appending keeps concurrent writers simple
+                with open(base + META_SUFFIX, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(fetch) + "\n")
+                if self._size > self.max_bytes:
+                    self._evict()
+            return digest
+        except OSError as e:
+            logger.error(f"Could not archive {url}: {e}")
+            return None
+
+    def _entries(self) -> Iterator[os.DirEntry]:
+        if not os.path.isdir(self.root):
+            return
+        for shard in os.scandir(self.root):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith((ZSTD_SUFFIX, GZIP_SUFFIX)):
+                        yield entry
+
+    def _scan_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _evict(self):
+        """Delete least recently fetched pages until under EVICTION_TARGET of the limit"""
+        pages = []
+        for entry in self._entries():
+            meta = entry.path.rsplit(".html.", 1)[0] + META_SUFFIX
+            try:
+                last_fetch = os.stat(meta).st_mtime
+            except OSError:
+                last_fetch = entry.stat().st_mtime
+            pages.append((last_fetch, entry.path, meta, entry.stat().st_size))
+        pages.sort()
+        size = sum(page[3] for page in pages)
+        target = self.max_bytes * EVICTION_TARGET
+        evicted = 0
+        for _, path, meta, page_size in pages:
+            if size <= target:
+                break
+            for stale in (path, meta):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+            size -= page_size
+            evicted += 1
+        self._size = size
+        logger.info(f"Page archive over {self.max_bytes / 1024 / 1024:.0f} MB, evicted {evicted} pages")
+
+    def pages(self, country: Optional[str] = None, since: Optional[datetime] = None) -> Iterator[ArchivedPage]:
+        """Archived pages, optionally only those fetched for `country` or after `since`"""
+        for entry in self._entries():
+            digest = entry.name.split(".", 1)[0]
+            fetches = []
+            try:
+                with open(self._base(digest) + META_SUFFIX, encoding="utf-8") as f:
+                    fetches = [json.loads(line) for line in f if line.strip()]
+            except (OSError, ValueError):
+                pass
+            if country:
+                fetches = [fetch for fetch in fetches if fetch.get("country") == country]
+            if since:
+                fetches = [fetch for fetch in fetches if fetch.get("fetched_at", "") >= since.isoformat()]
+            if fetches or not (country or since):
+                yield ArchivedPage(digest, entry.path, fetches or [{}])
+
+    def size(self) -> int:
+        with self._lock:
+            self._size = self._scan_size()
+            return self._size
+
+
+_archive = PageArchive()
+
+
+def archive_page(html: str, url: str, country: Optional[str] = None, source: Optional[str] = None) -> Optional[str]:
+    """Store a fetched page in the process-wide archive"""
+    return _archive.store(html, url, country=country, source=source)
+
+
+def get_archive() -> PageArchive:
+    return _archive
@@ -0,0 +1,182 @@
+"""
+Asyncio fetch engine for Indeed result pages.
+
+Pages are fetched concurrently over one pooled aiohttp session (keep-alive
+connections are reused across pages), capped by an explicit concurrency limit.
+Instead of fixed sleeps before every request, the engine only slows down when
+Indeed pushes back: a 429/403 doubles a shared backoff delay (honouring
+Retry-After), and every successful response shrinks it again.
+"""
+import asyncio
+import importlib.util
+import queue
+import random
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from scraper.rate_limit import limiter_for_url
+
+# aiohttp is imported when pages are first fetched, not with this module
+AIOHTTP_AVAILABLE = importlib.util.find_spec("aiohttp") is not None
+
+
+BLOCKED_STATUSES = (403, 429)
+
+
+class AdaptiveBackoff:
+    """Shared delay that grows on 429/403 responses and decays on success"""
+
+    def __init__(self, min_delay: float = 0.0, max_delay: float = 120.0, initial_block_delay: float = 2.0):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_block_delay = initial_block_delay
+        self.delay = min_delay
+        self.resume_at = 0.0
+        self.blocked = 0
+
+    async def wait(self):
+        pause = self.resume_at - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+    def on_blocked(self, retry_after: Optional[float] = None):
+        self.blocked += 1
+        self.delay = min(self.max_delay, max(self.delay * 2, self.initial_block_delay, retry_after or 0))
+        # Jitter so concurrent workers do not all retry in the same instant
+        self.resume_at = max(self.resume_at, time.monotonic() + self.delay * random.uniform(1.0, 1.25))
+
+    def on_success(self):
+        self.delay = max(self.min_delay, self.delay * 0.5)
+
+
+def _retry_after(headers) -> Optional[float]:
+    value = headers.get("Retry-After")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+async def _fetch_one(session, url: str, semaphore: asyncio.Semaphore, backoff: AdaptiveBackoff,
+                     max_retries: int) -> Tuple[str, int, Optional[str]]:
+    import aiohttp
+
+    status = 0
+    for attempt in range(max_retries + 1):
+        async with semaphore:
+            await backoff.wait()
+            wait = limiter_for_url(url).reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                async with session.get(url, allow_redirects=True) as resp:
+                    status = resp.status
+                    if status in BLOCKED_STATUSES:
+                        backoff.on_blocked(_retry_after(resp.headers))
+                        print(f"Async fetch blocked with status {status} for {url} (attempt {attempt + 1})")
+                        continue
+                    text = await resp.text()
+                    backoff.on_success()
+                    return url, status, text
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Async fetch error for {url}: {e}")
+    return url, status, None
+
+
+async def fetch_pages(urls: List[str], concurrency: int = 3, headers: Optional[Dict[str, str]] = None,
+                      timeout: float = 30.0, max_retries: int = 3,
+                      backoff: Optional[AdaptiveBackoff] = None) -> List[Tuple[str, int, Optional[str]]]:
+    """Fetch `urls` concurrently. Returns (url, status, text) in input order;
+    text is None for pages that failed or stayed blocked after retries."""
+    if not AIOHTTP_AVAILABLE:
+        raise RuntimeError("aiohttp is not installed")
+    import aiohttp
+
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    backoff = backoff or AdaptiveBackoff()
+    connector = aiohttp.TCPConnector(limit=max(concurrency, 1), ttl_dns_cache=300)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(connector=connector, headers=headers, timeout=client_timeout) as session:
+        return await asyncio.gather(*(
+            _fetch_one(session, url, semaphore, backoff, max_retries) for url in urls
+        ))
+
+
+def fetch_pages_sync(urls: List[str], **kwargs) -> List[Tuple[str, int, Optional[str]]]:
+    """Run fetch_pages from synchronous code (scheduler threads have no event loop)"""
+    return asyncio.run(fetch_pages(urls, **kwargs))
+
+
+def _put(results: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the consumer has stopped"""
+    while not stop.is_set():
+        try:
+            results.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+async def _fetch_as_completed(urls: List[str], results: queue.Queue, stop: threading.Event,
+                              concurrency: int = 3, headers: Optional[Dict[str, str]] = None,
+                              timeout: float = 30.0, max_retries: int = 3,
+                              backoff: Optional[AdaptiveBackoff] = None):
+    """Fetch `urls` with `concurrency` workers, each handing its page to
+    `results` before taking the next URL: with a full queue the workers wait,
+    so no more than `concurrency` fetched pages wait outside it."""
+    import aiohttp
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    backoff = backoff or AdaptiveBackoff()
+    pending = iter(urls)
+    connector = aiohttp.TCPConnector(limit=max(concurrency, 1), ttl_dns_cache=300)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async def worker(session):
+        for url in pending:
+            if stop.is_set():
+                return
+            page = await _fetch_one(session, url, semaphore, backoff, max_retries)
+            # The put blocks while the consumer is behind; keep it off the event loop
+            if not await loop.run_in_executor(None, _put, results, page, stop):
+                return
+
+    async with aiohttp.ClientSession(connector=connector, headers=headers, timeout=client_timeout) as session:
+        await asyncio.gather(*(worker(session) for _ in range(max(concurrency, 1))))
+
+
+def iter_pages_sync(urls: List[str], buffer: int = 2, **kwargs) -> Iterator[Tuple[str, int, Optional[str]]]:
+    """
+    Like fetch_pages_sync, but yields each (url, status, text) as soon as it
+    is fetched, in completion order. The event loop runs on its own thread
+    and stays at most `buffer` pages ahead of the caller (plus the pages in
+    flight); closing the iterator early stops the remaining fetches.
+    """
+    if not AIOHTTP_AVAILABLE:
+        raise RuntimeError("aiohttp is not installed")
+    results: queue.Queue = queue.Queue(maxsize=max(buffer, 1))
+    stop = threading.Event()
+    done = object()
+
+    def run():
+        try:
+            asyncio.run(_fetch_as_completed(urls, results, stop, **kwargs))
+        except BaseException as e:
+            _put(results, e, stop)
+        finally:
+            _put(results, done, stop)
+
+    threading.Thread(target=run, name="async-fetch", daemon=True).start()
+    try:
+        while True:
+            item = results.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
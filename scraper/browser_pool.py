@@ -0,0 +1,171 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+
+# Pool sizing and recycling, overridable from the environment
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_PAGES = int(os.environ.get("BROWSER_MAX_PAGES", "200"))
+BROWSER_MAX_MEMORY_GROWTH_MB = float(os.environ.get("BROWSER_MAX_MEMORY_GROWTH_MB", "300"))
+
+
+class PooledDriver:
+    """A warm WebDriver plus the bookkeeping needed to decide when to recycle it"""
+
+    def __init__(self, driver, startup_seconds: float):
+        self.driver = driver
+        self.startup_seconds = startup_seconds
+        self.pages = 0
+        self.created_at = time.time()
+        self.baseline_memory_mb = heap_size_mb(driver)
+
+    def memory_growth_mb(self) -> float:
+        return max(heap_size_mb(self.driver) - self.baseline_memory_mb, 0.0)
+
+
+def heap_size_mb(driver) -> float:
+    """JS heap used by the browser tab, in MB (0 when Chrome does not expose it)"""
+    try:
+        used = driver.execute_script(
+            "return window.performance && performance.memory ? performance.memory.usedJSHeapSize : 0"
+        )
+        return (used or 0) / (1024 * 1024)
+    except Exception:
+        return 0.0
+
+
+def is_healthy(driver) -> bool:
+    try:
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        print(f"Error closing driver: {e}")
+
+
+class BrowserPool:
+    """
+    Long-lived pool of headless Chrome drivers shared by the scrape jobs.
+
+    Drivers are created lazily up to `size`, handed out one per country with
+    `acquire()`, health-checked before use and recycled once they have served
+    `max_pages` pages or their heap grew by more than `max_memory_growth_mb`.
+    """
+
+    def __init__(self, factory: Callable, size: int = BROWSER_POOL_SIZE, max_pages: int = BROWSER_MAX_PAGES,
+                 max_memory_growth_mb: float = BROWSER_MAX_MEMORY_GROWTH_MB):
+        self.factory = factory
+        self.size = max(size, 1)
+        self.max_pages = max_pages
+        self.max_memory_growth_mb = max_memory_growth_mb
+        self.idle: "queue.LifoQueue[PooledDriver]" = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def _start_driver(self) -> Optional[PooledDriver]:
+        start = time.time()
+        driver = self.factory()
+        if driver is None:
+            return None
+        return PooledDriver(driver, time.time() - start)
+
+    def warm(self, count: Optional[int] = None):
+        """Start drivers ahead of time so the first scrape does not pay for it"""
+        for _ in range(min(count or self.size, self.size)):
+            with self.lock:
+                if self.created >= self.size:
+                    return
+                self.created += 1
+            pooled = self._start_driver()
+            if pooled is None:
+                with self.lock:
+                    self.created -= 1
+                return
+            # Warm-up happens outside any scrape run, so borrowers pay nothing
+            pooled.startup_seconds = 0.0
+            self.idle.put(pooled)
+
+    def _take(self, timeout: float) -> Optional[PooledDriver]:
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            can_create = self.created < self.size
+            if can_create:
+                self.created += 1
+        if can_create:
+            pooled = self._start_driver()
+            if pooled is None:
+                with self.lock:
+                    self.created -= 1
+            return pooled
+        try:
+            return self.idle.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _discard(self, pooled: PooledDriver):
+        _quit(pooled.driver)
+        with self.lock:
+            self.created -= 1
+
+    @contextmanager
+    def acquire(self, timeout: float = 300.0):
+        """
+        Borrow a healthy driver. Yields a PooledDriver, or None if no driver
+        could be started. `startup_seconds` on the yielded object is the time
+        this caller spent starting a browser (0 when a warm one was reused).
+        """
+        pooled = self._take(timeout)
+        startup = pooled.startup_seconds if pooled is not None else 0.0
+        while pooled is not None and not is_healthy(pooled.driver):
+            print("Pooled Chrome driver failed health check, replacing it")
+            self._discard(pooled)
+            pooled = self._take(timeout)
+            startup += pooled.startup_seconds if pooled is not None else 0.0
+
+        if pooled is None:
+            yield None
+            return
+
+        pooled.startup_seconds = startup
+        try:
+            yield pooled
+        finally:
+            self.release(pooled)
+
+    def release(self, pooled: PooledDriver):
+        if self.closed:
+            self._discard(pooled)
+            return
+        if pooled.pages >= self.max_pages:
+            print(f"Recycling Chrome driver after {pooled.pages} pages")
+            self._discard(pooled)
+            return
+        growth = pooled.memory_growth_mb()
+        if growth > self.max_memory_growth_mb:
+            print(f"Recycling Chrome driver after {growth:.0f} MB heap growth")
+            self._discard(pooled)
+            return
+        # Startup cost has been paid; later borrowers get it for free
+        pooled.startup_seconds = 0.0
+        self.idle.put(pooled)
+
+    def close(self):
+        self.closed = True
+        while True:
+            try:
+                pooled = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(pooled)
@@ -0,0 +1,277 @@
+"""
+lxml-based job card extraction.
+
+extract_card() pulls title, link, company, location and date out of a card in
+a single walk of its subtree, recording the first element matching each of the
+selectors parse_job_card() tries, then applying parse_job_card()'s priority
+order. parse_job_card() in scraper.indeed_scraper stays the reference
+implementation; both must return the same dict for the same card.
+"""
+import importlib.util
+import re
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urljoin
+
+# lxml is imported when the first page is parsed, not with this module
+LXML_AVAILABLE = importlib.util.find_spec("lxml") is not None
+
+
+DATE_KEYWORDS = re.compile(r"il y a|jour|heure|semaine|mois|posted|hier|ago")
+
+
+def _class_xpath(tag: str, cls: str) -> str:
+    return f"//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+
+
+# CSS selectors used by the scrapers to find cards, as class/attribute XPaths
+CARD_XPATHS = {
+    "div.job_seen_beacon": _class_xpath("div", "job_seen_beacon"),
+    ".resultContent": _class_xpath("*", "resultContent"),
+    ".jobsearch-SerpJobCard": _class_xpath("*", "jobsearch-SerpJobCard"),
+    "[data-jk]": "//*[@data-jk]",
+    "div[data-testid='job-card']": "//div[@data-testid='job-card']",
+}
+
+# Attributes of the element wrapping Indeed's result list, most specific first
+RESULTS_CONTAINER_MARKERS = (
+    'id="mosaic-provider-jobcards"',
+    "id='mosaic-provider-jobcards'",
+    'class="jobsearch-ResultsList',
+    'id="resultsCol"',
+)
+
+# Element text is ignored inside these, like BeautifulSoup's get_text()
+_SKIP_TEXT_TAGS = {"script", "style", "template"}
+
+# Ancestor flags tracked during the walk
+_IN_H2 = 1
+_IN_RESULT_FOOTER = 2
+_IN_SHELF = 4
+_IN_SERP_CARD = 8
+_IN_METADATA = 16
+
+
+def _classes(el) -> List[str]:
+    return el.get("class", "").split()
+
+
+def _context_flags(el, tag: str, classes: List[str]) -> int:
+    flags = 0
+    if tag == "h2":
+        flags |= _IN_H2
+    if "resultFooter" in classes and tag == "div":
+        flags |= _IN_RESULT_FOOTER
+    if "jobCardShelfContainer" in classes:
+        flags |= _IN_SHELF
+    if "jobsearch-SerpJobCard" in classes:
+        flags |= _IN_SERP_CARD
+    if "metadataContainer" in classes and tag in ("ul", "div"):
+        flags |= _IN_METADATA
+    return flags
+
+
+def _text(el) -> str:
+    """Equivalent of BeautifulSoup's get_text(strip=True)"""
+    parts: List[str] = []
+    _collect_text(el, parts)
+    return "".join(p for p in (s.strip() for s in parts) if p)
+
+
+def _collect_text(el, parts: List[str]):
+    if isinstance(el.tag, str) and el.tag not in _SKIP_TEXT_TAGS and el.text:
+        parts.append(el.text)
+    for child in el:
+        _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+
+
+class _CardMatches:
+    """First element (in document order) matching each selector slot"""
+
+    __slots__ = ("link", "company", "location", "date_containers", "metadata_items", "strings", "date_tags")
+
+    def __init__(self):
+        # h2 a, a.jcs-JobTitle, a[aria-label], a[data-jk]
+        self.link: List[Optional[object]] = [None] * 4
+        # span[data-testid='company-name'], span.companyName, .companyName
+        self.company: List[Optional[object]] = [None] * 3
+        # div[data-testid='text-location'], div.companyLocation, .companyLocation
+        self.location: List[Optional[object]] = [None] * 3
+        self.date_containers: List[object] = []
+        self.metadata_items: List[object] = []
+        self.strings: List[str] = []
+        # Strategy 4 selectors of parse_job_card, in priority order
+        self.date_tags: List[Optional[object]] = [None] * 8
+
+
+def _set_first(slots: List, index: int, el):
+    if slots[index] is None:
+        slots[index] = el
+
+
+def _walk(el, flags: int, m: _CardMatches):
+    for child in el:
+        tag = child.tag
+        if not isinstance(tag, str):
+            # Comments and processing instructions: BeautifulSoup's
+            # find_all(text=True) still sees their content and tail
+            if child.text:
+                m.strings.append(child.text)
+            if child.tail:
+                m.strings.append(child.tail)
+            continue
+
+        classes = _classes(child)
+        testid = child.get("data-testid")
+
+        if tag == "a":
+            if flags & _IN_H2:
+                _set_first(m.link, 0, child)
+            if "jcs-JobTitle" in classes:
+                _set_first(m.link, 1, child)
+            if child.get("aria-label") is not None:
+                _set_first(m.link, 2, child)
+            if child.get("data-jk") is not None:
+                _set_first(m.link, 3, child)
+
+        if "companyName" in classes:
+            if tag == "span":
+                _set_first(m.company, 1, child)
+            _set_first(m.company, 2, child)
+        if "companyLocation" in classes:
+            if tag == "div":
+                _set_first(m.location, 1, child)
+            _set_first(m.location, 2, child)
+
+        if tag in ("div", "span") and ("jobCardReqMore" in classes or "jobCardShelfContainer" in classes):
+            m.date_containers.append(child)
+        if flags & _IN_METADATA and tag in ("li", "span"):
+            m.metadata_items.append(child)
+
+        if testid is not None:
+            if tag == "span" and testid == "company-name":
+                _set_first(m.company, 0, child)
+            if tag == "div" and testid == "text-location":
+                _set_first(m.location, 0, child)
+            if tag == "span" and testid == "myJobsStateDate":
+                _set_first(m.date_tags, 0, child)
+            if "date" in testid:
+                _set_first(m.date_tags, 6, child)
+        if "date" in classes:
+            if tag == "span":
+                _set_first(m.date_tags, 1, child)
+            if flags & _IN_RESULT_FOOTER:
+                _set_first(m.date_tags, 3, child)
+            if flags & _IN_SHELF:
+                _set_first(m.date_tags, 4, child)
+            if flags & _IN_SERP_CARD:
+                _set_first(m.date_tags, 7, child)
+        if tag == "span":
+            if "postedAt" in classes:
+                _set_first(m.date_tags, 2, child)
+            if "Posted" in child.get("title", ""):
+                _set_first(m.date_tags, 5, child)
+
+        if child.text:
+            m.strings.append(child.text)
+        _walk(child, flags | _context_flags(child, tag, classes), m)
+        if child.tail:
+            m.strings.append(child.tail)
+
+
+def _first(slots: List) -> Optional[object]:
+    for el in slots:
+        if el is not None:
+            return el
+    return None
+
+
+def _find_date(m: _CardMatches) -> Optional[str]:
+    for container in m.date_containers:
+        text = _text(container)
+        if text and DATE_KEYWORDS.search(text.lower()):
+            return text
+    for item in m.metadata_items:
+        text = _text(item)
+        if text and DATE_KEYWORDS.search(text.lower()):
+            return text
+    for string in m.strings:
+        stripped = string.strip()
+        if stripped and DATE_KEYWORDS.search(stripped.lower()):
+            return stripped
+    date_tag = _first(m.date_tags)
+    if date_tag is not None:
+        return _text(date_tag) or None
+    return None
+
+
+def extract_card(card) -> Dict[str, str]:
+    """Single-pass equivalent of parse_job_card() for an lxml element"""
+    flags = 0
+    for ancestor in card.iterancestors():
+        flags |= _context_flags(ancestor, ancestor.tag, _classes(ancestor))
+    flags |= _context_flags(card, card.tag, _classes(card))
+    # Metadata containers only count when they are inside the card
+    flags &= ~_IN_METADATA
+    m = _CardMatches()
+    if card.text:
+        m.strings.append(card.text)
+    _walk(card, flags, m)
+
+    title = None
+    link = None
+    link_tag = _first(m.link)
+    if link_tag is not None:
+        title = _text(link_tag) or None
+        href = link_tag.get("href")
+        if href:
+            link = urljoin("https://ma.indeed.com", href)
+
+    company_tag = _first(m.company)
+    location_tag = _first(m.location)
+
+    return {
+        "title": title or "",
+        "company": (_text(company_tag) if company_tag is not None else None) or "",
+        "location": (_text(location_tag) if location_tag is not None else None) or "",
+        "date_posted": _find_date(m) or "",
+        "link": link or "",
+    }
+
+
+def select_cards(doc, selectors: Sequence[str]) -> list:
+    """Cards matching the first selector that matches anything, like `select(a) or select(b)`"""
+    for selector in selectors:
+        cards = doc.xpath(CARD_XPATHS[selector])
+        if cards:
+            return cards
+    return []
+
+
+def results_fragment(html: str) -> str:
+    """
+    The part of a result page from the job list container to the end of the
+    document, found with a plain string search so the navigation, inline
+    scripts and JSON blobs before it are never tokenized. Returns the whole
+    page when no known container is present.
+    """
+    for marker in RESULTS_CONTAINER_MARKERS:
+        index = html.find(marker)
+        if index != -1:
+            tag_start = html.rfind("<", 0, index)
+            if tag_start != -1:
+                return html[tag_start:]
+    return html
+
+
+def parse_document(html: str):
+    """lxml tree of the results part of a page"""
+    import lxml.html
+
+    return lxml.html.document_fromstring(results_fragment(html))
+
+
+def parse_cards(html: str, selectors: Sequence[str]) -> List[Dict[str, str]]:
+    """Parse the results part of a page with lxml and extract every card"""
+    return [extract_card(card) for card in select_cards(parse_document(html), selectors)]
@@ -0,0 +1,78 @@
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+
+# Every date form Indeed shows, French and English, in one alternation so a
+# string is scanned once. Relative forms are resolved against `today`.
+DATE_PATTERN = re.compile(r"""
+    il\ y\ a\ (?P<fr_n>\d+)\s*(?P<fr_unit>minute|heure|jour|semaine|mois)   # "il y a 2 jours"
+  | (?P<plus_n>\d+)\s*\+\s*(?:jours?|days?)                                # "30+ jours", "30+ days ago"
+  | plus\ de\ (?P<plus_fr_n>\d+)\s*jours?                                  # "il y a plus de 30 jours"
+  | (?P<en_n>\d+)\s*(?P<en_unit>minute|hour|day|week|month)s?\ ago         # "posted 3 days ago"
+  | (?P<d>\d+)/(?P<m>\d+)/(?P<y>\d+)                                       # "15/10/2024"
+  | (?P<iso_y>\d{4})-(?P<iso_m>\d{2})-(?P<iso_d>\d{2})                     # "2024-10-15"
+  | \b(?P<yesterday>hier|yesterday)\b                                      # not "Gauthier", "fichier"
+  | \b(?P<today>aujourd['’]hui|today|à\ l['’]instant|just\ posted)\b
+""", re.VERBOSE)
+
+UNIT_DELTAS = {
+    "minute": timedelta(minutes=1),
+    "heure": timedelta(hours=1),
+    "hour": timedelta(hours=1),
+    "jour": timedelta(days=1),
+    "day": timedelta(days=1),
+    "semaine": timedelta(weeks=1),
+    "week": timedelta(weeks=1),
+    "mois": timedelta(days=30),
+    "month": timedelta(days=30),
+}
+
+
+@lru_cache(maxsize=4096)
+def _parse(text: str, today: date) -> Optional[date]:
+    match = DATE_PATTERN.search(text.lower())
+    if not match:
+        return None
+    groups = match.groupdict()
+    try:
+        if groups["fr_n"]:
+            return today - int(groups["fr_n"]) * UNIT_DELTAS[groups["fr_unit"]]
+        if groups["plus_n"] or groups["plus_fr_n"]:
+            return today - timedelta(days=int(groups["plus_n"] or groups["plus_fr_n"]))
+        if groups["en_n"]:
+            return today - int(groups["en_n"]) * UNIT_DELTAS[groups["en_unit"]]
+        if groups["d"]:
+            return date(int(groups["y"]), int(groups["m"]), int(groups["d"]))
+        if groups["iso_y"]:
+            return date(int(groups["iso_y"]), int(groups["iso_m"]), int(groups["iso_d"]))
+        if groups["yesterday"]:
+            return today - timedelta(days=1)
+        if groups["today"]:
+            return today
+    except (ValueError, OverflowError):
+        return None
+    return None
+
+
+def parse_date_posted(date_text: str, today: Optional[date] = None) -> Optional[date]:
+    """Parse date text to actual date object"""
+    if not date_text:
+        return None
+    return _parse(date_text, today or date.today())
+
+
+def parse_dates(texts: Iterable[str], today: Optional[date] = None) -> List[Optional[date]]:
+    """Parse many date texts at once; identical strings are parsed only once"""
+    today = today or date.today()
+    parsed: Dict[str, Optional[date]] = {}
+    results = []
+    for text in texts:
+        if not text:
+            results.append(None)
+            continue
+        if text not in parsed:
+            parsed[text] = _parse(text, today)
+        results.append(parsed[text])
+    return results
@@ -0,0 +1,123 @@
+"""
+Local fake Indeed server for offline benchmarks and manual testing.
+
+Serves /jobs?start=N result pages with the same card markup the scrapers
+parse (div.job_seen_beacon, h2 a, company/location testids, date shelf).
+Point the scrapers at it with INDEED_BASE_URL=http://127.0.0.1:<port>.
+
+    python -m scraper.fake_indeed --port 8765 --latency 0.2 --throttle-every 7
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CITIES = ["Casablanca", "Rabat", "Paris", "Lyon", "Montréal", "Bruxelles", "Genève", "Marrakech"]
+DATES = ["il y a 2 jours", "Publié il y a 5 heures", "Aujourd'hui", "il y a 1 semaine", "Il y a plus de 30 jours"]
+
+CARD_TEMPLATE = """
+<div class="cardOutline">
+  <div class="job_seen_beacon">
+    <table><tbody><tr><td class="resultContent">
+      <h2 class="jobTitle"><a class="jcs-JobTitle" data-jk="{jk}" href="/rc/clk?jk={jk}&amp;from=serp">
+        <span title="Stagiaire {n}">Stagiaire développeur {n}</span></a></h2>
+      <div class="company_location">
+        <span data-testid="company-name">Entreprise {company}</span>
+        <div data-testid="text-location">{city}</div>
+      </div>
+    </td></tr></tbody></table>
+    <div class="jobCardShelfContainer"><span class="date">{date}</span></div>
+  </div>
+</div>
+"""
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>Offres d'emploi | Indeed</title>
+<script>{padding}</script></head>
+<body><nav class="filters"><ul>{filters}</ul></nav>
+<div id="mosaic-provider-jobcards"><ul class="jobsearch-ResultsList">
+{cards}
+</ul></div></body></html>
+"""
+
+
+def render_page(start: int, cards_per_page: int = 15) -> str:
+    cards = []
+    for i in range(cards_per_page):
+        n = start + i
+        cards.append(CARD_TEMPLATE.format(
+            jk=f"{n:016x}",
+            n=n,
+            company=n % 97,
+            city=CITIES[n % len(CITIES)],
+            date=DATES[n % len(DATES)],
+        ))
+    # Real result pages are several hundred KB of inline scripts and
+    # navigation markup around a handful of cards
+    filters = "".join(
+        f'<li class="filter-item"><a href="/jobs?fl={i}"><span>Filtre {i}</span></a></li>' for i in range(1500)
+    )
+    return PAGE_TEMPLATE.format(padding="var x = 0;" * 10000, filters=filters, cards="".join(cards))
+
+
+def make_handler(latency: float, throttle_every: int, cards_per_page: int):
+    state = {"requests": 0}
+    lock = threading.Lock()
+
+    class FakeIndeedHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            with lock:
+                state["requests"] += 1
+                count = state["requests"]
+            if latency:
+                time.sleep(latency)
+            if throttle_every and count % throttle_every == 0:
+                self._send(429, b"Too Many Requests", {"Retry-After": "1"})
+                return
+            if parsed.path != "/jobs":
+                self._send(404, b"Not Found")
+                return
+            start = int(parse_qs(parsed.query).get("start", ["0"])[0])
+            body = render_page(start, cards_per_page).encode("utf-8")
+            self._send(200, body, {"Content-Type": "text/html; charset=utf-8"})
+
+        def _send(self, status, body, headers=None):
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeIndeedHandler
+
+
+def start_fake_indeed(port: int = 0, latency: float = 0.0, throttle_every: int = 0, cards_per_page: int = 15):
+    """Start the server on a background thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency, throttle_every, cards_per_page))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="fake-indeed", daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve fake Indeed result pages")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--throttle-every", type=int, default=0, help="answer every Nth request with 429")
+    args = parser.parse_args()
+    server, base_url = start_fake_indeed(args.port, args.latency, args.throttle_every)
+    print(f"Fake Indeed serving at {base_url}/jobs (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
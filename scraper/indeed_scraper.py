@@ -1,30 +1,23 @@
 import time
-from typing import List, Dict, Optional
+from itertools import chain
+from typing import Dict, Iterator, List, Optional
 from urllib.parse import urljoin, urlencode
-from datetime import datetime, date
-import re
+from datetime import datetime
 import sys
 import os
 import random
 import traceback
 
-import requests
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-# Handle ChromeDriverManager import with proper error handling
-try:
-    from webdriver_manager.chrome import ChromeDriverManager
-    WEBDRIVER_MANAGER_AVAILABLE = True
-except ImportError:
-    WEBDRIVER_MANAGER_AVAILABLE = False
-    ChromeDriverManager = None
-    print("webdriver-manager not available, will try direct Chrome driver")
+from scraper.rate_limit import wait_for_slot
+from scraper.archive import archive_page
+from scraper.async_fetch import AIOHTTP_AVAILABLE, BLOCKED_STATUSES, AdaptiveBackoff, iter_pages_sync
+from scraper.card_parser import LXML_AVAILABLE, extract_card, parse_document, results_fragment, select_cards
+from scraper.dates import parse_date_posted  # noqa: F401 (re-exported)
+from scraper.locations import resolve_location
+from scraper import metrics
+
+# requests, bs4, selenium and webdriver-manager are imported inside the
+# strategies that use them: web workers that never scrape do not load them.
 
 
 # More sophisticated headers to avoid bot detection
@@ -52,23 +45,27 @@ DEFAULT_HEADERS = {
 }
 
 
+# Map country names to Indeed domains
+COUNTRY_DOMAINS = {
+    'Maroc': 'ma',
+    'France': 'fr',
+    'Canada': 'ca',
+    'Belgique': 'be',
+    'Suisse': 'ch'
+}
+
+
 def build_indeed_url(query: str = "stage OR stagiaire OR internship", start: int = 0, country: str = "Maroc") -> str:
     """
     Build Indeed URL for a specific country.
     country: Country name in French (e.g., 'Maroc', 'France', 'Canada')
     """
-    # Map country names to Indeed domains
-    country_domains = {
-        'Maroc': 'ma',
-        'France': 'fr',
-        'Canada': 'ca',
-        'Belgique': 'be',
-        'Suisse': 'ch'
-    }
-    
     # Default to Morocco if country not found
-    domain_suffix = country_domains.get(country, 'ma')
+    domain_suffix = COUNTRY_DOMAINS.get(country, 'ma')
     base = f"https://{domain_suffix}.indeed.com/jobs"
+    # Local override, e.g. to point the scrapers at scraper.fake_indeed
+    if os.environ.get('INDEED_BASE_URL'):
+        base = f"{os.environ['INDEED_BASE_URL'].rstrip('/')}/jobs"
     
     # Set location parameter based on country
     location_param = country
@@ -77,95 +74,9 @@ def build_indeed_url(query: str = "stage OR stagiaire OR internship", start: int
     return f"{base}?{urlencode(params)}"
 
 
-def parse_date_posted(date_text: str) -> Optional[date]:
-    """Parse date text to actual date object"""
-    if not date_text:
-        return None
-    
-    today = date.today()
-    
-    # Patterns communs pour les dates Indeed
-    patterns = [
-        r'il y a (\d+) jour',  # "il y a 2 jours"
-        r'il y a (\d+) heure',  # "il y a 3 heures"
-        r'il y a (\d+) semaine',  # "il y a 1 semaine"
-        r'il y a (\d+) mois',  # "il y a 2 mois"
-        r'(\d+)/(\d+)/(\d+)',  # "15/10/2024"
-        r'(\d{4})-(\d{2})-(\d{2})',  # "2024-10-15"
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, date_text.lower())
-        if match:
-            try:
-                if 'jour' in pattern:
-                    days_ago = int(match.group(1))
-                    from datetime import timedelta
-                    return today - timedelta(days=days_ago)
-                elif 'heure' in pattern:
-                    hours_ago = int(match.group(1))
-                    from datetime import timedelta
-                    return today - timedelta(hours=hours_ago)
-                elif 'semaine' in pattern:
-                    weeks_ago = int(match.group(1))
-                    from datetime import timedelta
-                    return today - timedelta(weeks=weeks_ago)
-                elif 'mois' in pattern:
-                    months_ago = int(match.group(1))
-                    from datetime import timedelta
-                    return today - timedelta(days=months_ago * 30)
-                elif len(match.groups()) == 3:
-                    if '/' in pattern:
-                        day, month, year = match.groups()
-                        return date(int(year), int(month), int(day))
-                    else:
-                        year, month, day = match.groups()
-                        return date(int(year), int(month), int(day))
-            except (ValueError, OverflowError):
-                # If date parsing fails, continue to next pattern
-                continue
-    
-    return None
-
-
 def extract_country_from_location(location: str) -> Optional[str]:
     """Extract country from location string"""
-    if not location:
-        return None
-    
-    # Mapping des villes aux pays
-    city_to_country = {
-        'paris': 'France', 'lyon': 'France', 'marseille': 'France', 'toulouse': 'France',
-        'nice': 'France', 'nantes': 'France', 'strasbourg': 'France', 'montpellier': 'France',
-        'bordeaux': 'France', 'lille': 'France', 'rennes': 'France', 'reims': 'France',
-        'casablanca': 'Maroc', 'rabat': 'Maroc', 'fès': 'Maroc', 'fes': 'Maroc',
-        'marrakech': 'Maroc', 'agadir': 'Maroc', 'tanger': 'Maroc', 'meknès': 'Maroc',
-        'oujda': 'Maroc', 'kenitra': 'Maroc', 'tétouan': 'Maroc', 'salé': 'Maroc',
-        'bruxelles': 'Belgique', 'anvers': 'Belgique', 'gand': 'Belgique', 'charleroi': 'Belgique',
-        'genève': 'Suisse', 'zurich': 'Suisse', 'bâle': 'Suisse', 'berne': 'Suisse',
-        'montréal': 'Canada', 'toronto': 'Canada', 'vancouver': 'Canada', 'ottawa': 'Canada',
-    }
-    
-    location_lower = location.lower()
-    
-    # Chercher des patterns de pays
-    if any(country in location_lower for country in ['france', 'français', 'french']):
-        return 'France'
-    elif any(country in location_lower for country in ['maroc', 'morocco', 'marocain']):
-        return 'Maroc'
-    elif any(country in location_lower for country in ['belgique', 'belgium', 'belge']):
-        return 'Belgique'
-    elif any(country in location_lower for country in ['suisse', 'switzerland', 'suisse']):
-        return 'Suisse'
-    elif any(country in location_lower for country in ['canada', 'canadian']):
-        return 'Canada'
-    
-    # Chercher par ville
-    for city, country in city_to_country.items():
-        if city in location_lower:
-            return country
-    
-    return None
+    return resolve_location(location).country
 
 
 def parse_job_card(card) -> Dict[str, str]:
@@ -263,6 +174,65 @@ def parse_job_card(card) -> Dict[str, str]:
     }
 
 
+# Card selectors tried in order, first by the requests-based strategies and
+# with extra fallbacks for pages rendered by Selenium
+RESULT_CARD_SELECTORS = ("div.job_seen_beacon", ".resultContent")
+SELENIUM_CARD_SELECTORS = RESULT_CARD_SELECTORS + (
+    ".jobsearch-SerpJobCard", "[data-jk]", "div[data-testid='job-card']"
+)
+
+
+def _card_strainer(selectors):
+    """SoupStrainer keeping only elements that may be job cards, with their subtrees"""
+    from bs4 import SoupStrainer
+
+    def is_card(name, attrs):
+        attrs = attrs or {}
+        classes = attrs.get("class") or ""
+        if isinstance(classes, str):
+            classes = classes.split()
+        return (
+            ("div.job_seen_beacon" in selectors and name == "div" and "job_seen_beacon" in classes)
+            or (".resultContent" in selectors and "resultContent" in classes)
+            or (".jobsearch-SerpJobCard" in selectors and "jobsearch-SerpJobCard" in classes)
+            or ("[data-jk]" in selectors and "data-jk" in attrs)
+            or ("div[data-testid='job-card']" in selectors and name == "div" and attrs.get("data-testid") == "job-card")
+        )
+    return SoupStrainer(is_card)
+
+
+def parse_result_page(html: str, selectors=RESULT_CARD_SELECTORS, use_lxml: Optional[bool] = None,
+                      stats: Optional[Dict] = None) -> List[Dict[str, str]]:
+    """
+    Extract every job card of a result page, one dict per card (unfiltered).
+
+    Only the job list is parsed: everything before the results container is
+    cut off with a string search, then lxml extracts the cards in one pass.
+    Without lxml, a SoupStrainer additionally limits BeautifulSoup to the
+    card subtrees. use_lxml forces a backend (default: lxml when installed).
+    Building the tree and finding the cards is timed as the "parse" phase,
+    reading each card as "extract" (see scraper.metrics).
+    """
+    if use_lxml is None:
+        use_lxml = LXML_AVAILABLE
+    if use_lxml:
+        with metrics.timed("parse", stats):
+            cards = select_cards(parse_document(html), selectors)
+        with metrics.timed("extract", stats):
+            return [extract_card(card) for card in cards]
+    from bs4 import BeautifulSoup
+
+    with metrics.timed("parse", stats):
+        soup = BeautifulSoup(results_fragment(html), "html.parser", parse_only=_card_strainer(selectors))
+        cards = []
+        for selector in selectors:
+            cards = soup.select(selector)
+            if cards:
+                break
+    with metrics.timed("extract", stats):
+        return [parse_job_card(card) for card in cards]
+
+
 def setup_driver():
     """Setup Chrome driver with anti-detection options"""
     # Don't try to set up Chrome driver in cloud environments
@@ -271,6 +241,14 @@ def setup_driver():
         return None
         
     try:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+        except ImportError:
+            ChromeDriverManager = None
+
         options = Options()
         options.add_argument("--headless")  # Run in background
         options.add_argument("--no-sandbox")
@@ -284,7 +262,7 @@ def setup_driver():
         driver = None
         
         # Try with ChromeDriverManager first if available
-        if WEBDRIVER_MANAGER_AVAILABLE and ChromeDriverManager is not None:
+        if ChromeDriverManager is not None:
             try:
                 service = Service(ChromeDriverManager().install())
                 driver = webdriver.Chrome(service=service, options=options)
@@ -317,92 +295,157 @@ def setup_driver():
         return None
 
 
-def scrape_indeed_selenium(max_pages: int = 50, delay_seconds: float = 1.5, country: str = "Maroc") -> List[Dict[str, str]]:
-    """
-    Scrape Indeed job listings using Selenium to bypass anti-bot protection.
-    Returns list of dicts with keys: title, company, location, date_posted, link
+def _iter_pages_with_driver(driver, max_pages: int, delay_seconds: float, country: str,
+                            pooled=None, known_links=None,
+                            stats: Optional[Dict] = None) -> Iterator[List[Dict[str, str]]]:
+    """Page through Indeed results with an already running driver, yielding each page's offers.
+
+    With known_links (scraper.known_links.KnownLinks), paging stops at the
+    first page made mostly of offers already stored; the pages not fetched are
+    added to stats["pages_saved"].
     """
-    offers: List[Dict[str, str]] = []
-    driver = None
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.wait import WebDriverWait
+
+    wait = WebDriverWait(driver, 10)
     
-    try:
-        driver = setup_driver()
-        if driver is None:
-            print("Failed to setup Chrome driver, falling back to requests method")
-            return []
-            
-        wait = WebDriverWait(driver, 10)
+    for page in range(max_pages):
+        start = page * 10
+        url = build_indeed_url(start=start, country=country)
+        print(f"Scraping page {page + 1}/{max_pages}: {url}")
         
-        for page in range(max_pages):
-            start = page * 10
-            url = build_indeed_url(start=start, country=country)
-            print(f"Scraping page {page + 1}/{max_pages}: {url}")
+        try:
+            wait_for_slot(url)
+            with metrics.timed("fetch", stats):
+                driver.get(url)
+            if pooled is not None:
+                pooled.pages += 1
+            metrics.sleep(delay_seconds, stats)
             
+            # Wait for job cards to load
             try:
-                driver.get(url)
-                time.sleep(delay_seconds)
-                
-                # Wait for job cards to load
-                try:
+                with metrics.timed("fetch", stats):
                     wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "[data-jk], .job_seen_beacon, .resultContent")))
-                except:
-                    print(f"No job cards found on page {page + 1}")
-                    # Try to continue to next page instead of breaking
-                    continue
-                
-                # Get page source and parse with BeautifulSoup
-                soup = BeautifulSoup(driver.page_source, "html.parser")
+            except:
+                print(f"No job cards found on page {page + 1}")
+                metrics.FETCHES.inc(source="selenium", status="empty")
+                # Try to continue to next page instead of breaking
+                continue
+            
+            # Parse the page source, trying multiple selectors for job cards
+            html = driver.page_source
+            metrics.FETCHES.inc(source="selenium", status="loaded")
+            archive_page(html, url, country, source="selenium")
+            cards = parse_result_page(html, SELENIUM_CARD_SELECTORS, stats=stats)
                 
-                # Try multiple selectors for job cards
-                cards = soup.select("div.job_seen_beacon")
-                if not cards:
-                    cards = soup.select(".resultContent")
-                if not cards:
-                    cards = soup.select(".jobsearch-SerpJobCard")
-                if not cards:
-                    cards = soup.select("[data-jk]")
-                if not cards:
-                    cards = soup.select("div[data-testid='job-card']")
-                    
-                print(f"Found {len(cards)} job cards on page {page + 1}")
-
-                page_offers = 0
-                for card in cards:
-                    data = parse_job_card(card)
-                    if data.get("link") and data.get("title"):
-                        offers.append(data)
-                        page_offers += 1
-                        print(f"Added: {data['title'][:50]}...")
+            print(f"Found {len(cards)} job cards on page {page + 1}")
 
-                print(f"Page {page + 1}: {page_offers} offers added")
-                
-                # If no offers found on this page, try a few more pages before stopping
-                if page_offers == 0 and page > 5:
-                    print(f"No offers found on page {page + 1}, trying 3 more pages...")
-                    empty_pages = 0
-                    for extra_page in range(page + 1, min(page + 4, max_pages)):
-                        start = extra_page * 10
-                        url = build_indeed_url(start=start, country=country)
-                        try:
+            page_batch = []
+            for data in cards:
+                if data.get("link") and data.get("title"):
+                    page_batch.append(data)
+                    print(f"Added: {data['title'][:50]}...")
+            page_offers = len(page_batch)
+
+            print(f"Page {page + 1}: {page_offers} offers added")
+
+            # Results are newest first: a page of known offers means the rest are known too
+            page_links = [data["link"] for data in page_batch]
+            stop = known_links is not None and page + 1 < max_pages and known_links.should_stop(page_links)
+            if page_batch:
+                yield page_batch
+            if stop:
+                saved = max_pages - (page + 1)
+                print(f"Page {page + 1} is mostly offers already stored, skipping the remaining {saved} pages")
+                if stats is not None:
+                    stats["pages_saved"] = stats.get("pages_saved", 0) + saved
+                break
+            
+            # If no offers found on this page, try a few more pages before stopping
+            if page_offers == 0 and page > 5:
+                print(f"No offers found on page {page + 1}, trying 3 more pages...")
+                empty_pages = 0
+                for extra_page in range(page + 1, min(page + 4, max_pages)):
+                    start = extra_page * 10
+                    url = build_indeed_url(start=start, country=country)
+                    try:
+                        wait_for_slot(url)
+                        with metrics.timed("fetch", stats):
                             driver.get(url)
-                            time.sleep(delay_seconds)
-                            soup = BeautifulSoup(driver.page_source, "html.parser")
-                            cards = soup.select("div.job_seen_beacon") or soup.select(".resultContent")
-                            if not cards:
-                                empty_pages += 1
-                                if empty_pages >= 2:
-                                    print("Too many empty pages, stopping...")
-                                    break
-                        except Exception as e:
-                            print(f"Error on extra page {extra_page}: {e}")
-                            continue
-                    break
+                        if pooled is not None:
+                            pooled.pages += 1
+                        metrics.sleep(delay_seconds, stats)
+                        html = driver.page_source
+                        archive_page(html, url, country, source="selenium")
+                        cards = parse_result_page(html, stats=stats)
+                        if not cards:
+                            empty_pages += 1
+                            if empty_pages >= 2:
+                                print("Too many empty pages, stopping...")
+                                break
+                    except Exception as e:
+                        print(f"Error on extra page {extra_page}: {e}")
+                        continue
+                break
 
-                time.sleep(delay_seconds)
-            except Exception as e:
-                print(f"Error scraping page {page + 1}: {e}")
-                traceback.print_exc()
-                continue
+            metrics.sleep(delay_seconds, stats)
+        except Exception as e:
+            print(f"Error scraping page {page + 1}: {e}")
+            traceback.print_exc()
+            continue
+
+
+def iter_scrape_indeed_selenium(max_pages: int = 50, delay_seconds: float = 1.5, country: str = "Maroc",
+                                browser_pool=None, stats: Optional[Dict] = None,
+                                known_links=None) -> Iterator[List[Dict[str, str]]]:
+    """
+    Scrape Indeed job listings using Selenium to bypass anti-bot protection.
+    Yields the offers of each page (dicts with keys: title, company, location,
+    date_posted, link) as soon as it is parsed.
+
+    With a browser_pool (see scraper.browser_pool) a warm driver is borrowed
+    and returned instead of launching and quitting Chrome on every call.
+    Browser startup time is added to stats["startup_seconds"]. known_links
+    enables the early stop described in _iter_pages_with_driver().
+    """
+    total = 0
+
+    if browser_pool is not None:
+        try:
+            with browser_pool.acquire() as pooled:
+                if pooled is None:
+                    print("No Chrome driver available from the pool")
+                    return
+                if stats is not None:
+                    stats["startup_seconds"] = stats.get("startup_seconds", 0.0) + pooled.startup_seconds
+                metrics.add_phase(stats, "startup", pooled.startup_seconds)
+                for page_offers in _iter_pages_with_driver(pooled.driver, max_pages, delay_seconds, country,
+                                                           pooled, known_links=known_links, stats=stats):
+                    total += len(page_offers)
+                    yield page_offers
+        except Exception as e:
+            print(f"Error during scraping: {e}")
+            traceback.print_exc()
+        print(f"Total offers scraped: {total}")
+        return
+
+    driver = None
+    
+    try:
+        startup_start = time.time()
+        driver = setup_driver()
+        if stats is not None:
+            stats["startup_seconds"] = stats.get("startup_seconds", 0.0) + (time.time() - startup_start)
+        metrics.add_phase(stats, "startup", time.time() - startup_start)
+        if driver is None:
+            print("Failed to setup Chrome driver, falling back to requests method")
+            return
+            
+        for page_offers in _iter_pages_with_driver(driver, max_pages, delay_seconds, country,
+                                                   known_links=known_links, stats=stats):
+            total += len(page_offers)
+            yield page_offers
                 
     except Exception as e:
         print(f"Error during scraping: {e}")
@@ -414,39 +457,74 @@ def scrape_indeed_selenium(max_pages: int = 50, delay_seconds: float = 1.5, coun
             except Exception as e:
                 print(f"Error closing driver: {e}")
 
-    print(f"Total offers scraped: {len(offers)}")
-    return offers
+    print(f"Total offers scraped: {total}")
+
 
+def scrape_indeed_selenium(max_pages: int = 50, delay_seconds: float = 1.5, country: str = "Maroc",
+                           browser_pool=None, stats: Optional[Dict] = None,
+                           known_links=None) -> List[Dict[str, str]]:
+    """All offers of iter_scrape_indeed_selenium() in one list"""
+    return list(chain.from_iterable(iter_scrape_indeed_selenium(
+        max_pages, delay_seconds, country, browser_pool=browser_pool, stats=stats, known_links=known_links)))
 
-def scrape_indeed(max_pages: int = 1, delay_seconds: float = 5.0, country: str = "Maroc") -> List[Dict[str, str]]:
+
+def iter_scrape_indeed(max_pages: int = 1, delay_seconds: float = 5.0, country: str = "Maroc",
+                       browser_pool=None, stats: Optional[Dict] = None,
+                       known_links=None) -> Iterator[List[Dict[str, str]]]:
     """
-    Main scraping function - enhanced for cloud environments with multiple bypass strategies
+    Main scraping function - enhanced for cloud environments with multiple bypass strategies.
+    Yields the offers of each page as soon as it is parsed.
+
+    Strategies are tried in turn until one yields offers; from then on its
+    pages are passed through and the remaining strategies are skipped.
+
+    browser_pool: optional scraper.browser_pool.BrowserPool reused by the Selenium strategy
+    stats: optional dict the strategies fill with run statistics (startup_seconds, pages_saved, blocked)
+    known_links: optional scraper.known_links.KnownLinks letting Selenium stop paging at known offers
     """
     print(f"Trying requests scraping for {country}...")
     
     # Try multiple strategies
     strategies = [
-        ("scraperapi", lambda: scrape_with_scraperapi(max_pages, delay_seconds, country)),
-        ("direct_requests", lambda: scrape_with_direct_requests(max_pages, delay_seconds, country)),
+        ("scraperapi", lambda: iter_scrape_with_scraperapi(max_pages, delay_seconds, country, stats=stats)),
     ]
+    if AIOHTTP_AVAILABLE:
+        strategies.append(("async_requests", lambda: iter_scrape_with_async_requests(max_pages, delay_seconds, country,
+                                                                                     stats=stats)))
+    strategies.append(("direct_requests", lambda: iter_scrape_with_direct_requests(max_pages, delay_seconds, country,
+                                                                                   stats=stats)))
     
     # Only try Selenium if not in cloud environment
     if not os.environ.get('RENDER'):
-        strategies.append(("selenium", lambda: scrape_indeed_selenium(max_pages, delay_seconds, country)))
+        strategies.append(("selenium", lambda: iter_scrape_indeed_selenium(max_pages, delay_seconds, country,
+                                                                           browser_pool=browser_pool, stats=stats,
+                                                                           known_links=known_links)))
     
     for strategy_name, strategy_func in strategies:
+        found = 0
+        outcome = "empty"
+        attempt_start = time.perf_counter()
         try:
             print(f"Trying strategy: {strategy_name}")
-            offers = strategy_func()
-            if offers is not None and len(offers) > 0:
-                print(f"Success with {strategy_name}: {len(offers)} offers found")
-                return offers
-            else:
-                print(f"Strategy {strategy_name} returned no offers")
+            for page_offers in strategy_func():
+                found += len(page_offers)
+                yield page_offers
         except Exception as e:
             print(f"Strategy {strategy_name} failed: {e}")
             traceback.print_exc()
-            continue
+            outcome = "error"
+        finally:
+            # Time spent waiting on the ingest writer between pages is included
+            if found:
+                outcome = "offers"
+            metrics.STRATEGY_ATTEMPTS.inc(strategy=strategy_name, outcome=outcome)
+            metrics.STRATEGY_SECONDS.observe(time.perf_counter() - attempt_start, strategy=strategy_name)
+            if stats is not None:
+                stats.setdefault("strategies", {})[strategy_name] = outcome
+        if found:
+            print(f"Success with {strategy_name}: {found} offers found")
+            return
+        print(f"Strategy {strategy_name} returned no offers")
     
     # If all strategies failed, provide guidance
     print("\n" + "="*50)
@@ -457,8 +535,13 @@ def scrape_indeed(max_pages: int = 1, delay_seconds: float = 5.0, country: str =
     print("3. Reduce scraping frequency")
     print("4. Check if Indeed has changed their HTML structure")
     print("="*50)
-    
-    return []
+
+
+def scrape_indeed(max_pages: int = 1, delay_seconds: float = 5.0, country: str = "Maroc",
+                  browser_pool=None, stats: Optional[Dict] = None, known_links=None) -> List[Dict[str, str]]:
+    """All offers of iter_scrape_indeed() in one list"""
+    return list(chain.from_iterable(iter_scrape_indeed(
+        max_pages, delay_seconds, country, browser_pool=browser_pool, stats=stats, known_links=known_links)))
 
 
 # Free proxy list - in a real application, you'd use a paid proxy service
@@ -504,15 +587,23 @@ def scrape_indeed_requests(max_pages: int = 1, delay_seconds: float = 5.0, count
     
     return []
 
-def scrape_with_scraperapi(max_pages: int, delay_seconds: float, country: str) -> List[Dict[str, str]]:
-    """Scrape using ScraperAPI service to bypass anti-bot protection"""
+def _count_blocked(stats: Optional[Dict], count: int = 1):
+    """Add 403/429 responses to stats["blocked"], which drives the adaptive scrape interval"""
+    if stats is not None and count:
+        stats["blocked"] = stats.get("blocked", 0) + count
+
+
+def iter_scrape_with_scraperapi(max_pages: int, delay_seconds: float, country: str,
+                                stats: Optional[Dict] = None) -> Iterator[List[Dict[str, str]]]:
+    """Scrape using ScraperAPI service to bypass anti-bot protection, one batch per page"""
+    import requests
+
     scraperapi_key = os.environ.get('SCRAPER_API_KEY')
     if not scraperapi_key:
         print("No SCRAPER_API_KEY found, skipping ScraperAPI strategy")
-        return []
+        return
     
     print(f"Using ScraperAPI with key: {scraperapi_key[:5]}...")
-    offers: List[Dict[str, str]] = []
     
     for page in range(max_pages):
         start = page * 10
@@ -521,7 +612,7 @@ def scrape_with_scraperapi(max_pages: int, delay_seconds: float, country: str) -
         
         # Add delay
         delay = delay_seconds + random.uniform(2.0, 5.0)
-        time.sleep(delay)
+        metrics.sleep(delay, stats)
         
         try:
             # ScraperAPI endpoint
@@ -532,40 +623,49 @@ def scrape_with_scraperapi(max_pages: int, delay_seconds: float, country: str) -
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             }
             
-            resp = requests.get(scraperapi_url, headers=headers, timeout=60)
+            wait_for_slot(url)
+            with metrics.timed("fetch", stats):
+                resp = requests.get(scraperapi_url, headers=headers, timeout=60)
+            metrics.FETCHES.inc(source="scraperapi", status=resp.status_code)
             print(f"ScraperAPI response status: {resp.status_code}")
             
             if resp.status_code == 200:
-                soup = BeautifulSoup(resp.text, "html.parser")
-                job_cards = soup.select("div.job_seen_beacon") or soup.select(".resultContent")
+                archive_page(resp.text, url, country, source="scraperapi")
+                job_cards = parse_result_page(resp.text, stats=stats)
                 
                 if job_cards:
-                    page_offers = 0
-                    for card in job_cards:
-                        data = parse_job_card(card)
+                    page_batch = []
+                    for data in job_cards:
                         if data.get("link") and data.get("title"):
-                            offers.append(data)
-                            page_offers += 1
-                            if page_offers <= 2:  # Only print first 2 offers
+                            page_batch.append(data)
+                            if len(page_batch) <= 2:  # Only print first 2 offers
                                 print(f"Added: {data['title'][:50]}...")
                     
-                    print(f"Page {page + 1}: {page_offers} offers added via ScraperAPI")
-                    return offers  # Return what we have
+                    print(f"Page {page + 1}: {len(page_batch)} offers added via ScraperAPI")
+                    yield page_batch
+                    return  # Stop at the first page that worked
                 else:
                     print("No job cards found in ScraperAPI response")
             else:
                 print(f"ScraperAPI failed with status {resp.status_code}")
+                if resp.status_code in BLOCKED_STATUSES:
+                    _count_blocked(stats)
                 
         except Exception as e:
             print(f"ScraperAPI error: {e}")
             traceback.print_exc()
             continue
-    
-    return offers
 
-def scrape_with_direct_requests(max_pages: int, delay_seconds: float, country: str) -> List[Dict[str, str]]:
-    """Scrape directly with enhanced headers and delays"""
-    offers: List[Dict[str, str]] = []
+
+def scrape_with_scraperapi(max_pages: int, delay_seconds: float, country: str) -> List[Dict[str, str]]:
+    """All offers of iter_scrape_with_scraperapi() in one list"""
+    return list(chain.from_iterable(iter_scrape_with_scraperapi(max_pages, delay_seconds, country)))
+
+def iter_scrape_with_direct_requests(max_pages: int, delay_seconds: float, country: str,
+                                     stats: Optional[Dict] = None) -> Iterator[List[Dict[str, str]]]:
+    """Scrape directly with enhanced headers and delays, one batch per page"""
+    import requests
+
     session = requests.Session()
     
     # Enhanced headers to avoid bot detection
@@ -593,16 +693,20 @@ def scrape_with_direct_requests(max_pages: int, delay_seconds: float, country: s
         # Increase delay for direct requests
         delay = delay_seconds + random.uniform(5.0, 10.0) + (page * 3.0)
         print(f"Waiting {delay:.2f} seconds before request...")
-        time.sleep(delay)
+        metrics.sleep(delay, stats)
         
         try:
-            resp = session.get(url, timeout=30, allow_redirects=True)
+            wait_for_slot(url)
+            with metrics.timed("fetch", stats):
+                resp = session.get(url, timeout=30, allow_redirects=True)
+            metrics.FETCHES.inc(source="requests", status=resp.status_code)
             print(f"Direct request HTTP {resp.status_code} for {url}")
             
             # Check if we're being blocked
-            if resp.status_code in [403, 429]:
+            if resp.status_code in BLOCKED_STATUSES:
                 print(f"Blocked with status {resp.status_code}")
-                return []  # Don't continue if blocked
+                _count_blocked(stats)
+                return  # Don't continue if blocked
                 
             if resp.status_code != 200:
                 print(f"Failed with status {resp.status_code}")
@@ -613,11 +717,9 @@ def scrape_with_direct_requests(max_pages: int, delay_seconds: float, country: s
                 print(f"Suspiciously short response ({len(resp.text)} chars)")
                 continue
             
-            # Parse the response
-            soup = BeautifulSoup(resp.text, "html.parser")
-            
-            # Check if we got a valid Indeed page
-            job_cards = soup.select("div.job_seen_beacon") or soup.select(".resultContent")
+            # Parse the response and check if we got a valid Indeed page
+            archive_page(resp.text, url, country, source="requests")
+            job_cards = parse_result_page(resp.text, stats=stats)
             if not job_cards:
                 print("No job cards found in direct response")
                 continue
@@ -625,21 +727,20 @@ def scrape_with_direct_requests(max_pages: int, delay_seconds: float, country: s
             print(f"Successfully parsed page {page + 1} with {len(job_cards)} job cards")
             
             # Process the job cards
-            page_offers = 0
-            for card in job_cards:
-                data = parse_job_card(card)
+            page_batch = []
+            for data in job_cards:
                 if data.get("link") and data.get("title"):
-                    offers.append(data)
-                    page_offers += 1
-                    if page_offers <= 2:  # Only print first 2 offers
+                    page_batch.append(data)
+                    if len(page_batch) <= 2:  # Only print first 2 offers
                         print(f"Added: {data['title'][:50]}...")
 
-            print(f"Page {page + 1}: {page_offers} offers added")
+            print(f"Page {page + 1}: {len(page_batch)} offers added")
             
             # If we got offers, we're successful
-            if page_offers > 0:
-                print(f"Successfully scraped {len(offers)} offers so far")
-                return offers  # Return early on success
+            if page_batch:
+                print(f"Successfully scraped {len(page_batch)} offers")
+                yield page_batch
+                return  # Return early on success
                 
         except requests.exceptions.RequestException as e:
             print(f"Direct request error: {e}")
@@ -649,8 +750,57 @@ def scrape_with_direct_requests(max_pages: int, delay_seconds: float, country: s
             print(f"Unexpected error: {e}")
             traceback.print_exc()
             continue
-    
-    return offers
+
+
+def scrape_with_direct_requests(max_pages: int, delay_seconds: float, country: str) -> List[Dict[str, str]]:
+    """All offers of iter_scrape_with_direct_requests() in one list"""
+    return list(chain.from_iterable(iter_scrape_with_direct_requests(max_pages, delay_seconds, country)))
+
+def iter_scrape_with_async_requests(max_pages: int, delay_seconds: float, country: str,
+                                    concurrency: Optional[int] = None,
+                                    stats: Optional[Dict] = None) -> Iterator[List[Dict[str, str]]]:
+    """Fetch all result pages concurrently with adaptive 429/403 backoff, yielding each page as it lands"""
+    if concurrency is None:
+        concurrency = int(os.environ.get('ASYNC_FETCH_CONCURRENCY', '3'))
+    urls = [build_indeed_url(start=page * 10, country=country) for page in range(max_pages)]
+    page_numbers = {url: page + 1 for page, url in enumerate(urls)}
+    headers = dict(DEFAULT_HEADERS)
+    headers["User-Agent"] = random.choice(USER_AGENTS)
+    # aiohttp only decodes brotli when the optional brotli package is installed
+    headers["Accept-Encoding"] = "gzip, deflate"
+    headers.pop("TE", None)
+
+    print(f"Fetching {len(urls)} pages for {country} with concurrency {concurrency}")
+    backoff = AdaptiveBackoff(initial_block_delay=delay_seconds)
+
+    # Pages arrive in completion order, not page order. Fetches overlap, so the
+    # "fetch" phase is the time spent waiting for each page, not the sum of requests.
+    for url, status, text in metrics.timed_iter(
+            iter_pages_sync(urls, concurrency=concurrency, headers=headers, backoff=backoff), "fetch", stats):
+        metrics.FETCHES.inc(source="async", status=status or "error")
+        page = page_numbers[url]
+        if text is None:
+            print(f"Page {page}: no content (HTTP {status})")
+            continue
+        if status != 200 or len(text) < 1000:
+            print(f"Page {page}: unusable response (HTTP {status}, {len(text)} chars)")
+            continue
+        archive_page(text, url, country, source="async")
+        page_batch = [data for data in parse_result_page(text, stats=stats) if data.get("link") and data.get("title")]
+        print(f"Page {page}: {len(page_batch)} offers added")
+        if page_batch:
+            yield page_batch
+
+    if backoff.blocked:
+        print(f"Async fetch was throttled {backoff.blocked} times for {country}")
+        _count_blocked(stats, backoff.blocked)
+
+
+def scrape_with_async_requests(max_pages: int, delay_seconds: float, country: str,
+                               concurrency: Optional[int] = None) -> List[Dict[str, str]]:
+    """All offers of iter_scrape_with_async_requests() in one list"""
+    return list(chain.from_iterable(iter_scrape_with_async_requests(max_pages, delay_seconds, country,
+                                                                    concurrency=concurrency)))
 
 if __name__ == "__main__":
     # Simple test function
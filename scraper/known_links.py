@@ -0,0 +1,48 @@
+"""
+In-memory set of the offer links already stored, so that a crawl can tell
+when it has paged back into offers seen on earlier runs and stop there.
+
+Links are held as 64-bit BLAKE2b digests rather than strings, which keeps a
+few hundred thousand links in tens of MB. Unlike a Bloom filter a hash set
+has no tuned false-positive rate: a new link is taken for a known one only
+on a 64-bit collision.
+"""
+import os
+import threading
+from hashlib import blake2b
+from typing import Iterable, Sequence
+
+# Stop paging once this fraction of a page's offers is already stored (above 1 disables)
+KNOWN_LINKS_STOP_FRACTION = float(os.environ.get("KNOWN_LINKS_STOP_FRACTION", "0.8"))
+
+
+def _key(link: str) -> int:
+    return int.from_bytes(blake2b(link.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class KnownLinks:
+    def __init__(self):
+        self._keys = set()
+        self._lock = threading.Lock()
+        # False until warmed from the database; an unwarmed set never stops a crawl
+        self.ready = False
+
+    def add_many(self, links: Iterable[str]):
+        keys = [_key(link) for link in links if link]
+        with self._lock:
+            self._keys.update(keys)
+
+    def __contains__(self, link: str) -> bool:
+        return _key(link) in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def known_fraction(self, links: Sequence[str]) -> float:
+        """Share of `links` already stored (0.0 for an empty page)"""
+        if not links:
+            return 0.0
+        return sum(1 for link in links if link in self) / len(links)
+
+    def should_stop(self, links: Sequence[str], fraction: float = KNOWN_LINKS_STOP_FRACTION) -> bool:
+        return self.ready and bool(links) and self.known_fraction(links) >= fraction
@@ -0,0 +1,221 @@
+"""
+Location to country/city resolution.
+
+All country keywords and city names are compiled once into an Aho-Corasick
+automaton, so a location string is resolved in a single scan whatever the
+size of the gazetteer. Results are cached per raw location string because
+Indeed repeats the same handful of locations on every page.
+
+The built-in city list keeps the substring matching extract_country_from_location
+always had for picking the country, but a city is only reported when its name
+stands on word boundaries ("Cormeilles-en-Parisis" is in France, not in Paris).
+Cities from the gazetteer file (scraper/data/gazetteer.csv, or the CSV named by
+LOCATION_GAZETTEER) must match on word boundaries, so short names do not fire
+inside longer words. Spellings that differ only by accents ("Fes", "Fès") share
+one canonical city name, the accented one.
+"""
+import csv
+import os
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+# Country keywords, checked before any city, in priority order
+COUNTRY_KEYWORDS = [
+    ('France', ['france', 'français', 'french']),
+    ('Maroc', ['maroc', 'morocco', 'marocain']),
+    ('Belgique', ['belgique', 'belgium', 'belge']),
+    ('Suisse', ['suisse', 'switzerland']),
+    ('Canada', ['canada', 'canadian']),
+]
+
+# Mapping des villes aux pays
+BUILTIN_CITIES = {
+    'paris': 'France', 'lyon': 'France', 'marseille': 'France', 'toulouse': 'France',
+    'nice': 'France', 'nantes': 'France', 'strasbourg': 'France', 'montpellier': 'France',
+    'bordeaux': 'France', 'lille': 'France', 'rennes': 'France', 'reims': 'France',
+    'casablanca': 'Maroc', 'rabat': 'Maroc', 'fès': 'Maroc', 'fes': 'Maroc',
+    'marrakech': 'Maroc', 'agadir': 'Maroc', 'tanger': 'Maroc', 'meknès': 'Maroc',
+    'oujda': 'Maroc', 'kenitra': 'Maroc', 'tétouan': 'Maroc', 'salé': 'Maroc',
+    'bruxelles': 'Belgique', 'anvers': 'Belgique', 'gand': 'Belgique', 'charleroi': 'Belgique',
+    'genève': 'Suisse', 'zurich': 'Suisse', 'bâle': 'Suisse', 'berne': 'Suisse',
+    'montréal': 'Canada', 'toronto': 'Canada', 'vancouver': 'Canada', 'ottawa': 'Canada',
+}
+
+# ISO 3166 codes stored in offers.country_code
+COUNTRY_CODES = {
+    'Maroc': 'MA',
+    'France': 'FR',
+    'Canada': 'CA',
+    'Belgique': 'BE',
+    'Suisse': 'CH',
+}
+
+DEFAULT_GAZETTEER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.csv")
+
+# Cached locations per index
+LOCATION_CACHE_SIZE = 8192
+
+
+class Resolution(NamedTuple):
+    country: Optional[str]
+    city: Optional[str]
+
+
+class _Entry(NamedTuple):
+    rank: int            # lower wins
+    country: str
+    city: Optional[str]  # canonical city name, None for country keywords
+    whole_word: bool
+
+
+def strip_accents(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher; yields (end index, pattern, payload) for every occurrence"""
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[str, object]]] = [[]]
+
+    def add(self, pattern: str, payload):
+        state = 0
+        for char in pattern:
+            nxt = self.goto[state].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = nxt
+        self.output[state].append((pattern, payload))
+
+    def build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                if state:
+                    fallback = self.fail[state]
+                    while fallback and char not in self.goto[fallback]:
+                        fallback = self.fail[fallback]
+                    self.fail[nxt] = self.goto[fallback].get(char, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, str, object]]:
+        state = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern, payload in output[state]:
+                yield index, pattern, payload
+
+
+def load_gazetteer(path: str) -> List[Tuple[str, str]]:
+    """Read (city, country) rows from a CSV file with a city,country header"""
+    with open(path, encoding="utf-8", newline="") as f:
+        return [
+            (row["city"].strip(), row["country"].strip())
+            for row in csv.DictReader(f)
+            if row.get("city") and row.get("country")
+        ]
+
+
+def _is_word_boundary(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not before.isalnum() and not after.isalnum()
+
+
+def _city_key(name: str) -> str:
+    return strip_accents(name.strip().lower())
+
+
+class LocationIndex:
+    def __init__(self, gazetteer: Optional[List[Tuple[str, str]]] = None):
+        gazetteer = gazetteer or []
+        # One spelling per city, whatever the accents: the accented one wins
+        self.canonical: Dict[str, str] = {}
+        for name in [city.title() for city in BUILTIN_CITIES] + [city for city, _ in gazetteer]:
+            current = self.canonical.get(_city_key(name))
+            if current is None or (strip_accents(current) == current and strip_accents(name) != name):
+                self.canonical[_city_key(name)] = name
+
+        self.automaton = AhoCorasick()
+        rank = 0
+        for country, keywords in COUNTRY_KEYWORDS:
+            for keyword in keywords:
+                self.automaton.add(keyword, _Entry(rank, country, None, False))
+            rank += 1
+        for city, country in BUILTIN_CITIES.items():
+            self.automaton.add(city, _Entry(rank, country, self.canonical[_city_key(city)], False))
+            rank += 1
+        for city, country in gazetteer:
+            entry = _Entry(rank, country, self.canonical[_city_key(city)], True)
+            for variant in {city.lower(), strip_accents(city.lower())}:
+                self.automaton.add(variant, entry)
+            rank += 1
+        self.automaton.build()
+        self.resolve = lru_cache(maxsize=LOCATION_CACHE_SIZE)(self._resolve)
+
+    def _resolve(self, location: str) -> Resolution:
+        text = location.lower()
+        best = None
+        best_city = None
+        for end, pattern, entry in self.automaton.iter(text):
+            bounded = _is_word_boundary(text, end + 1 - len(pattern), end + 1)
+            if entry.whole_word and not bounded:
+                continue
+            if best is None or entry.rank < best.rank:
+                best = entry
+            if entry.city and bounded and (best_city is None or entry.rank < best_city.rank):
+                best_city = entry
+        if best is None:
+            return Resolution(None, None)
+        city = best_city.city if best_city is not None and best_city.country == best.country else None
+        return Resolution(best.country, city)
+
+
+def build_location_index(gazetteer_path: Optional[str] = None) -> LocationIndex:
+    path = gazetteer_path or os.environ.get("LOCATION_GAZETTEER") or DEFAULT_GAZETTEER
+    try:
+        gazetteer = load_gazetteer(path)
+    except OSError as e:
+        print(f"Could not load location gazetteer {path}: {e}")
+        gazetteer = []
+    return LocationIndex(gazetteer)
+
+
+_index = build_location_index()
+
+
+def set_gazetteer(path: str):
+    """Rebuild the shared index from another gazetteer file"""
+    global _index
+    _index = build_location_index(path)
+
+
+def resolve_location(location: str) -> Resolution:
+    """Country and canonical city for a raw Indeed location string"""
+    if not location:
+        return Resolution(None, None)
+    return _index.resolve(location)
+
+
+def canonical_city(name: Optional[str]) -> Optional[str]:
+    """The stored spelling of a known city name ("fes" -> "Fès"), None for unknown names"""
+    return _index.canonical.get(_city_key(name)) if name else None
+
+
+def country_code(country: Optional[str]) -> Optional[str]:
+    """ISO code for a country name as used across the app ("Maroc" -> "MA")"""
+    return COUNTRY_CODES.get(country) if country else None
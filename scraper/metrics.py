@@ -0,0 +1,210 @@
+"""
+In-process counters and histograms for the scrape pipeline, exposed in the
+Prometheus text format by a small HTTP server on METRICS_PORT, started by
+whichever process wins the scheduler election and so runs the scrapes, and
+by the logged-in (or METRICS_TOKEN) /metrics route of the web app.
+
+Hot paths wrap each phase in timed():
+
+    with metrics.timed("fetch", stats):
+        resp = session.get(url)
+
+which observes scrape_phase_seconds{phase="fetch"} and, given a run's stats
+dict, adds the milliseconds to stats["phase_timings"]. run_scrape_job()
+stores that breakdown in scraping_stats.phase_timings.
+
+Phases: startup (browser), sleep (politeness delays), fetch (HTTP or page
+load), parse (HTML to tree), extract (cards to offer dicts), normalize
+(dates and locations) and insert (database writes).
+
+Values live in the process that records them; each process serves its own.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Port of the metrics server started by the scheduler leader (unset: no server)
+METRICS_PORT = os.environ.get("METRICS_PORT")
+# Bearer token letting Prometheus read the web app's /metrics without a session
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+PHASE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+RUN_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+_registry: List["_Metric"] = []
+_DONE = object()
+# Guards every metric and the stats dicts timed() writes to from several threads
+_lock = threading.Lock()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with _lock:
+            samples = list(self._samples())
+        lines.extend(f"{name}{_format_labels(pairs)} {_format_value(value)}" for name, pairs, value in samples)
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}_total", list(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = PHASE_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with _lock:
+            counts, total = self._values.get(key) or ([0] * len(self.buckets), 0.0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def _samples(self):
+        for key, (counts, total) in sorted(self._values.items()):
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", pairs + [("le", _format_value(bound))], cumulative
+            yield f"{self.name}_sum", pairs, total
+            yield f"{self.name}_count", pairs, cumulative
+
+
+PHASE_SECONDS = Histogram("scrape_phase_seconds", "Time spent in each phase of the scrape pipeline", ["phase"])
+STRATEGY_ATTEMPTS = Counter("scrape_strategy_attempts", "Scraping strategy attempts by outcome (offers, empty, error)",
+                            ["strategy", "outcome"])
+STRATEGY_SECONDS = Histogram("scrape_strategy_seconds", "Duration of scraping strategy attempts", ["strategy"],
+                             buckets=RUN_BUCKETS)
+FETCHES = Counter("scrape_fetches", "Result pages requested, by source and HTTP status", ["source", "status"])
+RUNS = Counter("scrape_runs", "Completed scrape runs", ["country"])
+RUN_SECONDS = Histogram("scrape_run_seconds", "Duration of scrape runs", ["country"], buckets=RUN_BUCKETS)
+OFFERS = Counter("scrape_offers", "Offers seen by scrape runs (found, inserted, duplicate)", ["country", "result"])
+
+
+def add_phase(stats: Optional[Dict], phase: str, seconds: float):
+    """Record `seconds` spent in `phase`, in the histogram and in a run's stats dict"""
+    PHASE_SECONDS.observe(seconds, phase=phase)
+    if stats is not None:
+        with _lock:
+            timings = stats.setdefault("phase_timings", {})
+            timings[phase] = timings.get(phase, 0.0) + seconds * 1000
+
+
+@contextmanager
+def timed(phase: str, stats: Optional[Dict] = None):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_phase(stats, phase, time.perf_counter() - start)
+
+
+def timed_iter(iterable: Iterable, phase: str, stats: Optional[Dict] = None) -> Iterator:
+    """Items of `iterable`, the wait for each one timed as `phase`"""
+    iterator = iter(iterable)
+    while True:
+        with timed(phase, stats):
+            item = next(iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item
+
+
+def sleep(seconds: float, stats: Optional[Dict] = None):
+    """time.sleep() counted as the "sleep" phase"""
+    with timed("sleep", stats):
+        time.sleep(seconds)
+
+
+def phase_timings(stats: Dict) -> Dict[str, float]:
+    """A run's phase breakdown in milliseconds, as stored in scraping_stats.phase_timings"""
+    with _lock:
+        return {phase: round(ms, 1) for phase, ms in sorted(stats.get("phase_timings", {}).items())}
+
+
+def render() -> str:
+    """Every metric of this process in the Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread, for processes without the Flask app"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Serving metrics on port {port}")
+    return server
@@ -0,0 +1,70 @@
+import os
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+
+# Requests allowed per minute against a single Indeed domain (0: unlimited), and burst size
+DOMAIN_REQUESTS_PER_MINUTE = float(os.environ.get("INDEED_REQUESTS_PER_MINUTE", "6"))
+DOMAIN_BURST = int(os.environ.get("INDEED_REQUEST_BURST", "2"))
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `capacity`; a rate of 0 or less never waits"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token without blocking. Returns how long the caller must wait
+        before using it (0 if a token was available)."""
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self) -> float:
+        """Block until a token is available. Returns the time spent waiting."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_domain_limiter(domain: str) -> TokenBucket:
+    """Return the shared bucket for a domain, creating it on first use"""
+    with _buckets_lock:
+        bucket = _buckets.get(domain)
+        if bucket is None:
+            bucket = TokenBucket(DOMAIN_REQUESTS_PER_MINUTE / 60.0, DOMAIN_BURST)
+            _buckets[domain] = bucket
+        return bucket
+
+
+def limiter_for_url(url: str) -> TokenBucket:
+    return get_domain_limiter(urlparse(url).netloc)
+
+
+def wait_for_slot(url: str) -> float:
+    """Block until the domain of `url` may be requested again"""
+    waited = limiter_for_url(url).acquire()
+    if waited > 0:
+        print(f"Rate limit: waited {waited:.2f}s for {urlparse(url).netloc}")
+    return waited
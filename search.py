@@ -0,0 +1,131 @@
+"""
+Full-text search over offer titles and companies.
+
+SQLite: an external-content FTS5 table (offers_fts) kept in sync with offers
+by triggers, tokenized with unicode61 remove_diacritics 2 so "developpeur"
+finds "Développeur". PostgreSQL: a GIN index on the tsvector of the
+unaccented title and company. Other databases fall back to ILIKE.
+
+apply_search() filters a query on the `q=` text and orders it by relevance;
+the caller's own order_by() then breaks ties.
+"""
+import logging
+import re
+
+from sqlalchemy import column, func, literal_column, table, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import Offer
+from scraper.locations import strip_accents
+
+logger = logging.getLogger(__name__)
+
+
+FTS_TABLE = "offers_fts"
+
+SQLITE_SETUP = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, company, content='offers', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS offers_fts_ai AFTER INSERT ON offers BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, company) VALUES (new.id, new.title, new.company);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS offers_fts_ad AFTER DELETE ON offers BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, company) VALUES ('delete', old.id, old.title, old.company);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS offers_fts_au AFTER UPDATE OF title, company ON offers BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, company) VALUES ('delete', old.id, old.title, old.company);
+        INSERT INTO {FTS_TABLE}(rowid, title, company) VALUES (new.id, new.title, new.company);
+    END""",
+]
+
+# offers_search_text() must be IMMUTABLE to be indexable, which unaccent() is not
+POSTGRES_UNACCENT_FUNCTION = """
+CREATE OR REPLACE FUNCTION offers_search_text(title text, company text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS
+$$ SELECT public.unaccent('public.unaccent', lower(coalesce(title, '') || ' ' || coalesce(company, ''))) $$
+"""
+POSTGRES_PLAIN_FUNCTION = """
+CREATE OR REPLACE FUNCTION offers_search_text(title text, company text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS
+$$ SELECT lower(coalesce(title, '') || ' ' || coalesce(company, '')) $$
+"""
+POSTGRES_INDEX = (
+    "CREATE INDEX IF NOT EXISTS ix_offers_search "
+    "ON offers USING GIN (to_tsvector('simple', offers_search_text(title, company)))"
+)
+
+_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+_backend = None
+
+
+def init_search(engine):
+    """Create the search structures for this database; safe to run on every start"""
+    global _backend
+    dialect = engine.dialect.name
+    try:
+        if dialect == "sqlite":
+            with engine.begin() as conn:
+                created = not conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": FTS_TABLE}
+                ).first()
+                for statement in SQLITE_SETUP:
+                    conn.exec_driver_sql(statement)
+                if created:
+                    # Index the offers stored before the FTS table existed
+                    conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            _backend = "sqlite"
+        elif dialect == "postgresql":
+            _init_postgres(engine)
+            _backend = "postgresql"
+        else:
+            _backend = "ilike"
+    except SQLAlchemyError as e:
+        logger.error(f"Full-text search unavailable, falling back to ILIKE: {e}")
+        _backend = "ilike"
+
+
+def _init_postgres(engine):
+    try:
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS unaccent")
+            conn.exec_driver_sql(POSTGRES_UNACCENT_FUNCTION)
+    except SQLAlchemyError as e:
+        logger.warning(f"unaccent extension unavailable, search will be accent-sensitive: {e}")
+        with engine.begin() as conn:
+            conn.exec_driver_sql(POSTGRES_PLAIN_FUNCTION)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(POSTGRES_INDEX)
+
+
+def search_terms(query: str):
+    """Words of a user query, lowercased, without punctuation or FTS operators"""
+    return re.findall(r"\w+", (query or "").lower())
+
+
+def apply_search(q, query: str):
+    """Filter `q` on the offers matching every word of `query` (as prefixes), best matches first"""
+    terms = search_terms(query)
+    if not terms:
+        return q
+
+    if _backend == "sqlite":
+        fts_query = " ".join(f'"{term}"*' for term in terms)
+        # Joined directly rather than through a subquery so that count() does
+        # not compute the bm25 rank of every match; lower rank is better
+        return (
+            q.join(_fts, Offer.id == _fts.c.rowid)
+            .filter(literal_column(FTS_TABLE).op("MATCH")(fts_query))
+            .order_by(_fts.c.rank)
+        )
+
+    if _backend == "postgresql":
+        ts_query = " & ".join(f"{strip_accents(term)}:*" for term in terms)
+        vector = func.to_tsvector(literal_column("'simple'"), func.offers_search_text(Offer.title, Offer.company))
+        tsquery = func.to_tsquery(literal_column("'simple'"), ts_query)
+        return q.filter(vector.op("@@")(tsquery)).order_by(func.ts_rank(vector, tsquery).desc())
+
+    for term in terms:
+        q = q.filter(Offer.title.ilike(f"%{term}%") | Offer.company.ilike(f"%{term}%"))
+    return q
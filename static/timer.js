@@ -0,0 +1,109 @@
+// Countdown to the next scheduled scrape, fed by the /events stream.
+// Falls back to polling /timer-info when the browser has no EventSource or
+// the server has no stream slot left.
+(function () {
+  const POLL_INTERVAL_MS = 5000;
+
+  function earliestRun(nextRuns) {
+    let earliest = null;
+    for (const jobId in nextRuns) {
+      if (nextRuns[jobId]) {
+        const jobTime = new Date(nextRuns[jobId]);
+        if (!earliest || jobTime < earliest) {
+          earliest = jobTime;
+        }
+      }
+    }
+    return earliest;
+  }
+
+  function formatRemaining(diffMs) {
+    const diffMins = Math.floor(diffMs / 60000);
+    const diffSecs = Math.floor((diffMs % 60000) / 1000);
+    if (diffMins > 0) {
+      return `${diffMins} minute${diffMins > 1 ? 's' : ''} et ${diffSecs} seconde${diffSecs > 1 ? 's' : ''}`;
+    }
+    return `${diffSecs} seconde${diffSecs > 1 ? 's' : ''}`;
+  }
+
+  // options:
+  //   runningText / unavailableText: labels while a scrape runs / with no schedule
+  //   reloadAfterUpdate: reload the page once a scheduled scrape has finished
+  //   reloadOnInsert: reload when a scrape of this country inserts offers
+  //                   (true for any country)
+  window.startUpdateTimer = function (options) {
+    const display = document.getElementById('nextUpdateTime');
+    let nextRuns = null;
+    let running = false;
+    let isUpdating = false;
+
+    function render() {
+      if (nextRuns === null) {
+        return;
+      }
+      const earliest = earliestRun(nextRuns);
+      if (!earliest) {
+        display.textContent = options.unavailableText;
+        return;
+      }
+      const diffMs = earliest - new Date();
+      if (running || diffMs < 1000) {
+        // Time is up: the scheduler is running (or about to run) the scrape
+        isUpdating = true;
+        display.textContent = options.runningText;
+      } else {
+        isUpdating = false;
+        display.textContent = formatRemaining(diffMs);
+      }
+    }
+
+    function onSchedule(data) {
+      const earliest = earliestRun(data.next_runs || {});
+      running = (data.running || []).length > 0;
+      if (isUpdating && !running && earliest && earliest > new Date() && options.reloadAfterUpdate) {
+        // The scrape we were waiting for is over: show its offers
+        location.reload();
+        return;
+      }
+      nextRuns = data.next_runs || {};
+      render();
+    }
+
+    function onScrape(data) {
+      const country = options.reloadOnInsert;
+      if (data.offers_inserted > 0 && (country === true || country === data.country)) {
+        location.reload();
+      }
+    }
+
+    function startPolling() {
+      const poll = () => fetch('/timer-info')
+        .then(response => response.json())
+        .then(data => onSchedule({ next_runs: data.next_runs, running: [] }))
+        .catch(error => {
+          console.error('Error fetching timer info:', error);
+          display.textContent = "Erreur de chargement";
+        });
+      poll();
+      setInterval(poll, POLL_INTERVAL_MS);
+    }
+
+    if (window.EventSource) {
+      const source = new EventSource('/events');
+      source.addEventListener('schedule', event => onSchedule(JSON.parse(event.data)));
+      source.addEventListener('scrape', event => onScrape(JSON.parse(event.data)));
+      source.addEventListener('error', () => {
+        // The server answered 204 (its stream slots are full) or an error:
+        // EventSource does not retry those, so fall back to polling
+        if (source.readyState === EventSource.CLOSED) {
+          startPolling();
+        }
+      });
+    } else {
+      startPolling();
+    }
+
+    // The countdown itself needs no request
+    setInterval(render, 1000);
+  };
+})();
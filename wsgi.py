@@ -1,40 +1,48 @@
 import os
 import sys
 
-# Debug information
-print("=" * 50)
-print("WSGI DEBUG INFORMATION")
-print("=" * 50)
-print("Python version:", sys.version)
-print("Python path:", sys.path)
-print("Current working directory:", os.getcwd())
-print("Files in current directory:", os.listdir("."))
-print("Environment variables:")
-for key, value in sorted(os.environ.items()):
-    if 'RENDER' in key or 'PATH' in key:
-        print(f"  {key}: {value}")
-
-# Check for templates directory
-template_dir = os.path.join(os.getcwd(), 'templates')
-if os.path.exists(template_dir):
-    print(f"Templates directory found: {template_dir}")
-    print(f"Files in templates directory: {os.listdir(template_dir)}")
-else:
-    print(f"Templates directory NOT found at: {template_dir}")
-    # Try alternative locations
-    alt_locations = [
-        '/opt/render/project/src/templates',
-        os.path.join(os.path.dirname(__file__), 'templates')
-    ]
-    for location in alt_locations:
-        if os.path.exists(location):
-            print(f"Templates found at alternative location: {location}")
-            print(f"Files: {os.listdir(location)}")
-            break
+from database import BOOT_DEBUG
+
+
+def print_boot_diagnostics():
+    """Environment and template lookup details, printed with BOOT_DEBUG=1"""
+    print("=" * 50)
+    print("WSGI DEBUG INFORMATION")
+    print("=" * 50)
+    print("Python version:", sys.version)
+    print("Python path:", sys.path)
+    print("Current working directory:", os.getcwd())
+    print("Files in current directory:", os.listdir("."))
+    print("Environment variables:")
+    for key, value in sorted(os.environ.items()):
+        if 'RENDER' in key or 'PATH' in key:
+            print(f"  {key}: {value}")
+
+    # Check for templates directory
+    template_dir = os.path.join(os.getcwd(), 'templates')
+    if os.path.exists(template_dir):
+        print(f"Templates directory found: {template_dir}")
+        print(f"Files in templates directory: {os.listdir(template_dir)}")
     else:
-        print("Templates directory not found in any expected location")
+        print(f"Templates directory NOT found at: {template_dir}")
+        # Try alternative locations
+        alt_locations = [
+            '/opt/render/project/src/templates',
+            os.path.join(os.path.dirname(__file__), 'templates')
+        ]
+        for location in alt_locations:
+            if os.path.exists(location):
+                print(f"Templates found at alternative location: {location}")
+                print(f"Files: {os.listdir(location)}")
+                break
+        else:
+            print("Templates directory not found in any expected location")
+
+    print("=" * 50)
+
 
-print("=" * 50)
+if BOOT_DEBUG:
+    print_boot_diagnostics()
 
 from app import create_app
 
@@ -43,4 +51,4 @@ application = create_app()
 
 if __name__ == "__main__":
     port = int(os.environ.get('PORT', 5000))
-    application.run(host='0.0.0.0', port=port)
\ No newline at end of file
+    application.run(host='0.0.0.0', port=port)